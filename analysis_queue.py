@@ -0,0 +1,605 @@
+
+import argparse
+import heapq
+import importlib
+import itertools
+import json
+import math
+import random
+import re
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+
+from entity_tagger import build_tagger
+from load_generator import CHANNELS, arrival_times, percentiles, synth_message
+from near_dup import ANALYZED_MIN_CHARS
+from ops_config import keyset_filter, parse_ts
+from prompt_profiler import estimate_tokens
+from token_rollup import DEFAULT_STORE_PATH, GRAINS, RollupStore, load_budgets
+
+# What the app calls for analysis (the services/gemini/client.ts default); its budgets are in token_rollup.
+DEFAULT_MODELS = ["gemini-2.0-flash-001"]
+# Per 1M tokens, as in services/TokenUsageService.ts.
+RATES = {
+    "gemini-1.5-flash": {"input": 0.075, "output": 0.30},
+    "gemini-1.5-pro": {"input": 3.50, "output": 10.50},
+    "gemini-2.0-flash-001": {"input": 0.00, "output": 0.00},
+}
+FEATURE = "analysis_queue"
+# Share of each budget this service may use; the app's own Gemini calls spend the same quota.
+DEFAULT_HEADROOM = 0.5
+PROMPT_OVERHEAD_TOKENS = 350
+OUTPUT_TOKENS_PER_ITEM = 200
+SHORT_MESSAGE_TOKENS = 300
+URGENT_RE = re.compile(r'속보|긴급|단독|특징주|상한가|하한가|급등|급락|공시|breaking|urgent|alert', re.I)
+URGENT_BOOST = 2.0
+WATCHLIST_BOOST = 1.5
+TAGGED_BOOST = 0.5
+PROMPT = ("다음 텔레그램 메시지들을 각각 분석해 JSON 배열로 답하라. 항목마다 "
+          '{"index", "ticker", "sentiment": "BULLISH|BEARISH|NEUTRAL", "confidence": 0-100, "summary"}.\n\n')
+
+
+class RateLimited(Exception):
+    """Raised by an LLM client for a 429; `retry_after` in seconds when the API says."""
+
+    def __init__(self, message="429 Too Many Requests", retry_after=None):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class TokenBucket:
+    def __init__(self, rate, capacity, level=None, now=0.0):
+        self.rate = rate
+        self.capacity = capacity
+        self.level = capacity if level is None else max(0.0, min(level, capacity))
+        self.updated = now
+
+    def _refill(self, now):
+        if now > self.updated:
+            self.level = min(self.capacity, self.level + (now - self.updated) * self.rate)
+            self.updated = now
+
+    def wait(self, amount, now):
+        """Seconds until `amount` is available (a request larger than the bucket waits for a full one)."""
+        self._refill(now)
+        need = min(amount, self.capacity) - self.level
+        return 0.0 if need <= 0 else need / self.rate
+
+    def take(self, amount, now):
+        self._refill(now)
+        self.level -= amount
+
+    def drain(self, now):
+        self._refill(now)
+        self.level = min(self.level, 0.0)
+
+
+class ModelBudget:
+    """
+    RPM/TPM token buckets plus what is left of the RPD/TPD allowance for one model,
+    all scaled by `headroom` and started from what ai_token_usage says was already spent.
+    """
+
+    def __init__(self, model, limits, headroom=DEFAULT_HEADROOM, used_minute=(0, 0), used_day=(0, 0), now=None):
+        now = time.time() if now is None else now
+        self.model = model
+        self.buckets = {}
+        for key, used in (("rpm", used_minute[0]), ("tpm", used_minute[1])):
+            if limits.get(key):
+                cap = limits[key] * headroom
+                self.buckets[key] = TokenBucket(cap / 60.0, cap, cap - used, now)
+        self.daily_limits = {key: limits[key] * headroom for key in ("rpd", "tpd") if limits.get(key)}
+        self.daily = {key: cap - (used_day[0] if key == "rpd" else used_day[1]) for key, cap in self.daily_limits.items()}
+        self.day = datetime.fromtimestamp(now, timezone.utc).date()
+        self.blocked_until = 0.0
+
+    def _roll_day(self, now):
+        # Gemini daily quotas reset at UTC midnight, as token_rollup's day buckets do.
+        day = datetime.fromtimestamp(now, timezone.utc).date()
+        if day != self.day:
+            self.day = day
+            self.daily = dict(self.daily_limits)
+
+    def wait(self, tokens, now):
+        self._roll_day(now)
+        waits = [self.blocked_until - now]
+        if "rpm" in self.buckets:
+            waits.append(self.buckets["rpm"].wait(1, now))
+        if "tpm" in self.buckets:
+            waits.append(self.buckets["tpm"].wait(tokens, now))
+        if self.daily.get("rpd", 1) < 1 or self.daily.get("tpd", tokens) < tokens:
+            midnight = datetime.combine(self.day + timedelta(days=1), datetime.min.time(), timezone.utc).timestamp()
+            waits.append(midnight - now)
+        return max(0.0, *waits)
+
+    def charge(self, tokens, now, requests=1):
+        self._roll_day(now)
+        if requests and "rpm" in self.buckets:
+            self.buckets["rpm"].take(requests, now)
+        if "tpm" in self.buckets:
+            self.buckets["tpm"].take(tokens, now)
+        if requests and "rpd" in self.daily:
+            self.daily["rpd"] -= requests
+        if "tpd" in self.daily:
+            self.daily["tpd"] -= tokens
+
+    def throttle(self, now, seconds=60.0):
+        for bucket in self.buckets.values():
+            bucket.drain(now)
+        self.blocked_until = max(self.blocked_until, now + seconds)
+
+
+def budgets_from_usage(models, limits, headroom, store=None, now=None):
+    """One ModelBudget per model, started from the current minute and today's ai_token_usage rollups."""
+    now = time.time() if now is None else now
+    ts = datetime.fromtimestamp(now, timezone.utc)
+    out = {}
+    for model in models:
+        used_minute = used_day = (0, 0)
+        if store:
+            for grain, target in (("minute", "m"), ("day", "d")):
+                rows = store.series(grain, ts.strftime(GRAINS[grain]), model)
+                used = (sum(r["requests"] for r in rows), sum(r["total_tokens"] or 0 for r in rows))
+                if target == "m":
+                    used_minute = used
+                else:
+                    used_day = used
+        out[model] = ModelBudget(model, limits.get(model) or limits.get("*") or {}, headroom, used_minute, used_day, now)
+    return out
+
+
+def message_title(text):
+    return (text or "").strip().split("\n", 1)[0][:120]
+
+
+class WorkQueue:
+    """
+    Pending messages ordered by priority, released in batches only as the model
+    budgets allow.
+
+    A message's priority is its base score (channel weight, urgency words, watchlist
+    and tagger hits) plus `aging` per second waited, so a flood of urgent items cannot
+    starve the rest forever. Because aging grows at the same rate for everyone, the
+    heap key `score - aging * enqueued_at` never has to be recomputed.
+    Everything takes an explicit `now`, so the same queue runs live or simulated.
+    """
+
+    def __init__(self, budgets, batch_size=5, batch_tokens=1500, max_pending=2000, max_age=3 * 3600,
+                 aging=1 / 300, channel_weights=None, watchlist=(), tagger=None):
+        self.budgets = budgets
+        self.batch_size = batch_size
+        self.batch_tokens = batch_tokens
+        self.max_pending = max_pending
+        self.max_age = max_age
+        self.aging = aging
+        self.channel_weights = channel_weights or {}
+        self.watchlist = set(watchlist)
+        self.tagger = tagger
+        self.heap = []
+        self.seq = itertools.count()
+        self.lock = threading.Lock()
+        self.stats = {"offered": 0, "skipped_short": 0, "queued": 0, "stale": 0, "batches": 0, "items": 0,
+                      "rate_limited": 0, "requeued": 0, "max_depth": 0}
+
+    def __len__(self):
+        return len(self.heap)
+
+    def full(self):
+        return len(self.heap) >= self.max_pending
+
+    def score(self, item):
+        text = item["message"]
+        score = self.channel_weights.get(item.get("channel"), self.channel_weights.get("*", 1.0))
+        urgent = bool(URGENT_RE.search(text[:200]))
+        if urgent:
+            score += URGENT_BOOST
+        tags = item.get("tags") or {}
+        tickers = {c["ticker"] for c in tags.get("tickers", [])}
+        watched = tickers & self.watchlist
+        if watched:
+            score += WATCHLIST_BOOST * min(2, len(watched))
+        elif tickers or tags.get("broker"):
+            score += TAGGED_BOOST
+        item["hot"] = urgent or bool(watched)
+        return score
+
+    def offer(self, item, now):
+        """Queues a telegram_messages row ({id, created_at, channel, message}); False if it is not worth analyzing."""
+        self.stats["offered"] += 1
+        text = item.get("message") or ""
+        # Same rule as the app: short messages are never sent to Gemini.
+        if len(text) <= ANALYZED_MIN_CHARS:
+            self.stats["skipped_short"] += 1
+            return False
+        if self.tagger and "tags" not in item:
+            item["tags"] = self.tagger.tag(text)
+        item.setdefault("arrived", now)
+        item["tokens"] = estimate_tokens(text)
+        item["priority"] = self.score(item)
+        with self.lock:
+            heapq.heappush(self.heap, (-(item["priority"] - self.aging * item["arrived"]), next(self.seq), item))
+            self.stats["queued"] += 1
+            self.stats["max_depth"] = max(self.stats["max_depth"], len(self.heap))
+        return True
+
+    def _stale(self, item, now):
+        born = item.get("born", item["arrived"])
+        return self.max_age and now - born > self.max_age
+
+    def request_tokens(self, items):
+        return PROMPT_OVERHEAD_TOKENS + sum(i["tokens"] + OUTPUT_TOKENS_PER_ITEM for i in items)
+
+    def next_batch(self, now):
+        """
+        (model, items, estimated tokens) when a request may go out now, else (None, [], wait seconds).
+        The head of the queue always goes first; short messages behind it ride along in the
+        same prompt while the batch has room.
+        """
+        with self.lock:
+            while self.heap and self._stale(self.heap[0][2], now):
+                heapq.heappop(self.heap)
+                self.stats["stale"] += 1
+            if not self.heap:
+                return None, [], None
+            head = self.heap[0][2]
+            items = [head]
+            if head["tokens"] <= SHORT_MESSAGE_TOKENS and self.batch_size > 1:
+                used = head["tokens"]
+                # The next few entries in priority order; anything not taken goes back untouched.
+                for entry in heapq.nsmallest(self.batch_size * 4, self.heap)[1:]:
+                    item = entry[2]
+                    if len(items) >= self.batch_size:
+                        break
+                    if item["tokens"] <= SHORT_MESSAGE_TOKENS and used + item["tokens"] <= self.batch_tokens \
+                            and not self._stale(item, now):
+                        items.append(item)
+                        used += item["tokens"]
+            tokens = self.request_tokens(items)
+            waits = {}
+            for model, budget in self.budgets.items():
+                waits[model] = budget.wait(tokens, now)
+                if waits[model] == 0:
+                    taken = {id(i) for i in items}
+                    self.heap = [e for e in self.heap if id(e[2]) not in taken]
+                    heapq.heapify(self.heap)
+                    budget.charge(tokens, now)
+                    self.stats["batches"] += 1
+                    self.stats["items"] += len(items)
+                    return model, items, tokens
+            return None, [], min(waits.values()) if waits else None
+
+    def complete(self, model, estimated, input_tokens, output_tokens, now):
+        """Settles the estimate against what the model reported; the request itself is already counted."""
+        self.budgets[model].charge(input_tokens + output_tokens - estimated, now, requests=0)
+
+    def rate_limited(self, model, items, now, retry_after=None):
+        """A 429: stop using the model for a while and put the batch back where it was."""
+        self.stats["rate_limited"] += 1
+        self.budgets[model].throttle(now, retry_after or 60.0)
+        with self.lock:
+            for item in items:
+                heapq.heappush(self.heap, (-(item["priority"] - self.aging * item["arrived"]), next(self.seq), item))
+                self.stats["requeued"] += 1
+
+
+def build_prompt(items):
+    return PROMPT + "\n\n".join(f"[{i}] ({item.get('channel')}) {item['message']}" for i, item in enumerate(items))
+
+
+class StubLLM:
+    """
+    Offline stand-in for the analysis model: lognormal latency with the given median and
+    p99, output tokens per message, and an optional share of 429s. Any object with
+    `analyze(model, prompt, items) -> {"input_tokens", "output_tokens", "results"}` that
+    raises RateLimited on a 429 can replace it (`--llm module:factory`).
+    """
+
+    def __init__(self, median=2.0, p99=8.0, error_rate=0.0, out_tokens=OUTPUT_TOKENS_PER_ITEM, seed=None):
+        self.mu = math.log(median)
+        self.sigma = max(1e-6, (math.log(p99) - self.mu) / 2.326)
+        self.error_rate = error_rate
+        self.out_tokens = out_tokens
+        self.rng = random.Random(seed)
+        self.lock = threading.Lock()
+
+    def sample(self, items):
+        """(latency seconds, output tokens, rate limited?) for one request."""
+        with self.lock:
+            latency = self.rng.lognormvariate(self.mu, self.sigma) * (1 + 0.15 * (len(items) - 1))
+            out = int(self.out_tokens * len(items) * self.rng.uniform(0.6, 1.2))
+            return latency, out, self.rng.random() < self.error_rate
+
+    def analyze(self, model, prompt, items):
+        latency, out, limited = self.sample(items)
+        time.sleep(latency)
+        if limited:
+            raise RateLimited()
+        results = []
+        for i, item in enumerate(items):
+            candidates = (item.get("tags") or {}).get("tickers") or [{}]
+            results.append({"index": i, "ticker": candidates[0].get("ticker"), "summary": "(stub analysis)",
+                            "sentiment": self.rng.choice(["BULLISH", "BEARISH", "NEUTRAL"]), "confidence": self.rng.randint(40, 90)})
+        return {"input_tokens": estimate_tokens(prompt), "output_tokens": out, "results": results}
+
+
+def load_llm(spec, args):
+    if spec == "stub":
+        return StubLLM(args.stub_median, args.stub_p99, args.stub_errors, seed=args.seed)
+    module, _, factory = spec.partition(":")
+    return getattr(importlib.import_module(module), factory or "create")(args)
+
+
+def thought_rows(model, items, results):
+    rows = []
+    for item, res in zip(items, results):
+        title = message_title(item["message"])
+        rows.append({
+            "ticker": res.get("ticker"), "action": "ANALYSIS", "strategy": "CONTENT_ANALYSIS",
+            "confidence": res.get("confidence"),
+            "message": f"[Intel] ✅ 분석 완료: {title[:60]} -> {res.get('sentiment')} ({res.get('summary')})",
+            "details": {"source_title": title, "telegram_message_id": item.get("id"), "model": model,
+                        "batch_size": len(items), "priority": round(item["priority"], 2), "via": FEATURE},
+        })
+    return rows
+
+
+def usage_row(model, input_tokens, output_tokens):
+    rate = RATES.get(model) or RATES["gemini-1.5-flash"]
+    return {"model": model, "input_tokens": input_tokens, "output_tokens": output_tokens, "feature": FEATURE,
+            "cost_usd": input_tokens / 1_000_000 * rate["input"] + output_tokens / 1_000_000 * rate["output"]}
+
+
+# ---------------------------------------------------------------- live service
+
+
+class AnalysisService:
+    """Polls new telegram_messages into the queue and runs batches on `workers` threads as budget allows."""
+
+    def __init__(self, queue, llm, url, key, workers=2, poll=5.0, writer=None):
+        from ops_config import rest_session
+
+        self.queue = queue
+        self.llm = llm
+        self.url = url
+        self.session = rest_session(url, key)
+        self.poll = poll
+        self.writer = writer
+        self.pool = ThreadPoolExecutor(max_workers=workers)
+        self.slots = threading.Semaphore(workers)
+        self.cursor = (datetime.now(timezone.utc).isoformat(), None)
+        self.latencies = []
+        self.stop = threading.Event()
+
+    def fetch(self):
+        r = self.session.get(f"{self.url}/rest/v1/telegram_messages", params={
+            "select": "id,created_at,channel,message", "order": "created_at.asc,id.asc", "limit": "500",
+            "or": keyset_filter(self.cursor)}, timeout=30)
+        r.raise_for_status()
+        rows = r.json()
+        if rows:
+            self.cursor = (rows[-1]["created_at"], rows[-1]["id"])
+        return rows
+
+    def poll_loop(self):
+        while not self.stop.is_set():
+            # Backpressure: while the queue is full the cursor stays put and rows wait in the table.
+            if not self.queue.full():
+                try:
+                    now = time.time()
+                    for row in self.fetch():
+                        row["born"] = parse_ts(row["created_at"]).timestamp()
+                        self.queue.offer(row, now)
+                except Exception as e:
+                    print(f"⚠️ Poll failed: {e}")
+            self.stop.wait(self.poll)
+
+    def run_batch(self, model, items, estimated):
+        try:
+            try:
+                res = self.llm.analyze(model, build_prompt(items), items)
+            except RateLimited as e:
+                print(f"⏳ {model} rate limited; backing off {e.retry_after or 60:.0f}s")
+                self.queue.rate_limited(model, items, time.time(), e.retry_after)
+                return
+            except Exception as e:
+                print(f"❌ Analysis failed ({len(items)} messages): {e}")
+                return
+            now = time.time()
+            self.queue.complete(model, estimated, res["input_tokens"], res["output_tokens"], now)
+            self.latencies.extend(now - item["arrived"] for item in items)
+            if self.writer:
+                self.writer.add_many("ai_thought_logs", thought_rows(model, items, res["results"]))
+                self.writer.add("ai_token_usage", usage_row(model, res["input_tokens"], res["output_tokens"]))
+        finally:
+            self.slots.release()
+
+    def run(self, report_every=60.0):
+        threading.Thread(target=self.poll_loop, daemon=True).start()
+        last_report = time.monotonic()
+        while not self.stop.is_set():
+            self.slots.acquire()
+            model, items, info = self.queue.next_batch(time.time())
+            if model:
+                self.pool.submit(self.run_batch, model, items, info)
+                continue
+            self.slots.release()
+            self.stop.wait(min(self.poll, info) if info else self.poll)
+            if time.monotonic() - last_report >= report_every:
+                last_report = time.monotonic()
+                lat = percentiles(self.latencies[-1000:], points=(50, 95))
+                s = self.queue.stats
+                print(f"[{datetime.now().strftime('%H:%M:%S')}] depth={len(self.queue)} batches={s['batches']} items={s['items']} "
+                      f"stale={s['stale']} 429={s['rate_limited']} "
+                      + (f"wait p50={lat['p50']:.0f}s p95={lat['p95']:.0f}s" if lat["p50"] is not None else ""), flush=True)
+
+
+# ---------------------------------------------------------------- offline benchmark
+
+
+def simulate(queue, llm, arrivals, workers, start):
+    """
+    Discrete-event run of the queue against the stub's latencies: `arrivals` is
+    [(seconds from start, item)]. Returns (per-item wait-to-done seconds with the item,
+    requests made, virtual seconds until the last answer).
+    """
+    events = [(start + t, 0, next(queue.seq), "arrive", item) for t, item in arrivals]
+    heapq.heapify(events)
+    free, wake_at, done, requests, now, last = workers, None, [], 0, start, start
+    while events:
+        now, _, _, kind, payload = heapq.heappop(events)
+        if kind == "arrive":
+            queue.offer(payload, now)
+        elif kind == "done":
+            model, items, estimated, out, limited = payload
+            free += 1
+            if limited:
+                queue.rate_limited(model, items, now)
+            else:
+                queue.complete(model, estimated, estimated - OUTPUT_TOKENS_PER_ITEM * len(items), out, now)
+                done.extend((now - item["arrived"], item) for item in items)
+                last = now
+        elif kind == "wake":
+            wake_at = None
+        while free:
+            model, items, info = queue.next_batch(now)
+            if not model:
+                if info is not None and wake_at is None:
+                    wake_at = now + max(info, 1e-3)
+                    heapq.heappush(events, (wake_at, 1, next(queue.seq), "wake", None))
+                break
+            latency, out, limited = llm.sample(items)
+            free -= 1
+            requests += 1
+            heapq.heappush(events, (now + latency, 1, next(queue.seq), "done", (model, items, info, out, limited)))
+    return done, requests, last - start
+
+
+def bench(args, budgets_limits, tagger):
+    rng = random.Random(args.seed)
+    times = arrival_times(args.shape, args.rate / 60.0, args.duration, args.burst_factor, rng)
+    watchlist = set(args.watchlist or [])
+    arrivals = []
+    for i, t in enumerate(times):
+        _, _, text = synth_message(rng, f"#bench{i}")
+        arrivals.append((t, {"id": i, "channel": rng.choice(CHANNELS), "message": text}))
+    print(f"🧪 {len(arrivals)} messages over {args.duration / 60:.0f} min ({args.shape}, {args.rate:g}/min), "
+          f"models {', '.join(args.models)} at {args.headroom:.0%} of budget, {args.workers} workers")
+    results = []
+    for size in args.batch_sizes:
+        start = time.time()
+        queue = WorkQueue(budgets_from_usage(args.models, budgets_limits, args.headroom, now=start), size,
+                          max_pending=args.max_pending, max_age=args.max_age, channel_weights=args.channel_weights,
+                          watchlist=watchlist, tagger=tagger)
+        llm = StubLLM(args.stub_median, args.stub_p99, args.stub_errors, seed=args.seed)
+        clock = time.perf_counter()
+        done, requests, elapsed = simulate(queue, llm, [(t, dict(m)) for t, m in arrivals], args.workers, start)
+        waits = [w for w, _ in done]
+        hot = [w for w, item in done if item["hot"]]
+        row = {"batch_size": size, "analyzed": len(done), "requests": requests, "stale": queue.stats["stale"],
+               "skipped_short": queue.stats["skipped_short"], "rate_limited": queue.stats["rate_limited"],
+               "max_depth": queue.stats["max_depth"], "virtual_min": round(elapsed / 60, 1),
+               "requests_left_today": {m: round(b.daily["rpd"]) for m, b in queue.budgets.items() if "rpd" in b.daily},
+               "throughput_per_min": round(len(done) / max(elapsed, 1e-9) * 60, 2),
+               "latency": percentiles(waits), "priority_latency": percentiles(hot),
+               "sim_sec": round(time.perf_counter() - clock, 2)}
+        results.append(row)
+        if not args.json:
+            lat, hot_lat = row["latency"], row["priority_latency"]
+            fmt = lambda v: f"{v:.0f}s" if v is not None else "-"
+            print(f"📦 batch<={size}: {row['analyzed']} analyzed in {row['requests']} requests "
+                  f"({row['throughput_per_min']}/min), wait p50={fmt(lat['p50'])} p95={fmt(lat['p95'])} p99={fmt(lat['p99'])}, "
+                  f"priority p95={fmt(hot_lat['p95'])}, stale={row['stale']}, 429={row['rate_limited']}, "
+                  f"max depth={row['max_depth']}, rpd left={sum(row['requests_left_today'].values())} "
+                  f"[{row['sim_sec']}s to simulate]")
+    if args.json:
+        print(json.dumps(results, indent=2))
+    return results
+
+
+def load_watchlist(args):
+    tickers = set(args.watchlist or [])
+    if args.watchlist_table:
+        from ops_config import require_credentials, rest_session
+        url, key = require_credentials()
+        r = rest_session(url, key).get(f"{url}/rest/v1/dynamic_watchlist", params={"select": "ticker"}, timeout=30)
+        r.raise_for_status()
+        tickers |= {row["ticker"] for row in r.json() if row.get("ticker")}
+    return sorted(tickers)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Priority work queue for LLM analysis of telegram messages, within per-model token budgets.")
+    parser.add_argument("command", choices=["run", "bench"])
+    parser.add_argument("--models", nargs="+", default=DEFAULT_MODELS, help="Models in order of preference")
+    parser.add_argument("--budgets", help="JSON file with per-model rpm/tpm/rpd/tpd (see token_rollup.py)")
+    parser.add_argument("--headroom", type=float, default=DEFAULT_HEADROOM, help="Share of each budget this service may use")
+    parser.add_argument("--batch-size", type=int, default=5, help="Max short messages per prompt")
+    parser.add_argument("--workers", type=int, default=2, help="Concurrent model requests")
+    parser.add_argument("--max-pending", type=int, default=2000, help="Queue depth at which polling pauses")
+    parser.add_argument("--max-age", type=float, default=3 * 3600, help="Seconds after which a message is no longer worth analyzing")
+    parser.add_argument("--channels", help='Channel weights as JSON, e.g. {"rassiro_channel": 2, "*": 1}')
+    parser.add_argument("--watchlist", nargs="*", help="Tickers that raise priority")
+    parser.add_argument("--watchlist-table", action="store_true", help="Also read tickers from dynamic_watchlist")
+    parser.add_argument("--krx", action="append", default=[], help="KRX listing for the entity tagger")
+    parser.add_argument("--us", action="append", default=[], help="US listing for the entity tagger")
+    parser.add_argument("--llm", default="stub", help="'stub' or module:factory returning an object with analyze()")
+    parser.add_argument("--stub-median", type=float, default=2.0)
+    parser.add_argument("--stub-p99", type=float, default=8.0)
+    parser.add_argument("--stub-errors", type=float, default=0.0, help="Share of stub requests answered with 429")
+    parser.add_argument("--seed", type=int, default=None)
+    # run
+    parser.add_argument("--poll", type=float, default=5.0, help="Seconds between telegram_messages polls")
+    parser.add_argument("--store", default=DEFAULT_STORE_PATH, help="token_rollup store the budgets start from")
+    parser.add_argument("--no-sync", action="store_true", help="Use the rollup store as is, without syncing ai_token_usage")
+    parser.add_argument("--write", action="store_true", help="Insert CONTENT_ANALYSIS thought logs and ai_token_usage rows")
+    # bench
+    parser.add_argument("--rate", type=float, default=30.0, help="bench: messages per minute")
+    parser.add_argument("--duration", type=float, default=3600.0, help="bench: seconds of simulated traffic")
+    parser.add_argument("--shape", choices=["steady", "poisson", "market-open", "square"], default="market-open")
+    parser.add_argument("--burst-factor", type=float, default=5.0)
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[1, 3, 5], help="bench: batch sizes to compare")
+    parser.add_argument("--json", action="store_true")
+    args = parser.parse_args(argv)
+
+    args.channel_weights = json.loads(args.channels) if args.channels else {}
+    limits = load_budgets(args.budgets)
+    tagger = build_tagger(args.krx, args.us)
+    if args.command == "bench":
+        args.watchlist = load_watchlist(args) if args.watchlist_table else (args.watchlist or ["005930", "000660"])
+        bench(args, limits, tagger)
+        return 0
+
+    from ops_config import require_credentials
+    from token_rollup import sync
+    url, key = require_credentials()
+    store = RollupStore(args.store)
+    if not args.no_sync:
+        print(f"🔄 Synced {sync(store, url, key)} ai_token_usage rows")
+    budgets = budgets_from_usage(args.models, limits, args.headroom, store)
+    store.close()
+    for model, b in budgets.items():
+        left = ", ".join(f"{k} {v:,.0f}" for k, v in b.daily.items())
+        print(f"🪣 {model}: " + ", ".join(f"{k} {bk.level:,.0f}/{bk.capacity:,.0f}" for k, bk in b.buckets.items())
+              + (f"; left today: {left}" if left else ""))
+    queue = WorkQueue(budgets, args.batch_size, max_pending=args.max_pending, max_age=args.max_age,
+                      channel_weights=args.channel_weights, watchlist=load_watchlist(args), tagger=tagger)
+    writer = None
+    if args.write:
+        from supabase_writer import BatchedWriter
+        writer = BatchedWriter(url, key, batch_size=50, flush_interval=1.0)
+    service = AnalysisService(queue, load_llm(args.llm, args), url, key, args.workers, args.poll, writer)
+    print(f"🚦 Analysis queue running ({args.llm}, {args.workers} workers, batch<={args.batch_size}); Ctrl+C to stop")
+    try:
+        service.run()
+    except KeyboardInterrupt:
+        service.stop.set()
+        if writer:
+            writer.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,250 @@
+
+import argparse
+import re
+import sys
+from html.parser import HTMLParser
+from urllib.parse import urlsplit
+
+try:
+    import lxml.html
+    HAS_LXML = True
+except ImportError:
+    HAS_LXML = False
+
+MAX_CONTENT_CHARS = 1000
+# lxml refuses str input that still carries its encoding declaration; the text is already decoded.
+XML_DECLARATION = re.compile(r'^\s*<\?xml[^>]*\?>')
+
+# Per-site article containers as (tag, attribute, value); tag None matches any tag.
+# Hosts match by suffix, so "naver.com" covers n.news.naver.com and finance.naver.com.
+SITE_RULES = {
+    "rassiro.com": [("div", "class", "news_body"), ("div", "class", "article_view")],
+    "naver.com": [(None, "id", "dic_area"), ("div", "id", "newsct_article"), ("td", "class", "view_cnt"), ("div", "class", "view_cnt")],
+    "hankyung.com": [("div", "id", "articletxt"), ("div", "class", "article-body")],
+    "mk.co.kr": [("div", "class", "news_cnt_detail_wrap"), ("div", "class", "art_txt")],
+    "edaily.co.kr": [("div", "class", "news_body")],
+    "yna.co.kr": [("div", "class", "story-news"), ("article", "class", "story-news")],
+    "kiwoom.com": [("div", "class", "report_view"), ("div", "class", "view_cont")],
+    "miraeasset.com": [("div", "class", "view_con"), ("div", "class", "board_view")],
+}
+
+# What test_url_pipeline.py always looked for, tried on every site after its own rules.
+DEFAULT_RULES = [("div", "class", "news_body"), ("div", "class", "article_view")]
+
+SKIP_TAGS = {"script", "style", "noscript", "template"}
+VOID_TAGS = {"area", "base", "br", "col", "embed", "hr", "img", "input", "link", "meta", "param", "source", "track", "wbr"}
+
+
+def rules_for(url):
+    host = (urlsplit(url).hostname or "") if url else ""
+    for suffix, rules in SITE_RULES.items():
+        if host == suffix or host.endswith("." + suffix):
+            return rules + [r for r in DEFAULT_RULES if r not in rules]
+    return list(DEFAULT_RULES)
+
+
+def _matches(rule, tag, attrs):
+    rule_tag, attr, value = rule
+    if rule_tag is not None and rule_tag != tag:
+        return False
+    for name, attr_value in attrs:
+        if name != attr or attr_value is None:
+            continue
+        return value in attr_value.split() if attr == "class" else attr_value == value
+    return False
+
+
+class _StopParsing(Exception):
+    pass
+
+
+class StreamingArticleExtractor(HTMLParser):
+    """
+    Incremental extractor: feed() HTML chunks and stop as soon as it reports done.
+
+    Text is collected from the first element matching one of the rules, or
+    from <body> if no rule matches anywhere. Parsing stops once the article
+    container has closed or `max_chars` of article text have been collected,
+    so the rest of the page (comments, footers, scripts) is never parsed and,
+    when fed from the network, never downloaded.
+    """
+
+    def __init__(self, url=None, max_chars=MAX_CONTENT_CHARS, rules=None):
+        super().__init__(convert_charrefs=True)
+        self.rules = rules if rules is not None else rules_for(url)
+        self.max_chars = max_chars
+        self.done = False
+
+        self._pending = []
+        self._skip_depth = 0
+        self._article = None
+        self._article_tag = None
+        self._article_depth = 0
+        self._article_len = 0
+        self._body = None
+        self._body_len = 0
+        self._all = []
+        self._all_len = 0
+
+    def feed(self, data):
+        if self.done:
+            return True
+        try:
+            super().feed(data)
+        except _StopParsing:
+            self.done = True
+        return self.done
+
+    def close(self):
+        if not self.done:
+            try:
+                super().close()
+            except _StopParsing:
+                pass
+        self._flush()
+        self.done = True
+
+    def text(self):
+        if self._article is not None:
+            parts = self._article
+        elif self._body is not None:
+            parts = self._body
+        else:
+            parts = self._all
+        return " ".join(parts)[:self.max_chars]
+
+    # bs4's get_text(strip=True) strips whole strings between tags, so text is
+    # buffered until the next tag even when a chunk boundary splits it.
+    def handle_data(self, data):
+        if not self._skip_depth:
+            self._pending.append(data)
+
+    def _flush(self):
+        if not self._pending:
+            return
+        s = "".join(self._pending).strip()
+        self._pending = []
+        if not s:
+            return
+        if self._article is not None and self._article_depth:
+            self._article.append(s)
+            self._article_len += len(s) + 1
+            if self._article_len > self.max_chars:
+                raise _StopParsing()
+        if self._body is not None and self._body_len <= self.max_chars:
+            self._body.append(s)
+            self._body_len += len(s) + 1
+        if self._all_len <= self.max_chars:
+            self._all.append(s)
+            self._all_len += len(s) + 1
+
+    def handle_starttag(self, tag, attrs):
+        self._flush()
+        if tag in SKIP_TAGS:
+            self._skip_depth += 1
+            return
+        if tag == "body" and self._body is None:
+            self._body = []
+        if self._article is None:
+            if any(_matches(rule, tag, attrs) for rule in self.rules):
+                self._article = []
+                self._article_tag = tag
+                self._article_depth = 1
+        elif self._article_depth and tag == self._article_tag and tag not in VOID_TAGS:
+            self._article_depth += 1
+
+    def handle_startendtag(self, tag, attrs):
+        self._flush()
+
+    def handle_endtag(self, tag):
+        self._flush()
+        if tag in SKIP_TAGS:
+            self._skip_depth = max(0, self._skip_depth - 1)
+            return
+        if self._article_depth and tag == self._article_tag:
+            self._article_depth -= 1
+            if not self._article_depth:
+                raise _StopParsing()
+
+
+def _xpath_for(rule):
+    tag, attr, value = rule
+    if attr == "class":
+        return f"//{tag or '*'}[contains(concat(' ', normalize-space(@class), ' '), ' {value} ')]"
+    return f"//{tag or '*'}[@{attr}='{value}']"
+
+
+def _lxml_strings(element):
+    # Same strings bs4's get_text() yields: element text and tails, minus scripts/styles/comments.
+    if not isinstance(element.tag, str) or element.tag in SKIP_TAGS:
+        return
+    if element.text:
+        yield element.text
+    for child in element:
+        yield from _lxml_strings(child)
+        if child.tail:
+            yield child.tail
+
+
+def _lxml_text(element, max_chars):
+    parts, length = [], 0
+    for s in _lxml_strings(element):
+        s = s.strip()
+        if s:
+            parts.append(s)
+            length += len(s) + 1
+            if length > max_chars:
+                break
+    return " ".join(parts)[:max_chars]
+
+
+def extract_with_lxml(html, url=None, max_chars=MAX_CONTENT_CHARS, rules=None):
+    html = XML_DECLARATION.sub("", html, count=1)
+    if not html or html.isspace():
+        return ""
+    try:
+        root = lxml.html.fromstring(html)
+    except (ValueError, lxml.etree.ParserError):
+        return extract_streaming(html, url, max_chars, rules)
+    for rule in (rules if rules is not None else rules_for(url)):
+        found = root.xpath(_xpath_for(rule))
+        if found:
+            return _lxml_text(found[0], max_chars)
+    body = root.find(".//body")
+    return _lxml_text(body if body is not None else root, max_chars)
+
+
+def extract_streaming(html, url=None, max_chars=MAX_CONTENT_CHARS, rules=None, chunk_size=16384):
+    extractor = StreamingArticleExtractor(url, max_chars, rules)
+    for start in range(0, len(html), chunk_size):
+        if extractor.feed(html[start:start + chunk_size]):
+            break
+    extractor.close()
+    return extractor.text()
+
+
+def extract_article(html, url=None, max_chars=MAX_CONTENT_CHARS, backend="stream"):
+    """Article text for `html` (first `max_chars` chars), using `url` to pick site rules."""
+    if backend == "lxml" or (backend == "auto" and HAS_LXML):
+        return extract_with_lxml(html, url, max_chars)
+    return extract_streaming(html, url, max_chars)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Extract article text from a saved HTML page.")
+    parser.add_argument("path", help="HTML file, or '-' for stdin")
+    parser.add_argument("--url", help="Original URL, used to pick per-site rules")
+    parser.add_argument("--max-chars", type=int, default=MAX_CONTENT_CHARS)
+    parser.add_argument("--backend", choices=["stream", "lxml", "auto"], default="stream")
+    args = parser.parse_args(argv)
+
+    if args.path == "-":
+        html = sys.stdin.read()
+    else:
+        with open(args.path, "r", encoding="utf-8", errors="replace") as f:
+            html = f.read()
+    print(extract_article(html, args.url, args.max_chars, args.backend))
+
+
+if __name__ == "__main__":
+    main()
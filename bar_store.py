@@ -0,0 +1,215 @@
+
+import argparse
+import csv
+import json
+import os
+import re
+import shutil
+from datetime import datetime, timezone
+
+import numpy as np
+
+from ops_config import parse_ts
+from text_decoding import read_text
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_ROOT = os.path.join(ROOT, ".cache", "bars")
+# Same field names as the Bar interface in services/strategy/BacktestEngine.ts.
+COLUMNS = {"t": np.int64, "o": np.float64, "h": np.float64, "l": np.float64, "c": np.float64, "v": np.float64}
+# dataService's OHLCV shape, accepted on ingest.
+OHLCV_FIELDS = {"date": "t", "open": "o", "high": "h", "low": "l", "close": "c", "volume": "v"}
+UNSAFE_RE = re.compile(r'[^A-Za-z0-9._-]')
+
+
+def to_millis(value):
+    if isinstance(value, (int, float)):
+        # Seconds vs milliseconds: anything before 2001 in ms is really seconds.
+        return int(value * 1000) if value < 1e11 else int(value)
+    text = str(value).strip()
+    if text.isdigit() and len(text) == 8:
+        ts = datetime.strptime(text, "%Y%m%d")
+    else:
+        ts = parse_ts(text)
+    if ts.tzinfo is None:
+        ts = ts.replace(tzinfo=timezone.utc)
+    return int(ts.timestamp() * 1000)
+
+
+def columns_from_rows(rows):
+    """Bar {t,o,h,l,c,v} or OHLCV {date,open,...} dicts -> column arrays."""
+    cols = {k: [] for k in COLUMNS}
+    for row in rows:
+        row = {OHLCV_FIELDS.get(k, k): v for k, v in row.items()}
+        cols["t"].append(to_millis(row["t"]))
+        for k in "ohlcv":
+            value = row.get(k)
+            cols[k].append(float(value) if value not in (None, "") else np.nan)
+    return {k: np.asarray(v, dtype=COLUMNS[k]) for k, v in cols.items()}
+
+
+def read_bar_file(path):
+    """A JSON array (or {"bars"/"candles": [...]}) or a CSV with t/date and o/open... columns."""
+    text, _ = read_text(path)
+    if path.lower().endswith(".csv"):
+        rows = list(csv.DictReader(text.splitlines()))
+        rows = [{k.strip().lower(): v for k, v in r.items()} for r in rows]
+    else:
+        rows = json.loads(text)
+        if isinstance(rows, dict):
+            rows = rows.get("bars") or rows.get("candles") or []
+    return columns_from_rows(rows)
+
+
+class BarStore:
+    """
+    Columnar daily bars on disk: <root>/<market>/<ticker>/{t,o,h,l,c,v}.npy.
+
+    Every column is a plain .npy file, so readers get zero-copy memory maps
+    (`np.load(..., mmap_mode="r")`) and only the columns they touch are paged in.
+    Precomputed indicator series live next to the bars under ind/.
+    """
+
+    def __init__(self, root=DEFAULT_ROOT):
+        self.root = root
+
+    def path(self, market, ticker, *parts):
+        return os.path.join(self.root, market.upper(), UNSAFE_RE.sub("_", ticker.upper()), *parts)
+
+    def markets(self):
+        if not os.path.isdir(self.root):
+            return []
+        return sorted(d for d in os.listdir(self.root) if os.path.isdir(os.path.join(self.root, d)))
+
+    def tickers(self, market):
+        base = os.path.join(self.root, market.upper())
+        if not os.path.isdir(base):
+            return []
+        return sorted(d for d in os.listdir(base) if os.path.isfile(os.path.join(base, d, "t.npy")))
+
+    def read(self, market, ticker, columns="tohlcv"):
+        return {k: np.load(self.path(market, ticker, f"{k}.npy"), mmap_mode="r") for k in columns}
+
+    def length(self, market, ticker):
+        # The .npy header alone gives the row count; no data is read.
+        return np.load(self.path(market, ticker, "t.npy"), mmap_mode="r").shape[0]
+
+    def write(self, market, ticker, cols):
+        """
+        Merges `cols` into what is stored: sorted by t, and a bar that is already
+        stored for the same t is replaced by the new one.
+        """
+        d = self.path(market, ticker)
+        if os.path.isfile(os.path.join(d, "t.npy")):
+            old = {k: np.array(v) for k, v in self.read(market, ticker).items()}
+            cols = {k: np.concatenate([old[k], np.asarray(cols[k], dtype=COLUMNS[k])]) for k in COLUMNS}
+        # Stable sort + keep the last row per timestamp, so new data wins.
+        order = np.argsort(cols["t"], kind="stable")
+        t = cols["t"][order]
+        keep = np.append(t[1:] != t[:-1], True)
+        os.makedirs(d, exist_ok=True)
+        for k, dtype in COLUMNS.items():
+            tmp = os.path.join(d, f"{k}.tmp.npy")
+            np.save(tmp, np.ascontiguousarray(np.asarray(cols[k], dtype=dtype)[order][keep]))
+            os.replace(tmp, os.path.join(d, f"{k}.npy"))
+        return int(keep.sum())
+
+    def close_fingerprint(self, market, ticker):
+        """Identifies the stored closes (what every indicator is computed from) without reading them."""
+        st = os.stat(self.path(market, ticker, "c.npy"))
+        return [st.st_size, st.st_mtime_ns]
+
+    def write_indicators(self, market, ticker, keys, values, source):
+        """
+        `values` is a (len(keys) x bars) matrix stored as one ind/values.npy; the meta
+        (key order and the closes fingerprint it was computed from) is dropped before
+        it is replaced and written after it, so a half-finished run reads as missing
+        and is recomputed next time.
+        """
+        d = self.path(market, ticker, "ind")
+        if not os.path.isdir(d):
+            os.makedirs(d)
+        meta_path = os.path.join(d, "_meta.json")
+        try:
+            os.remove(meta_path)
+        except FileNotFoundError:
+            pass
+        tmp = os.path.join(d, "values.tmp.npy")
+        np.save(tmp, values)
+        os.replace(tmp, os.path.join(d, "values.npy"))
+        meta = {"bars": int(values.shape[1]), "source": source, "keys": list(keys)}
+        tmp = meta_path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(meta, f)
+        os.replace(tmp, meta_path)
+
+    def indicator_meta(self, market, ticker):
+        try:
+            with open(self.path(market, ticker, "ind", "_meta.json"), "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def read_indicators(self, market, ticker):
+        """{key: series} of precomputed indicators (keys as BacktestEngine's getIndicatorKey names them)."""
+        meta = self.indicator_meta(market, ticker)
+        if not meta:
+            return {}
+        values = np.load(self.path(market, ticker, "ind", "values.npy"), mmap_mode="r")
+        return {key: values[i] for i, key in enumerate(meta["keys"])}
+
+    def read_indicator(self, market, ticker, key):
+        return self.read_indicators(market, ticker)[key]
+
+    def remove(self, market, ticker):
+        shutil.rmtree(self.path(market, ticker), ignore_errors=True)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Columnar, memory-mapped OHLCV bar store.")
+    parser.add_argument("--root", default=DEFAULT_ROOT)
+    sub = parser.add_subparsers(dest="command", required=True)
+    p = sub.add_parser("ingest", help="Merge bar files (JSON Bar[]/OHLCV[] or CSV) into the store")
+    p.add_argument("market", help="KR or US")
+    p.add_argument("files", nargs="+")
+    p.add_argument("--ticker", help="Ticker for a single file (default: the file name without extension)")
+    p = sub.add_parser("ls", help="List stored tickers")
+    p.add_argument("market", nargs="?")
+    p = sub.add_parser("show", help="Print the last bars (and precomputed indicators) of a ticker")
+    p.add_argument("market")
+    p.add_argument("ticker")
+    p.add_argument("-n", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    store = BarStore(args.root)
+    if args.command == "ingest":
+        if args.ticker and len(args.files) > 1:
+            parser.error("--ticker only makes sense with one file")
+        total = 0
+        for path in args.files:
+            ticker = args.ticker or os.path.splitext(os.path.basename(path))[0]
+            try:
+                cols = read_bar_file(path)
+            except (OSError, ValueError, KeyError) as e:
+                print(f"⚠️ {path}: {e}")
+                continue
+            n = store.write(args.market, ticker, cols)
+            total += len(cols["t"])
+            print(f"📥 {args.market.upper()}/{ticker.upper()}: {n} bars")
+        print(f"✅ Ingested {total} rows from {len(args.files)} files into {os.path.relpath(store.root)}")
+    elif args.command == "ls":
+        for market in ([args.market.upper()] if args.market else store.markets()):
+            tickers = store.tickers(market)
+            bars = sum(store.length(market, t) for t in tickers)
+            print(f"{market}: {len(tickers)} tickers, {bars} bars")
+    elif args.command == "show":
+        cols = store.read(args.market, args.ticker)
+        ind = store.read_indicators(args.market, args.ticker)
+        for i in range(max(0, len(cols["t"]) - args.n), len(cols["t"])):
+            day = datetime.fromtimestamp(cols["t"][i] / 1000, timezone.utc).strftime("%Y-%m-%d")
+            extra = " ".join(f"{k}={ind[k][i]:.2f}" for k in ind if i < len(ind[k]))
+            print(f"{day} o={cols['o'][i]:g} h={cols['h'][i]:g} l={cols['l'][i]:g} c={cols['c'][i]:g} v={cols['v'][i]:g} {extra}")
+    return 0
+
+
+if __name__ == "__main__":
+    main()
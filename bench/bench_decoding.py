@@ -0,0 +1,106 @@
+import argparse
+import json
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import text_decoding  # noqa: E402
+from load_generator import BROKERS, COMPANIES, EN_HEADLINES, KO_HEADLINES  # noqa: E402
+
+# What debug_cat.py / debug_cat_force.py get pointed at: Windows-exported logs and dumps.
+ENCODINGS = {"cp949": "cp949", "utf-16": "utf-16", "utf-16-le (no BOM)": "utf-16-le", "utf-8": "utf-8"}
+
+
+def synth_text(mib, seed=0):
+    """Korean/English report lines, roughly `mib` MiB once encoded as UTF-8."""
+    rng = random.Random(seed)
+    lines, size = [], 0
+    while size < mib * 1024 * 1024:
+        name, ticker = rng.choice(COMPANIES)
+        line = (f"{rng.randint(0, 23):02d}:{rng.randint(0, 59):02d} [{rng.choice(BROKERS)}] {name}({ticker}) "
+                f"{rng.choice(KO_HEADLINES)} / {rng.choice(EN_HEADLINES)} 목표가 {rng.randint(10, 900) * 1000:,}원\r\n")
+        lines.append(line)
+        size += len(line.encode("utf-8"))
+    return "".join(lines)
+
+
+def write_files(directory, mib, seed=0):
+    text = synth_text(mib, seed)
+    files = {}
+    for label, encoding in ENCODINGS.items():
+        path = os.path.join(directory, f"sample.{encoding}.txt")
+        with open(path, "w", encoding=encoding, newline="") as f:
+            f.write(text)
+        files[label] = path
+    return files
+
+
+def read_try_each(path):
+    # The original debug_cat.py loop: a full decode per candidate until one doesn't raise.
+    for enc in ['utf-8', 'euc-kr', 'cp949', 'utf-16']:
+        try:
+            with open(path, 'r', encoding=enc) as f:
+                return f.read(), enc
+        except Exception:
+            continue
+    return None, None
+
+
+def read_shared(path):
+    # Each debug_cat run is a fresh process, so the per-path encoding cache starts empty.
+    text_decoding._encoding_cache.clear()
+    return text_decoding.read_text(path)
+
+
+READERS = {"try-each (baseline)": read_try_each, "read_text": read_shared}
+
+
+def bench_reader(fn, path, rounds):
+    tracemalloc.start()
+    _, encoding = fn(path)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    # A read takes milliseconds, so the fastest round is steadier than the total.
+    times = []
+    for _ in range(rounds):
+        started = time.perf_counter()
+        fn(path)
+        times.append(time.perf_counter() - started)
+
+    mib = os.path.getsize(path) / (1024 * 1024)
+    return {"encoding": encoding, "mib": mib, "seconds": sum(times), "mib_per_sec": mib / min(times), "peak_kib": peak / 1024}
+
+
+def run(mib=16, rounds=10, seed=0):
+    directory = tempfile.mkdtemp(prefix="bench_decoding_")
+    try:
+        files = write_files(directory, mib, seed)
+        return {f"{label} {reader}": bench_reader(fn, path, rounds)
+                for label, path in files.items() for reader, fn in READERS.items()}
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark debug_cat-style decoding of large cp949/utf-16 files.")
+    parser.add_argument("--mib", type=float, default=16, help="Size of each generated file (as UTF-8)")
+    parser.add_argument("--rounds", type=int, default=10, help="Reads per file and reader")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    args = parser.parse_args()
+
+    results = run(args.mib, args.rounds, args.seed)
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        print(f"{'file / reader':<40} {'detected':>10} {'MiB/sec':>9} {'peak KiB':>10}")
+        for name, r in results.items():
+            print(f"{name:<40} {str(r['encoding']):>10} {r['mib_per_sec']:>9.1f} {r['peak_kib']:>10.0f}")
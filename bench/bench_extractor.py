@@ -0,0 +1,92 @@
+
+import argparse
+import json
+import os
+import sys
+import time
+import tracemalloc
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import article_extractor  # noqa: E402
+
+CORPUS_DIR = os.path.join(ROOT, "bench", "corpus")
+
+
+def load_corpus(corpus_dir=CORPUS_DIR):
+    with open(os.path.join(corpus_dir, "manifest.json"), "r", encoding="utf-8") as f:
+        manifest = json.load(f)
+    pages = []
+    for entry in manifest:
+        with open(os.path.join(corpus_dir, entry["file"]), "r", encoding="utf-8") as f:
+            pages.append((entry["url"], f.read()))
+    return pages
+
+
+def extract_bs4_baseline(html, url=None):
+    # The original fetch_url_content() path from test_url_pipeline.py.
+    from bs4 import BeautifulSoup
+    soup = BeautifulSoup(html, 'html.parser')
+    article = soup.find('div', class_='news_body') or soup.find('div', class_='article_view') or soup.find('body')
+    if article:
+        text = article.get_text(separator=' ', strip=True)
+    else:
+        text = soup.get_text(separator=' ', strip=True)
+    return text[:1000]
+
+
+def available_backends():
+    backends = {}
+    try:
+        import bs4  # noqa: F401
+        backends["bs4 (baseline)"] = extract_bs4_baseline
+    except ImportError:
+        pass
+    backends["stream"] = lambda html, url: article_extractor.extract_article(html, url, backend="stream")
+    if article_extractor.HAS_LXML:
+        backends["lxml"] = lambda html, url: article_extractor.extract_article(html, url, backend="lxml")
+    return backends
+
+
+def bench_backend(fn, pages, rounds):
+    # Peak memory is measured on a separate pass so tracemalloc overhead doesn't skew throughput.
+    tracemalloc.start()
+    peak = 0
+    for url, html in pages:
+        tracemalloc.reset_peak()
+        fn(html, url)
+        peak = max(peak, tracemalloc.get_traced_memory()[1])
+    tracemalloc.stop()
+
+    started = time.perf_counter()
+    for _ in range(rounds):
+        for url, html in pages:
+            fn(html, url)
+    elapsed = time.perf_counter() - started
+
+    n = rounds * len(pages)
+    return {"pages": n, "seconds": elapsed, "pages_per_sec": n / elapsed, "peak_kib": peak / 1024}
+
+
+def run(rounds=20, corpus_dir=CORPUS_DIR):
+    pages = load_corpus(corpus_dir)
+    return {name: bench_backend(fn, pages, rounds) for name, fn in available_backends().items()}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark article extraction over the saved HTML corpus.")
+    parser.add_argument("--rounds", type=int, default=20, help="Passes over the corpus per backend")
+    parser.add_argument("--corpus", default=CORPUS_DIR)
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    args = parser.parse_args()
+
+    results = run(args.rounds, args.corpus)
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        base = results.get("bs4 (baseline)")
+        print(f"{'backend':<16} {'pages/sec':>10} {'peak KiB':>10} {'speedup':>8}")
+        for name, r in results.items():
+            speedup = f"{r['pages_per_sec'] / base['pages_per_sec']:.1f}x" if base else "-"
+            print(f"{name:<16} {r['pages_per_sec']:>10.1f} {r['peak_kib']:>10.0f} {speedup:>8}")
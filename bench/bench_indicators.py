@@ -0,0 +1,159 @@
+
+import argparse
+import json
+import math
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import indicator_batch  # noqa: E402
+from bar_store import BarStore  # noqa: E402
+
+KEYS = indicator_batch.DEFAULT_SET
+
+
+def synth_universe(n_tickers, min_bars, max_bars, seed=0):
+    rng = np.random.default_rng(seed)
+    universe = []
+    for i in range(n_tickers):
+        n = int(rng.integers(min_bars, max_bars + 1))
+        closes = np.round(1000 * np.cumprod(1 + rng.normal(0, 0.02, n)))
+        t = 1_600_000_000_000 + np.arange(n, dtype=np.int64) * 86_400_000
+        universe.append((f"T{i:05d}", {"t": t, "o": closes, "h": closes, "l": closes, "c": closes, "v": np.ones(n)}))
+    return universe
+
+
+# Straight ports of the TechnicalAnalysis.ts loops: what every backtest run does per ticker today.
+def ts_sma(data, period):
+    if len(data) < period:
+        return [math.nan] * len(data)
+    results = []
+    s = 0.0
+    for i in range(period):
+        s += data[i]
+    results.append(s / period)
+    for i in range(period, len(data)):
+        s = s - data[i - period] + data[i]
+        results.append(s / period)
+    return [math.nan] * (period - 1) + results
+
+
+def ts_ema(data, period):
+    if len(data) < period:
+        return [math.nan] * len(data)
+    k = 2 / (period + 1)
+    results = [math.nan] * (period - 1)
+    results.append(sum(data[:period]) / period)
+    for i in range(period, len(data)):
+        results.append(data[i] * k + results[-1] * (1 - k))
+    return results
+
+
+def ts_rsi(data, period=14):
+    if len(data) < period + 1:
+        return [math.nan] * len(data)
+    results = [math.nan] * period
+    gain = loss = 0.0
+    for i in range(1, period + 1):
+        change = data[i] - data[i - 1]
+        if change > 0:
+            gain += change
+        else:
+            loss += abs(change)
+    gain /= period
+    loss /= period
+    results.append(100 - 100 / (1 + gain / loss) if loss else 100.0)
+    for i in range(period + 1, len(data)):
+        change = data[i] - data[i - 1]
+        gain = (gain * (period - 1) + max(change, 0)) / period
+        loss = (loss * (period - 1) + max(-change, 0)) / period
+        results.append(100 - 100 / (1 + gain / loss) if loss else 100.0)
+    return results
+
+
+def bench_loop(universe):
+    keys = [k for k in KEYS if not k.startswith("BB_")]  # the engine's own per-run set
+    started = time.perf_counter()
+    for _, cols in universe:
+        closes = cols["c"].tolist()
+        for key in keys:
+            name, _, period = key.rpartition("_")
+            {"SMA": ts_sma, "EMA": ts_ema, "RSI": ts_rsi}[name](closes, int(period))
+    return time.perf_counter() - started, len(keys)
+
+
+def bench_vectorized(universe):
+    started = time.perf_counter()
+    series = sorted((cols["c"] for _, cols in universe), key=len)
+    for start in range(0, len(series), indicator_batch.CHUNK_TICKERS):
+        indicator_batch.compute(indicator_batch.stack(series[start:start + indicator_batch.CHUNK_TICKERS]), KEYS)
+    return time.perf_counter() - started, len(KEYS)
+
+
+def bench_store(universe):
+    with tempfile.TemporaryDirectory() as root:
+        store = BarStore(root)
+        started = time.perf_counter()
+        for ticker, cols in universe:
+            store.write("KR", ticker, cols)
+        ingest = time.perf_counter() - started
+
+        started = time.perf_counter()
+        indicator_batch.precompute(store, "KR", KEYS)
+        job = time.perf_counter() - started
+
+        started = time.perf_counter()
+        indicator_batch.precompute(store, "KR", KEYS)
+        noop = time.perf_counter() - started
+
+        started = time.perf_counter()
+        for ticker, _ in universe:
+            float(store.read_indicator("KR", ticker, "SMA_20")[-1])
+        lookup = time.perf_counter() - started
+    return ingest, job, noop, lookup
+
+
+def run(n_tickers=500, min_bars=250, max_bars=2500, seed=0):
+    universe = synth_universe(n_tickers, min_bars, max_bars, seed)
+    bars = sum(len(cols["t"]) for _, cols in universe)
+    loop_s, loop_keys = bench_loop(universe)
+    vec_s, vec_keys = bench_vectorized(universe)
+    ingest_s, job_s, noop_s, lookup_s = bench_store(universe)
+    return {
+        "tickers": n_tickers,
+        "bars": bars,
+        "loop (TS port)": {"seconds": loop_s, "indicators": loop_keys, "tickers_per_sec": n_tickers / loop_s},
+        "numpy batch": {"seconds": vec_s, "indicators": vec_keys, "tickers_per_sec": n_tickers / vec_s},
+        "store ingest": {"seconds": ingest_s, "tickers_per_sec": n_tickers / ingest_s},
+        "precompute job": {"seconds": job_s, "indicators": vec_keys, "tickers_per_sec": n_tickers / job_s},
+        "precompute (unchanged)": {"seconds": noop_s, "tickers_per_sec": n_tickers / noop_s},
+        "mmap lookup": {"seconds": lookup_s, "tickers_per_sec": n_tickers / lookup_s},
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark indicator precompute: TS-style loops vs the NumPy batch job.")
+    parser.add_argument("--tickers", type=int, default=500)
+    parser.add_argument("--min-bars", type=int, default=250)
+    parser.add_argument("--max-bars", type=int, default=2500)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    args = parser.parse_args()
+
+    results = run(args.tickers, args.min_bars, args.max_bars, args.seed)
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        print(f"{results['tickers']} tickers, {results['bars']} bars")
+        base = results["loop (TS port)"]["tickers_per_sec"]
+        print(f"{'stage':<24} {'indicators':>10} {'tickers/sec':>12} {'vs loop':>8}")
+        for name, r in results.items():
+            if isinstance(r, dict):
+                ind = r.get("indicators", "-")
+                print(f"{name:<24} {ind:>10} {r['tickers_per_sec']:>12.0f} {r['tickers_per_sec'] / base:>7.1f}x")
@@ -0,0 +1,98 @@
+import argparse
+import json
+import os
+import random
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timezone
+
+import requests
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from load_generator import CHANNELS, synth_message  # noqa: E402
+from postgrest_standin import StandIn  # noqa: E402
+from supabase_writer import BatchedWriter  # noqa: E402
+
+TABLE = "telegram_messages"
+KEY = "bench"
+
+
+def synth_rows(n, seed=0):
+    rng = random.Random(seed)
+    now = datetime.now(timezone.utc).isoformat()
+    return [{"channel": rng.choice(CHANNELS), "message": synth_message(rng, f"#bench-{i}")[2], "created_at": now}
+            for i in range(n)]
+
+
+def insert_row_by_row(url, rows, batch_size):
+    # One POST per message, as the collectors did before supabase_writer. A fresh session per
+    # round (not the process-wide rest_session), so closing it leaves other callers alone.
+    with requests.Session() as session:
+        session.headers.update({"apikey": KEY, "Authorization": f"Bearer {KEY}"})
+        for row in rows:
+            session.post(f"{url}/rest/v1/{TABLE}", json=row, timeout=30).raise_for_status()
+    return len(rows)
+
+
+def insert_batched(url, rows, batch_size):
+    writer = BatchedWriter(url, KEY, batch_size=batch_size, flush_interval=60)
+    with writer:
+        writer.add_many(TABLE, rows)
+    if writer.stats["rows_failed"]:
+        raise RuntimeError(f"{writer.stats['rows_failed']} rows failed")
+    return writer.stats["rows_written"]
+
+
+METHODS = {"row-by-row (baseline)": insert_row_by_row, "BatchedWriter": insert_batched}
+
+
+def bench_method(fn, url, rows, rounds, batch_size):
+    # The in-process stand-in allocates on its own threads too, so peak_kib covers client and server.
+    tracemalloc.start()
+    fn(url, rows, batch_size)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    started = time.perf_counter()
+    written = 0
+    for _ in range(rounds):
+        written += fn(url, rows, batch_size)
+    elapsed = time.perf_counter() - started
+    return {"rows": written, "seconds": elapsed, "rows_per_sec": written / elapsed, "peak_kib": peak / 1024}
+
+
+def run(n_rows=2000, rounds=3, batch_size=200, url=None, seed=0):
+    """`url` points at an already running stand-in (`ops standin`); by default one is started in-process."""
+    standin = None
+    if url is None:
+        standin = StandIn()
+        url = standin.serve()
+    rows = synth_rows(n_rows, seed)
+    try:
+        return {name: bench_method(fn, url, rows, rounds, batch_size) for name, fn in METHODS.items()}
+    finally:
+        if standin is not None:
+            standin.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark batched vs row-by-row telegram_messages inserts against a local stand-in.")
+    parser.add_argument("--rows", type=int, default=2000, help="Messages inserted per round")
+    parser.add_argument("--rounds", type=int, default=3)
+    parser.add_argument("--batch-size", type=int, default=200)
+    parser.add_argument("--url", help="Base URL of a running stand-in; default starts one in-process")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    args = parser.parse_args()
+
+    results = run(args.rows, args.rounds, args.batch_size, args.url, args.seed)
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        base = results["row-by-row (baseline)"]["rows_per_sec"]
+        print(f"{'method':<24} {'rows/sec':>10} {'peak KiB':>10} {'speedup':>8}")
+        for name, r in results.items():
+            print(f"{name:<24} {r['rows_per_sec']:>10.0f} {r['peak_kib']:>10.0f} {r['rows_per_sec'] / base:>7.1f}x")
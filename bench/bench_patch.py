@@ -0,0 +1,95 @@
+import argparse
+import json
+import os
+import re
+import sys
+import time
+import tracemalloc
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import patch_engine  # noqa: E402
+from text_decoding import read_text  # noqa: E402
+
+TARGET = os.path.join(ROOT, "services", "gemini", "screenerService.ts")
+MANIFEST = os.path.join(ROOT, "patches", "screener_v3.json")
+
+# The lookaheads the original patch_screener_v3.py relied on: each function ran up to a named neighbour.
+REGEX_PATTERNS = {
+    "runChartPatternScreener": r"export async function runChartPatternScreener[\s\S]*?(?=export async function scanForBFLStocks)",
+    "runStructuralGrowthScan": r"export async function runStructuralGrowthScan[\s\S]*?(?=export async function runAlphaCoreScan)",
+}
+EXPORT_NAME = re.compile(r"(export (?:default )?(?:async )?function\*? |export (?:const|let) )(\w+)")
+
+
+def scaled_source(src, copies):
+    """`src` followed by copies-1 renamed copies, so the patched functions stay first and unique."""
+    parts = [src]
+    for i in range(1, copies):
+        parts.append(EXPORT_NAME.sub(lambda m: f"{m.group(1)}{m.group(2)}_{i}", src))
+    return "\n".join(parts)
+
+
+def replace_regex(src, patches):
+    for p in patches:
+        pattern = REGEX_PATTERNS[p['function']]
+        if re.search(pattern, src):
+            src = re.sub(pattern, lambda _: p['replacement'] + "\n\n", src, count=1)
+    return src
+
+
+def replace_engine(src, patches):
+    # apply_patches() without the file I/O: one tokenize pass, then splice from the end.
+    spans = patch_engine.find_exported_functions(src)
+    edits = sorted(((spans[p['function']], p['replacement']) for p in patches if p['function'] in spans),
+                   key=lambda e: -e[0][0])
+    for (start, end), replacement in edits:
+        src = src[:start] + replacement + src[end:]
+    return src
+
+
+METHODS = {"regex (baseline)": replace_regex, "patch_engine": replace_engine}
+
+
+def bench_method(fn, src, patches, rounds):
+    tracemalloc.start()
+    out = fn(src, patches)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    if out == src:
+        raise RuntimeError(f"{fn.__name__} did not change the input")
+
+    started = time.perf_counter()
+    for _ in range(rounds):
+        fn(src, patches)
+    elapsed = time.perf_counter() - started
+    return {"kib": len(src.encode("utf-8")) / 1024, "seconds": elapsed, "files_per_sec": rounds / elapsed,
+            "peak_kib": peak / 1024}
+
+
+def run(rounds=50, scales=(1, 8), target=TARGET, manifest=MANIFEST):
+    src, _ = read_text(target)
+    patches = patch_engine.load_manifest(manifest)
+    results = {}
+    for copies in scales:
+        scaled = scaled_source(src, copies)
+        for name, fn in METHODS.items():
+            results[f"{copies}x {name}"] = bench_method(fn, scaled, patches, rounds)
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark screener_v3 function replacement: original regexes vs patch_engine.")
+    parser.add_argument("--rounds", type=int, default=50, help="Replacements per input and method")
+    parser.add_argument("--scales", type=int, nargs="+", default=[1, 8], help="Input sizes as multiples of screenerService.ts")
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    args = parser.parse_args()
+
+    results = run(args.rounds, args.scales)
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        print(f"{'input / method':<24} {'KiB':>7} {'files/sec':>10} {'peak KiB':>10}")
+        for name, r in results.items():
+            print(f"{name:<24} {r['kib']:>7.0f} {r['files_per_sec']:>10.1f} {r['peak_kib']:>10.0f}")
@@ -0,0 +1,212 @@
+"""
+Runs the bench_* scripts as one suite and tracks them against a saved baseline.
+
+    python bench/suite.py run --save               # record bench/baselines/<host>.json
+    python bench/suite.py compare                  # rerun, exit 1 on a regression
+    python bench/suite.py compare --current new.json --threshold 0.1
+
+Every case reports a throughput (higher is better) and a tracemalloc peak
+(lower is better). Baselines are per machine: comparing across hosts warns.
+"""
+import argparse
+import importlib
+import json
+import os
+import platform
+import subprocess
+import sys
+from datetime import datetime, timezone
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.dirname(BENCH_DIR)
+sys.path.insert(0, BENCH_DIR)
+
+BASELINE_DIR = os.path.join(BENCH_DIR, "baselines")
+FORMAT = 1
+
+# name -> (module, throughput key, unit, {profile: run() kwargs})
+BENCHES = {
+    "extract": ("bench_extractor", "pages_per_sec", "pages/s", {"quick": {"rounds": 5}, "full": {"rounds": 20}}),
+    "decode": ("bench_decoding", "mib_per_sec", "MiB/s", {"quick": {"mib": 4, "rounds": 5}, "full": {"mib": 16, "rounds": 10}}),
+    "patch": ("bench_patch", "files_per_sec", "files/s", {"quick": {"rounds": 10}, "full": {"rounds": 50}}),
+    "ingest": ("bench_ingest", "rows_per_sec", "rows/s",
+               {"quick": {"n_rows": 500, "rounds": 2}, "full": {"n_rows": 2000, "rounds": 3}}),
+}
+DEFAULT_THRESHOLD = 0.15
+DEFAULT_MEMORY_THRESHOLD = 0.25
+# Peaks this small move with interpreter noise; growth below it never counts as a regression.
+MIN_PEAK_DELTA_KIB = 64
+
+
+def default_baseline():
+    return os.path.join(BASELINE_DIR, f"{platform.node() or 'local'}.json")
+
+
+def machine_info():
+    return {"host": platform.node(), "system": platform.platform(), "machine": platform.machine(),
+            "python": platform.python_version(), "cpus": os.cpu_count()}
+
+
+def git_commit():
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True, timeout=10)
+        return out.stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def run_bench(name, profile):
+    module_name, key, unit, kwargs = BENCHES[name]
+    results = importlib.import_module(module_name).run(**kwargs[profile])
+    return {f"{name}/{case}": {"throughput": r[key], "unit": unit, "peak_kib": r["peak_kib"]}
+            for case, r in results.items() if isinstance(r, dict) and key in r}
+
+
+def run_suite(names, profile="full", repeat=1):
+    # Best of `repeat`: noise only ever makes a run slower, and a peak can only be inflated by it.
+    cases = {}
+    for i in range(repeat):
+        for name in names:
+            print(f"⏱️ {name} ({profile}, pass {i + 1}/{repeat})", file=sys.stderr, flush=True)
+            for case, r in run_bench(name, profile).items():
+                best = cases.setdefault(case, dict(r))
+                best["throughput"] = max(best["throughput"], r["throughput"])
+                best["peak_kib"] = min(best["peak_kib"], r["peak_kib"])
+    return {
+        "format": FORMAT,
+        "created": datetime.now(timezone.utc).isoformat(),
+        "commit": git_commit(),
+        "machine": machine_info(),
+        "profile": profile,
+        "repeat": repeat,
+        "benches": list(names),
+        "results": {case: {"throughput": round(r["throughput"], 3), "unit": r["unit"], "peak_kib": round(r["peak_kib"], 1)}
+                    for case, r in cases.items()},
+    }
+
+
+def load(path):
+    with open(path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    if data.get("format") != FORMAT:
+        raise ValueError(f"{path}: unsupported baseline format {data.get('format')!r}")
+    return data
+
+
+def save(data, path):
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False, indent=1)
+        f.write("\n")
+
+
+def compare(baseline, current, threshold=DEFAULT_THRESHOLD, memory_threshold=DEFAULT_MEMORY_THRESHOLD):
+    """Returns one row per case: (case, status, throughput ratio, peak ratio, reasons)."""
+    rows = []
+    base, cur = baseline["results"], current["results"]
+    for case in sorted(set(base) | set(cur)):
+        if case not in cur:
+            rows.append((case, "missing", None, None, ["not in current run"]))
+            continue
+        if case not in base:
+            rows.append((case, "new", None, None, []))
+            continue
+        b, c = base[case], cur[case]
+        speed = c["throughput"] / b["throughput"] if b["throughput"] else None
+        memory = c["peak_kib"] / b["peak_kib"] if b["peak_kib"] else None
+        reasons = []
+        if speed is not None and speed < 1 - threshold:
+            reasons.append(f"throughput {(1 - speed) * 100:.0f}% lower")
+        if memory is not None and memory > 1 + memory_threshold and c["peak_kib"] - b["peak_kib"] > MIN_PEAK_DELTA_KIB:
+            reasons.append(f"peak memory {(memory - 1) * 100:.0f}% higher")
+        rows.append((case, "regressed" if reasons else "ok", speed, memory, reasons))
+    return rows
+
+
+def print_results(data):
+    print(f"{'case':<48} {'throughput':>16} {'peak KiB':>10}")
+    for case, r in data["results"].items():
+        print(f"{case:<48} {r['throughput']:>10.1f} {r['unit']:<5} {r['peak_kib']:>10.0f}")
+
+
+def print_comparison(rows):
+    icons = {"ok": "🟢", "regressed": "🔴", "missing": "⚪", "new": "🆕"}
+    print(f"   {'case':<48} {'speed':>8} {'memory':>8}")
+    for case, status, speed, memory, reasons in rows:
+        cols = "".join(f"{r:>8.2f}x" if r is not None else f"{'-':>9}" for r in (speed, memory))
+        print(f"{icons[status]} {case:<48}{cols}  {'; '.join(reasons)}".rstrip())
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Python tooling benchmark suite with baseline regression checks.")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    def add_run_args(p):
+        p.add_argument("--only", nargs="+", choices=list(BENCHES), help="Benches to run (default: all)")
+        p.add_argument("--profile", choices=["quick", "full"], help="Workload size (default: full, or the baseline's)")
+        p.add_argument("--repeat", type=int, help="Runs per bench; the best is kept (default: 1, or the baseline's)")
+
+    p = sub.add_parser("run", help="Run the suite and print, or --save, the results")
+    add_run_args(p)
+    p.add_argument("--save", nargs="?", const="", metavar="PATH", help="Write the results as a baseline (default: bench/baselines/<host>.json)")
+    p.add_argument("--json", action="store_true", help="Print results as JSON")
+
+    p = sub.add_parser("compare", help="Compare a run against a baseline; exits 1 on a regression")
+    add_run_args(p)
+    p.add_argument("--baseline", help="Baseline JSON (default: bench/baselines/<host>.json)")
+    p.add_argument("--current", help="Results JSON to check instead of running the suite now")
+    p.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD, help="Allowed throughput drop (fraction)")
+    p.add_argument("--memory-threshold", type=float, default=DEFAULT_MEMORY_THRESHOLD, help="Allowed peak memory growth (fraction)")
+    p.add_argument("--strict", action="store_true", help="Also fail when a baseline case is missing from the run")
+    p.add_argument("--save", metavar="PATH", help="Also write the current results here")
+    args = parser.parse_args(argv)
+
+    if args.command == "run":
+        data = run_suite(args.only or list(BENCHES), args.profile or "full", args.repeat or 1)
+        if args.json:
+            print(json.dumps(data, ensure_ascii=False, indent=1))
+        else:
+            print_results(data)
+        if args.save is not None:
+            path = args.save or default_baseline()
+            save(data, path)
+            print(f"💾 Baseline saved to {path}", file=sys.stderr)
+        return 0
+
+    baseline_path = args.baseline or default_baseline()
+    if not os.path.exists(baseline_path):
+        print(f"❌ No baseline at {baseline_path}; record one with `suite.py run --save`")
+        return 2
+    baseline = load(baseline_path)
+    if args.current:
+        current = load(args.current)
+    else:
+        names = args.only or [n for n in baseline.get("benches", BENCHES) if n in BENCHES]
+        current = run_suite(names, args.profile or baseline.get("profile", "full"), args.repeat or baseline.get("repeat", 1))
+    if args.save:
+        save(current, args.save)
+
+    if baseline["machine"].get("host") != current["machine"].get("host"):
+        print(f"⚠️ Baseline is from {baseline['machine'].get('host')}, this run from {current['machine'].get('host')}: "
+              "throughput is not comparable across machines")
+    if baseline.get("profile") != current.get("profile"):
+        print(f"⚠️ Profiles differ ({baseline.get('profile')} vs {current.get('profile')})")
+    if args.only:
+        baseline = {**baseline, "results": {k: v for k, v in baseline["results"].items() if k.split("/", 1)[0] in args.only}}
+
+    rows = compare(baseline, current, args.threshold, args.memory_threshold)
+    print(f"Baseline {baseline_path} ({baseline.get('commit') or '?'}, {baseline['created'][:19]}) "
+          f"vs {current.get('commit') or '?'}: threshold {args.threshold:.0%} throughput, {args.memory_threshold:.0%} memory")
+    print_comparison(rows)
+
+    regressed = [r for r in rows if r[1] == "regressed"]
+    missing = [r for r in rows if r[1] == "missing"]
+    if regressed or (args.strict and missing):
+        print(f"❌ {len(regressed)} regressed" + (f", {len(missing)} missing" if missing else ""))
+        return 1
+    print(f"✅ No regressions across {sum(r[1] == 'ok' for r in rows)} cases")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,254 @@
+
+import argparse
+import os
+import pickle
+import re
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+try:
+    import re._parser as sre_parse  # Python 3.11+
+except ImportError:
+    import sre_parse
+
+from text_decoding import read_text
+
+DEFAULT_ROOTS = ['services', 'hooks', 'components', 'supabase/functions']
+DEFAULT_EXTENSIONS = {'.ts', '.tsx', '.js', '.jsx', '.mjs', '.cjs', '.py', '.sql'}
+SKIP_DIRS = {'node_modules', '.git', 'dist', 'build', '__pycache__'}
+INDEX_PATH = os.path.join('.cache', 'code_search_index.pkl')
+INDEX_VERSION = 2
+
+# Below this many files a process pool costs more to start than it saves.
+PARALLEL_MIN_FILES = 150
+
+
+def iter_files(roots, extensions=DEFAULT_EXTENSIONS):
+    for root in roots:
+        if os.path.isfile(root):
+            yield root
+            continue
+        for dirpath, dirnames, filenames in os.walk(root):
+            dirnames[:] = [d for d in dirnames if d not in SKIP_DIRS]
+            for name in filenames:
+                if os.path.splitext(name)[1] in extensions:
+                    yield os.path.join(dirpath, name)
+
+
+def trigrams(text):
+    text = text.lower()
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+def required_literals(pattern, flags=0):
+    """
+    Literal substrings every match of `pattern` must contain, read from the
+    top level of the parsed regex. Returns None when nothing is guaranteed
+    (e.g. top-level alternation), meaning the index cannot narrow the search.
+    """
+    try:
+        parsed = sre_parse.parse(pattern, flags)
+    except re.error:
+        return None
+
+    literals, run = [], []
+    for op, arg in parsed:
+        if op is sre_parse.LITERAL:
+            run.append(chr(arg))
+            continue
+        if run:
+            literals.append(''.join(run))
+            run = []
+        if op is sre_parse.BRANCH:
+            return None
+    if run:
+        literals.append(''.join(run))
+    literals = [lit for lit in literals if len(lit) >= 3]
+    return literals or None
+
+
+class TrigramIndex:
+    """
+    Persistent trigram index over the searched files.
+
+    Postings are stored as one integer bitmap per trigram (bit n = file slot n),
+    which keeps the pickle small and fast to load. update() re-indexes only
+    files whose mtime or size changed and drops deleted ones, so after the
+    first build a query costs one stat per file plus a few bitmap ANDs.
+    """
+
+    def __init__(self, path=INDEX_PATH):
+        self.path = path
+        self.files = {}     # path -> (slot, mtime_ns, size)
+        self.postings = {}  # trigram -> int bitmap of file slots
+        self.dirty = False
+        self._load()
+
+    def _load(self):
+        try:
+            with open(self.path, 'rb') as f:
+                data = pickle.load(f)
+        except (OSError, pickle.UnpicklingError, EOFError):
+            return
+        if data.get('version') != INDEX_VERSION:
+            return
+        self.files = data['files']
+        self.postings = data['postings']
+
+    def save(self):
+        if not self.dirty:
+            return
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        tmp = self.path + '.tmp'
+        with open(tmp, 'wb') as f:
+            data = {'version': INDEX_VERSION, 'files': self.files, 'postings': self.postings}
+            pickle.dump(data, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, self.path)
+        self.dirty = False
+
+    def _clear_slots(self, mask):
+        keep = ~mask
+        for g in list(self.postings):
+            bits = self.postings[g] & keep
+            if bits:
+                self.postings[g] = bits
+            else:
+                del self.postings[g]
+
+    def update(self, paths, jobs=None):
+        stale = []
+        current = set(paths)
+        for path in current:
+            st = os.stat(path)
+            entry = self.files.get(path)
+            if not entry or entry[1] != st.st_mtime_ns or entry[2] != st.st_size:
+                stale.append((path, st.st_mtime_ns, st.st_size))
+        # Files outside this query's roots stay indexed unless they were deleted.
+        removed = [p for p in self.files if p not in current and not os.path.exists(p)]
+
+        # Changed files keep their slot; deleted files free theirs. One sweep clears both.
+        mask = 0
+        for path in removed:
+            mask |= 1 << self.files.pop(path)[0]
+        for path, _, _ in stale:
+            if path in self.files:
+                mask |= 1 << self.files[path][0]
+        if mask:
+            self._clear_slots(mask)
+
+        used = {slot for slot, _, _ in self.files.values()}
+        free = (n for n in range(len(used) + len(stale) + 1) if n not in used)
+        for path, mtime, size, grams in _map(_index_file, stale, jobs):
+            slot = self.files[path][0] if path in self.files else next(free)
+            self.files[path] = (slot, mtime, size)
+            bit = 1 << slot
+            for g in grams:
+                self.postings[g] = self.postings.get(g, 0) | bit
+
+        self.dirty = self.dirty or bool(stale or removed)
+        return len(stale), len(removed)
+
+    def candidates(self, literals):
+        bits = None
+        for lit in literals:
+            for g in trigrams(lit):
+                bits = self.postings.get(g, 0) if bits is None else bits & self.postings.get(g, 0)
+                if not bits:
+                    return set()
+        if bits is None:
+            return set(self.files)
+        return {path for path, (slot, _, _) in self.files.items() if bits >> slot & 1}
+
+
+def _index_file(item):
+    path, mtime, size = item
+    text, _ = read_text(path)
+    return path, mtime, size, trigrams(text)
+
+
+def _search_file(item):
+    path, patterns, flags, context = item
+    try:
+        text, _ = read_text(path)
+    except OSError:
+        return path, []
+    regexes = [re.compile(p, flags) for p in patterns]
+    lines = text.splitlines()
+    hits = []
+    for i, line in enumerate(lines):
+        if any(r.search(line) for r in regexes):
+            start, end = max(0, i - context), min(len(lines), i + context + 1)
+            hits.append((i, [(j, lines[j]) for j in range(start, end)]))
+    return path, hits
+
+
+def _map(fn, items, jobs):
+    if jobs == 1 or len(items) < PARALLEL_MIN_FILES:
+        return map(fn, items)
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        return list(pool.map(fn, items, chunksize=max(1, len(items) // ((jobs or os.cpu_count() or 1) * 4))))
+
+
+def search(patterns, roots=DEFAULT_ROOTS, fixed=False, ignore_case=False, context=2, use_index=False, jobs=None):
+    """Returns [(path, [(line_index, [(line_index, line), ...context]), ...])] for files with matches."""
+    if fixed:
+        patterns = [re.escape(p) for p in patterns]
+    flags = re.IGNORECASE if ignore_case else 0
+    files = sorted(set(iter_files(roots)))
+
+    if use_index:
+        index = TrigramIndex()
+        index.update(files, jobs)
+        index.save()
+        per_pattern = [required_literals(p, flags) for p in patterns]
+        if all(lits is not None for lits in per_pattern):
+            # A file is a candidate if it could match any of the patterns.
+            wanted = set()
+            for lits in per_pattern:
+                wanted |= index.candidates(lits)
+            files = [f for f in files if f in wanted]
+
+    results = _map(_search_file, [(f, patterns, flags, context) for f in files], jobs)
+    return [(path, hits) for path, hits in results if hits]
+
+
+def print_results(results, context):
+    for path, hits in results:
+        for line_index, block in hits:
+            if context:
+                print(f"--- {path}:{line_index + 1} ---")
+                for j, line in block:
+                    marker = '>' if j == line_index else ' '
+                    print(f"{marker}{j + 1}: {line.rstrip()}")
+            else:
+                print(f"{path}:{line_index + 1}: {block[0][1].rstrip()}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Search the source tree with regexes, optionally through a trigram index.")
+    parser.add_argument("pattern", nargs="?", help="Regex to search for")
+    parser.add_argument("-e", "--regexp", action="append", default=[], help="Additional pattern (repeatable)")
+    parser.add_argument("-F", "--fixed", action="store_true", help="Treat patterns as literal strings")
+    parser.add_argument("-i", "--ignore-case", action="store_true")
+    parser.add_argument("-C", "--context", type=int, default=2, help="Context lines around each match")
+    parser.add_argument("--paths", nargs="+", default=DEFAULT_ROOTS, help="Files or directories to search")
+    parser.add_argument("--index", action="store_true", help="Use (and incrementally update) the trigram index")
+    parser.add_argument("-j", "--jobs", type=int, default=None, help="Worker processes (default: CPU count)")
+    parser.add_argument("--stats", action="store_true", help="Print timing and match counts to stderr")
+    args = parser.parse_args(argv)
+
+    patterns = ([args.pattern] if args.pattern else []) + args.regexp
+    if not patterns:
+        parser.error("give a pattern or -e PATTERN")
+
+    started = time.perf_counter()
+    results = search(patterns, args.paths, args.fixed, args.ignore_case, args.context, args.index, args.jobs)
+    print_results(results, args.context)
+    if args.stats:
+        matches = sum(len(hits) for _, hits in results)
+        print(f"{matches} matches in {len(results)} files ({(time.perf_counter() - started) * 1000:.0f} ms)", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
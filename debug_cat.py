@@ -1,21 +1,21 @@
 import sys
-import os
+from text_decoding import read_text
 
 def read_file(path):
-    encodings = ['utf-8', 'euc-kr', 'cp949', 'utf-16']
-    for enc in encodings:
-        try:
-            with open(path, 'r', encoding=enc) as f:
-                content = f.read()
-                print(f"--- Successfully read {path} with {enc} ---")
-                print(content[:2000]) # First 2000 chars
-                return
-        except Exception as e:
-            continue
-    print(f"Failed to read {path} with any known encoding.")
+    try:
+        content, enc = read_text(path)
+    except OSError as e:
+        print(f"Failed to read {path}: {e}")
+        return
+    print(f"--- Successfully read {path} with {enc} ---")
+    print(content[:2000]) # First 2000 chars
 
-if __name__ == "__main__":
-    if len(sys.argv) < 2:
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if not argv:
         print("Usage: python debug_cat.py <file_path>")
     else:
-        read_file(sys.argv[1])
+        read_file(argv[0])
+
+if __name__ == "__main__":
+    main()
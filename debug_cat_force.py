@@ -1,9 +1,14 @@
 import sys
-if __name__ == "__main__":
-    path = sys.argv[1]
+from text_decoding import read_text
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    path = argv[0]
     try:
-        with open(path, 'rb') as f:
-            content = f.read()
-            print(content.decode('utf-8', errors='ignore'))
+        content, _ = read_text(path)
+        print(content)
     except Exception as e:
         print(f"Error: {e}")
+
+if __name__ == "__main__":
+    main()
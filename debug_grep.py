@@ -1,22 +1,17 @@
 import sys
-import re
+from code_search import main as code_search_main
 
-def main():
-    path = sys.argv[1]
-    keyword = "text"
-    try:
-        with open(path, 'r', encoding='utf-8', errors='ignore') as f:
-            lines = f.readlines()
-            for i, line in enumerate(lines):
-                if keyword in line:
-                    print(f"--- Line {i+1} ---")
-                    start = max(0, i - 2)
-                    end = min(len(lines), i + 3)
-                    for j in range(start, end):
-                        print(f"{j+1}: {lines[j].rstrip()}")
-                    print("----------------")
-    except Exception as e:
-        print(f"Error: {e}")
+# Kept for muscle memory: `python debug_grep.py <path> [keyword]` is a literal
+# search of one file or directory. Use code_search.py for regexes, multiple
+# patterns and the trigram index.
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if not argv:
+        print("Usage: python debug_grep.py <path> [keyword]")
+        return
+    path = argv[0]
+    keyword = argv[1] if len(argv) > 1 else "text"
+    code_search_main(["-F", keyword, "--paths", path])
 
 if __name__ == "__main__":
     main()
@@ -1,37 +1,294 @@
-import re
+import argparse
+import ast
+import json
 import os
+import re
+from code_search import iter_files
+from text_decoding import read_text
+
+DEFAULT_ROOTS = ['.']
+TS_EXTENSIONS = {'.ts', '.tsx', '.js', '.jsx', '.mjs', '.cjs'}
+HOUR_MS = 60 * 60 * 1000
+
+TIMER_CALL = re.compile(r'\b(setInterval|setTimeout)\s*\(')
+CONST_DEF = re.compile(
+    r'\b(?:const|let|var|readonly|static)\s+(?:readonly\s+)?([A-Za-z_$][\w$]*)\s*'
+    r'(?::\s*[\w$<>\[\]| ]+)?\s*=\s*([^;\n,{}]+)'
+)
+ENCLOSING_DEF = re.compile(
+    r'(?:function\s*\*?\s*([A-Za-z_$][\w$]*)'
+    r'|(?:const|let|var)\s+([A-Za-z_$][\w$]*)\s*=\s*(?:async\s*)?(?:function\b|\([^()]*\)\s*(?::[^=;{]+)?=>|[A-Za-z_$][\w$]*\s*=>)'
+    r'|^\s*(?:(?:public|private|protected|static|async)\s+)*([A-Za-z_$][\w$]*)\s*\([^()]*\)\s*(?::[^{;=]+)?\{)',
+    re.M,
+)
+GEMINI_HINT = re.compile(r'generateContent|GoogleGenAI|GoogleGenerativeAI|from\s+[\'"][^\'"]*gemini')
+SUPABASE_HINT = re.compile(r'\bsupabase\b')
+
+
+def blank_comments(src):
+    """Replaces // and /* */ comments with spaces (keeping offsets and newlines), respecting strings."""
+    out = list(src)
+    i, n = 0, len(src)
+    quote = None
+    while i < n:
+        c = src[i]
+        if quote:
+            if c == '\\':
+                i += 2
+                continue
+            if c == quote:
+                quote = None
+            i += 1
+            continue
+        if c in '"\'`':
+            quote = c
+        elif c == '/' and i + 1 < n and src[i + 1] == '/':
+            j = src.find('\n', i)
+            j = n if j < 0 else j
+            out[i:j] = ' ' * (j - i)
+            i = j
+            continue
+        elif c == '/' and i + 1 < n and src[i + 1] == '*':
+            j = src.find('*/', i + 2)
+            j = n if j < 0 else j + 2
+            out[i:j] = [ch if ch == '\n' else ' ' for ch in src[i:j]]
+            i = j
+            continue
+        i += 1
+    return ''.join(out)
+
+
+def split_call_args(src, open_idx):
+    """Top-level arguments of the call whose '(' is at `open_idx`; template ${} and nesting aware."""
+    args, start = [], open_idx + 1
+    depth, i, n = 0, open_idx + 1, len(src)
+    quote = None
+    while i < n:
+        c = src[i]
+        if quote:
+            if c == '\\':
+                i += 2
+                continue
+            if c == quote:
+                quote = None
+            i += 1
+            continue
+        if c in '"\'`':
+            quote = c
+        elif c in '([{':
+            depth += 1
+        elif c in ')]}':
+            if depth == 0:
+                args.append(src[start:i].strip())
+                return args
+            depth -= 1
+        elif c == ',' and depth == 0:
+            args.append(src[start:i].strip())
+            start = i + 1
+        i += 1
+    return None
+
+
+def collect_constants(code):
+    consts = {}
+    for m in CONST_DEF.finditer(code):
+        consts.setdefault(m.group(1), m.group(2).strip())
+    return consts
+
+
+class DelayResolver:
+    """
+    Evaluates delay expressions such as `5 * 60 * 1000`, `this.INTERVAL_MS`
+    or `POLL_MS / 2`. Names resolve against the file's own constants first,
+    then against constants defined with a single value anywhere in the repo.
+    """
+
+    def __init__(self, global_consts):
+        self.global_consts = global_consts
+
+    def resolve(self, expr, local_consts, seen=None):
+        expr = re.sub(r'\bas\s+\w+\b', '', expr).strip()
+        try:
+            tree = ast.parse(expr, mode='eval')
+        except SyntaxError:
+            return None
+        return self._eval(tree.body, local_consts, seen or set())
+
+    def _lookup(self, name, local_consts, seen):
+        if name in seen:
+            return None
+        seen = seen | {name}
+        if name in local_consts:
+            return self.resolve(local_consts[name], local_consts, seen)
+        candidates = {self.resolve(e, consts, seen) for e, consts in self.global_consts.get(name, [])}
+        if len(candidates) == 1:
+            return candidates.pop()
+        return None
+
+    def _eval(self, node, local_consts, seen):
+        if isinstance(node, ast.Constant) and isinstance(node.value, (int, float)):
+            return node.value
+        if isinstance(node, ast.Name):
+            return self._lookup(node.id, local_consts, seen)
+        if isinstance(node, ast.Attribute):
+            # this.X / ClassName.X; other objects (config.x) are runtime values.
+            owner = node.value
+            if isinstance(owner, ast.Name) and (owner.id == 'this' or owner.id[:1].isupper()):
+                return self._lookup(node.attr, local_consts, seen)
+            return None
+        if isinstance(node, ast.UnaryOp) and isinstance(node.op, (ast.USub, ast.UAdd)):
+            v = self._eval(node.operand, local_consts, seen)
+            return None if v is None else (-v if isinstance(node.op, ast.USub) else v)
+        if isinstance(node, ast.BinOp):
+            a = self._eval(node.left, local_consts, seen)
+            b = self._eval(node.right, local_consts, seen)
+            if a is None or b is None:
+                return None
+            ops = {ast.Add: lambda: a + b, ast.Sub: lambda: a - b, ast.Mult: lambda: a * b,
+                   ast.Div: lambda: a / b if b else None, ast.FloorDiv: lambda: a // b if b else None}
+            fn = ops.get(type(node.op))
+            return fn() if fn else None
+        return None
+
+
+def enclosing_name(code, idx):
+    name = None
+    for m in ENCLOSING_DEF.finditer(code, 0, idx):
+        name = m.group(1) or m.group(2) or m.group(3)
+    if name in {'if', 'for', 'while', 'switch', 'catch', 'return', 'function'}:
+        return None
+    return name
 
-target_files = [
-    'services/AutonomousScheduler.ts',
-    'services/TelegramIntelligenceService.ts',
-    'services/IntelligenceBriefingProcessor.ts'
-]
-
-def analyze_file(path):
-    print(f"--- Analyzing {path} ---")
-    try:
-        with open(path, 'r', encoding='utf-8') as f:
-            content = f.read()
-    except:
+
+def scan_file(path, code, resolver, local_consts):
+    timers = []
+    uses_gemini = bool(GEMINI_HINT.search(code))
+    uses_supabase = bool(SUPABASE_HINT.search(code))
+    for m in TIMER_CALL.finditer(code):
+        args = split_call_args(code, m.end() - 1)
+        if not args:
+            continue
+        kind = m.group(1)
+        delay_expr = args[1] if len(args) > 1 else '0'
+        delay = resolver.resolve(delay_expr, local_consts)
+
+        recurring = kind == 'setInterval'
+        if not recurring:
+            # setTimeout that re-arms its own function is a polling loop.
+            name = enclosing_name(code, m.start())
+            recurring = bool(name and re.search(r'\b' + re.escape(name) + r'\b', args[0]))
+            kind = 'setTimeout-loop' if recurring else 'setTimeout'
+
+        per_hour = HOUR_MS / delay if recurring and delay and delay > 0 else 0
+        timers.append({
+            'file': path.replace(os.sep, '/'),
+            'line': code.count('\n', 0, m.start()) + 1,
+            'kind': kind,
+            'delay_expr': ' '.join(delay_expr.split()),
+            'delay_ms': delay,
+            'per_hour': per_hour,
+            'gemini': uses_gemini,
+            'supabase': uses_supabase,
+        })
+    return timers
+
+
+def analyze(roots=DEFAULT_ROOTS):
+    sources = {}
+    for path in iter_files(roots, TS_EXTENSIONS):
         try:
-             with open(path, 'r', encoding='latin-1') as f:
-                content = f.read()
-        except Exception as e:
-            print(f"Failed to read: {e}")
-            return
+            text, _ = read_text(path)
+        except OSError as e:
+            print(f"Failed to read {path}: {e}")
+            continue
+        sources[os.path.normpath(path)] = blank_comments(text)
+
+    local = {path: collect_constants(code) for path, code in sources.items()}
+    global_consts = {}
+    for path, consts in local.items():
+        for name, expr in consts.items():
+            global_consts.setdefault(name, []).append((expr, consts))
+
+    resolver = DelayResolver(global_consts)
+    timers = []
+    for path in sorted(sources):
+        timers.extend(scan_file(path, sources[path], resolver, local[path]))
+    return timers
+
+
+def summarize(timers):
+    modules = {}
+    for t in timers:
+        m = modules.setdefault(t['file'], {'file': t['file'], 'timers': 0, 'recurring': 0, 'unresolved': 0,
+                                           'per_hour': 0.0, 'gemini': t['gemini'], 'supabase': t['supabase']})
+        m['timers'] += 1
+        m['recurring'] += t['kind'] != 'setTimeout'
+        m['unresolved'] += t['delay_ms'] is None
+        m['per_hour'] += t['per_hour']
+    return sorted(modules.values(), key=lambda m: -m['per_hour'])
+
+
+def timeline(timers, min_delay_ms=60_000, only_backend=True):
+    """Per-minute fire counts over one hour for recurring timers, all assumed to start at t=0."""
+    buckets = [[] for _ in range(60)]
+    for t in timers:
+        if not t['per_hour'] or t['delay_ms'] < min_delay_ms:
+            continue
+        if only_backend and not (t['gemini'] or t['supabase']):
+            continue
+        at = t['delay_ms']
+        while at <= HOUR_MS:
+            buckets[min(59, int((at - 1) // 60_000))].append(t)
+            at += t['delay_ms']
+    return buckets
+
+
+def fmt_ms(ms):
+    if ms is None:
+        return '?'
+    for unit, size in (('h', HOUR_MS), ('m', 60_000), ('s', 1000)):
+        if ms >= size:
+            return f"{ms / size:g}{unit}"
+    return f"{ms:g}ms"
+
+
+def print_report(timers, show_timeline, storm_threshold):
+    print(f"{'file:line':<60} {'kind':<16} {'delay':>8} {'/hour':>8}  backend  expr")
+    for t in sorted(timers, key=lambda t: -t['per_hour']):
+        backend = ('G' if t['gemini'] else '-') + ('S' if t['supabase'] else '-')
+        print(f"{t['file'] + ':' + str(t['line']):<60} {t['kind']:<16} {fmt_ms(t['delay_ms']):>8} "
+              f"{t['per_hour']:>8.1f}  {backend:<7}  {t['delay_expr'][:40]}")
+
+    print("\n--- Timer-driven calls per hour by module (G = uses Gemini, S = uses Supabase) ---")
+    for m in summarize(timers):
+        if not m['recurring'] and not m['unresolved']:
+            continue
+        backend = ('G' if m['gemini'] else '-') + ('S' if m['supabase'] else '-')
+        unresolved = f"  ({m['unresolved']} unresolved)" if m['unresolved'] else ''
+        print(f"{m['per_hour']:>9.1f}/h  {backend}  {m['file']}  [{m['recurring']} recurring]{unresolved}")
+
+    if show_timeline:
+        print("\n--- Minute-of-hour timeline (recurring >= 1m timers in Gemini/Supabase modules) ---")
+        for minute, fired in enumerate(timeline(timers)):
+            if len(fired) >= storm_threshold:
+                names = sorted({os.path.basename(t['file']) for t in fired})
+                print(f"{minute + 1:>3}m {'#' * len(fired):<20} {len(fired):>3}  {', '.join(names)}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Find setInterval/setTimeout timers across the repo and estimate fires per hour.")
+    parser.add_argument("paths", nargs="*", default=DEFAULT_ROOTS, help="Files or directories to scan")
+    parser.add_argument("--timeline", action="store_true", help="Show which minutes of the hour timers pile up in")
+    parser.add_argument("--storm", type=int, default=3, help="Timeline: only show minutes with at least this many fires")
+    parser.add_argument("--json", action="store_true", help="Print timers as JSON")
+    args = parser.parse_args(argv)
 
-    # Find setInterval(..., number)
-    matches = re.finditer(r'(setInterval|setTimeout)\s*\(([^,]+),\s*(\d+)\)', content)
-    for m in matches:
-        print(f"Line found: {m.group(0)}")
+    found = analyze(args.paths)
+    if args.json:
+        print(json.dumps(found, indent=2, ensure_ascii=False))
+    else:
+        print_report(found, args.timeline, args.storm)
 
-    # Check for "sleep"
-    if 'sleep' in content:
-         print("Found 'sleep' keyword usage")
 
 if __name__ == "__main__":
-    for p in target_files:
-        if os.path.exists(p):
-            analyze_file(p)
-        else:
-            print(f"File not found: {p}")
+    main()
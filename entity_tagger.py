@@ -0,0 +1,348 @@
+
+import argparse
+import json
+import os
+import re
+import sys
+import time
+import unicodedata
+from collections import deque
+from datetime import datetime, timedelta, timezone
+
+from market_cache_builder import normalize_symbol, sniff_rows
+from text_decoding import read_text
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+UNIVERSE_PATH = os.path.join(ROOT, "services", "strategy", "MarketUniverse.ts")
+UNIVERSE_RE = re.compile(r"ticker:\s*'(\d{6})',\s*name:\s*'([^']+)'")
+
+# Shorthand that channels use instead of listed names (Korean nicknames, Korean spellings of US names).
+ALIASES = {
+    "005930": ["삼전", "삼성전자"], "000660": ["하닉", "하이닉스", "SK하이닉스"], "373220": ["엔솔", "LG엔솔"],
+    "207940": ["삼바"], "005380": ["현차", "현대자동차"], "068270": ["셀트"], "005490": ["포스코홀딩스", "포스코"],
+    "035420": ["네이버"], "051910": ["엘지화학"], "034020": ["두산에너빌"], "012450": ["한화에어로", "한화에어로스페이스"],
+    "015760": ["한전"], "323410": ["카뱅"], "247540": ["에코프로비엠"], "086520": ["에코프로"], "196170": ["알테오젠"],
+    "042700": ["한미반도체"], "064350": ["현대로템"],
+    "AAPL": ["애플", "Apple"], "NVDA": ["엔비디아", "Nvidia", "NVIDIA"], "TSLA": ["테슬라", "Tesla"],
+    "MSFT": ["마이크로소프트", "Microsoft"], "AMZN": ["아마존", "Amazon"], "GOOGL": ["구글", "알파벳", "Google", "Alphabet"],
+    "META": ["메타플랫폼스", "Meta Platforms"], "NFLX": ["넷플릭스", "Netflix"], "AVGO": ["브로드컴", "Broadcom"],
+    "INTC": ["인텔", "Intel"], "MU": ["마이크론", "Micron"], "PLTR": ["팔란티어", "Palantir"], "COIN": ["코인베이스", "Coinbase"],
+    "TSM": ["TSMC"], "QCOM": ["퀄컴", "Qualcomm"], "AMD": ["에이엠디"],
+}
+
+# Research houses whose reports the channels relay ("... - 키움증권"). Several are listed companies too;
+# when a span is a broker name it is tagged as the broker, not as a ticker.
+BROKERS = {
+    "키움증권": ["키움"], "미래에셋증권": ["미래에셋", "미래에셋대우"], "삼성증권": [], "NH투자증권": ["NH투자"],
+    "KB증권": [], "한국투자증권": ["한투", "한국투자"], "신한투자증권": ["신한금융투자", "신한투자"], "하나증권": ["하나금융투자"],
+    "메리츠증권": ["메리츠"], "대신증권": ["대신"], "유안타증권": ["유안타"], "교보증권": [], "하이투자증권": [],
+    "LS증권": ["이베스트투자증권", "이베스트"], "DB금융투자": ["DB증권"], "IBK투자증권": [], "현대차증권": [], "SK증권": [],
+    "유진투자증권": ["유진투자"], "한화투자증권": [], "신영증권": [], "상상인증권": [], "부국증권": [], "케이프투자증권": [],
+    "BNK투자증권": [], "다올투자증권": [], "한양증권": [], "리딩투자증권": [], "iM증권": [], "카카오페이증권": [], "토스증권": [],
+    "Goldman Sachs": ["골드만삭스", "골드만"], "Morgan Stanley": ["모건스탠리"], "JP Morgan": ["JP모건", "J.P. Morgan", "JPMorgan"],
+    "Citi": ["씨티", "Citigroup"], "UBS": [], "CLSA": [], "Nomura": ["노무라"], "Macquarie": ["맥쿼리"], "BofA": ["뱅크오브아메리카"],
+    "Jefferies": ["제프리스"], "HSBC": [], "Bernstein": ["번스타인"],
+}
+
+# US symbols that are also everyday words/abbreviations only count as $TICKER or (TICKER).
+SYMBOL_STOPWORDS = {
+    "AI", "EV", "CEO", "CFO", "IPO", "ETF", "USA", "GDP", "CPI", "PPI", "FOMC", "FED", "IT", "ON", "ALL", "ARE", "FOR",
+    "ONE", "NOW", "CAN", "NEW", "OUT", "BIG", "KEY", "FAST", "REAL", "HAS", "SEE", "BE", "DO", "AM", "PM", "US", "UK",
+    "EU", "KR", "HBM", "DRAM", "LNG", "API", "APP", "OR", "AND", "THE", "BUY", "SELL", "HOLD", "TOP", "NET", "DAY",
+    "OPEN", "PLAY", "LOVE", "GOOD", "BEST", "CASH", "RUN", "LOW", "HIGH", "MAIN", "NEXT", "YOU", "WELL", "PEAK",
+    "RISK", "SAFE", "TECH", "TRUE", "CARS", "HOME", "EDIT", "INFO", "PLUS", "ARM", "WAY", "ANY", "TWO", "GAIN", "MIND",
+}
+# Listed KR names that are also everyday nouns ("투자 대상"); these companies are only matched by code.
+KR_NAME_STOPWORDS = {"대상", "미래", "동방", "대원", "한국", "서울", "신세계", "국보", "세방", "우진", "선진", "대성", "한일"}
+NAME_SUFFIX_RE = re.compile(
+    r',?\s+(?:inc|incorporated|corp|corporation|co|company|ltd|limited|plc|holdings?|group|n\.?v|s\.?a|ag|l\.?p|llc|'
+    r'class [a-c]|common stock|ordinary shares|american depositary shares?|ads)\.?$', re.I)
+HANGUL_RE = re.compile(r'[가-힣]')
+SCORES = {"code": 3, "name": 2, "alias": 1}
+
+
+def is_word_char(ch):
+    return ch.isascii() and ch.isalnum()
+
+
+def normalize(text):
+    return unicodedata.normalize("NFKC", text or "")
+
+
+class Automaton:
+    """
+    Aho-Corasick over characters: one left-to-right pass finds every occurrence of every
+    pattern, whatever the number of patterns. Outputs are merged along failure links
+    at build time, so a match only costs a list walk.
+    """
+
+    def __init__(self):
+        self.goto = [{}]
+        self.fail = [0]
+        self.out = [[]]
+
+    def add(self, word, value):
+        s = 0
+        for ch in word:
+            nxt = self.goto[s].get(ch)
+            if nxt is None:
+                nxt = len(self.goto)
+                self.goto[s][ch] = nxt
+                self.goto.append({})
+                self.fail.append(0)
+                self.out.append([])
+            s = nxt
+        self.out[s].append((len(word), value))
+
+    def build(self):
+        queue = deque(self.goto[0].values())
+        while queue:
+            s = queue.popleft()
+            for ch, t in self.goto[s].items():
+                queue.append(t)
+                f = self.fail[s]
+                while f and ch not in self.goto[f]:
+                    f = self.fail[f]
+                self.fail[t] = self.goto[f].get(ch, 0)
+                self.out[t] = self.out[t] + self.out[self.fail[t]]
+        return self
+
+    def matches(self, text):
+        """(start, end, value) for every occurrence, in order of end position."""
+        goto, fail, out = self.goto, self.fail, self.out
+        s = 0
+        for i, ch in enumerate(text):
+            while s and ch not in goto[s]:
+                s = fail[s]
+            s = goto[s].get(ch, 0)
+            if out[s]:
+                for length, value in out[s]:
+                    yield i + 1 - length, i + 1, value
+
+
+class EntityTagger:
+    """
+    Tags a message with candidate tickers and the broker in one Aho-Corasick pass.
+
+    Entities are (kind, key, market, name) tuples; a pattern maps to an entity plus how it
+    was matched (code, listed name or alias), which weights the candidate. Overlapping
+    hits resolve leftmost-longest, so "SK하이닉스" is not also "SK" and "삼성전자우" is
+    not "삼성전자". ASCII patterns need word boundaries; Hangul names don't (particles
+    attach directly: "삼성전자가"), except two-syllable names, which must start a word.
+    """
+
+    def __init__(self):
+        self.automaton = Automaton()
+        self.entities = []
+        self._ids = {}
+        self._seen = set()
+        self.patterns = 0
+
+    def entity(self, kind, key, market, name):
+        ident = (kind, key)
+        if ident not in self._ids:
+            self._ids[ident] = len(self.entities)
+            self.entities.append((kind, key, market, name))
+        return self._ids[ident]
+
+    def add(self, pattern, entity_id, how):
+        pattern = normalize(pattern).strip()
+        if not pattern or (pattern, entity_id) in self._seen:
+            return
+        self._seen.add((pattern, entity_id))
+        self.automaton.add(pattern, (entity_id, how))
+        self.patterns += 1
+
+    def add_ticker(self, ticker, market, names=(), aliases=(), name=None):
+        eid = self.entity("ticker", ticker, market, name or (names[0] if names else ticker))
+        if market == "KR":
+            self.add(ticker, eid, "code")
+        elif len(ticker) >= 3 and ticker not in SYMBOL_STOPWORDS:
+            self.add(ticker, eid, "code")
+        else:
+            self.add(f"${ticker}", eid, "code")
+            self.add(f"({ticker})", eid, "code")
+        for n in names:
+            if market != "KR" or n not in KR_NAME_STOPWORDS:
+                self.add(n, eid, "name")
+        for a in aliases:
+            self.add(a, eid, "alias")
+
+    def add_broker(self, name, aliases=()):
+        eid = self.entity("broker", name, None, name)
+        self.add(name, eid, "name")
+        for a in aliases:
+            self.add(a, eid, "alias")
+
+    def build(self):
+        self.automaton.build()
+        self._seen = set()
+        return self
+
+    @staticmethod
+    def _bounded(text, start, end):
+        first, last = text[start], text[end - 1]
+        if is_word_char(first) and start > 0 and is_word_char(text[start - 1]):
+            return False
+        if is_word_char(last) and end < len(text) and is_word_char(text[end]):
+            return False
+        if end - start <= 2 and HANGUL_RE.match(first) and start > 0 and HANGUL_RE.match(text[start - 1]):
+            return False
+        return True
+
+    def tag(self, text):
+        text = normalize(text)
+        spans = {}
+        for start, end, (eid, how) in self.automaton.matches(text):
+            if self._bounded(text, start, end):
+                spans.setdefault((start, end), []).append((eid, how))
+
+        tickers, brokers, last_end = {}, [], -1
+        for (start, end), hits in sorted(spans.items(), key=lambda kv: (kv[0][0], -kv[0][1])):
+            if start < last_end:
+                continue
+            last_end = end
+            if any(self.entities[eid][0] == "broker" for eid, _ in hits):
+                hits = [h for h in hits if self.entities[h[0]][0] == "broker"]
+            for eid, how in hits:
+                kind, key, market, name = self.entities[eid]
+                if kind == "broker":
+                    if key not in brokers:
+                        brokers.append(key)
+                    continue
+                c = tickers.setdefault(key, {"ticker": key, "market": market, "name": name, "hits": 0, "score": 0, "first": start})
+                c["hits"] += 1
+                c["score"] += SCORES[how]
+
+        candidates = sorted(tickers.values(), key=lambda c: (-c["score"], c["first"]))
+        for c in candidates:
+            del c["first"]
+        # Briefings end with the house that wrote the report; the last broker named is the source.
+        return {"tickers": candidates, "broker": brokers[-1] if brokers else None, "brokers": brokers}
+
+
+def us_company_name(security_name):
+    """'Apple Inc. - Common Stock' -> 'Apple'."""
+    name = security_name.split(" - ")[0].strip()
+    for _ in range(3):
+        stripped = NAME_SUFFIX_RE.sub("", name).strip()
+        if stripped == name:
+            break
+        name = stripped
+    return name
+
+
+def read_krx_names(path):
+    """(code, market, [names]) from a KRX data portal / KIND listed-companies download."""
+    for row in sniff_rows(path):
+        code = (row.get("단축코드") or row.get("종목코드") or row.get("Code") or "").strip().lstrip("A")
+        if not code.isdigit():
+            continue
+        names = [row.get(k) for k in ("한글 종목약명", "한글 종목명", "회사명", "종목명", "Name") if row.get(k)]
+        yield code.zfill(6), row.get("시장구분") or row.get("Market") or "KRX", names
+
+
+def read_us_names(path):
+    """(symbol, company name or None) from nasdaqlisted/otherlisted or a screener CSV with Symbol/Name."""
+    for row in sniff_rows(path):
+        symbol = row.get("Symbol") or row.get("ACT Symbol") or ""
+        if not symbol or row.get("Test Issue") == "Y" or symbol.startswith("File Creation Time"):
+            continue
+        name = row.get("Security Name") or row.get("Name") or ""
+        # Fund names ("SPDR S&P 500 ETF Trust") never appear verbatim in messages.
+        name = None if row.get("ETF") == "Y" or not name else us_company_name(name)
+        yield normalize_symbol(symbol), name
+
+
+def load_universe(path=UNIVERSE_PATH):
+    """The KR leaders list the strategy code trades, so the tagger works without any download."""
+    if not os.path.isfile(path):
+        return []
+    text, _ = read_text(path)
+    return UNIVERSE_RE.findall(text)
+
+
+def build_tagger(krx=(), us=(), aliases_path=None):
+    tagger = EntityTagger()
+    kr_names = {}
+    for code, name in load_universe():
+        kr_names.setdefault(code, []).append(name)
+    for path in krx:
+        for code, _, names in read_krx_names(path):
+            kr_names.setdefault(code, []).extend(names)
+    aliases = {k: list(v) for k, v in ALIASES.items()}
+    if aliases_path:
+        with open(aliases_path, "r", encoding="utf-8") as f:
+            for key, extra in json.load(f).items():
+                aliases.setdefault(key, []).extend(extra)
+
+    for code, names in kr_names.items():
+        tagger.add_ticker(code, "KR", names, aliases.pop(code, ()))
+    us_names = {}
+    for path in us:
+        for symbol, name in read_us_names(path):
+            if symbol not in us_names or (name and not us_names[symbol]):
+                us_names[symbol] = name
+    for symbol, name in us_names.items():
+        # Single-word names shorter than 4 letters ("Arm", "Box") are too ambiguous to match on.
+        names = [name] if name and len(name) >= 4 else []
+        tagger.add_ticker(symbol, "US", names, aliases.pop(symbol, ()), name=name)
+    for key, extra in aliases.items():
+        tagger.add_ticker(key, "KR" if key.isdigit() else "US", (), extra, name=extra[0] if extra else key)
+    for name, extra in BROKERS.items():
+        tagger.add_broker(name, extra)
+    return tagger.build()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Tag telegram messages with candidate tickers and the broker (Aho-Corasick).")
+    parser.add_argument("file", nargs="?", help="JSON-lines or text file of messages ('-' for stdin); default: recent telegram_messages")
+    parser.add_argument("--text", help="Tag this one message and exit")
+    parser.add_argument("--krx", action="append", default=[], help="KRX listed-companies download (단축코드, 한글 종목약명, ...)")
+    parser.add_argument("--us", action="append", default=[], help="nasdaqlisted.txt / otherlisted.txt / screener CSV with Symbol,Name")
+    parser.add_argument("--aliases", help='Extra aliases as JSON: {"005930": ["삼전"], "NVDA": ["엔비디아"]}')
+    parser.add_argument("--hours", type=float, default=24, help="How far back to read telegram_messages")
+    parser.add_argument("--limit", type=int, default=None)
+    parser.add_argument("--summary", action="store_true", help="Print throughput and tagging rates instead of JSON lines")
+    args = parser.parse_args(argv)
+
+    started = time.perf_counter()
+    tagger = build_tagger(args.krx, args.us, args.aliases)
+    built = time.perf_counter() - started
+    print(f"🔤 {len(tagger.entities)} entities, {tagger.patterns} patterns, "
+          f"{len(tagger.automaton.goto)} states ({built:.2f}s)", file=sys.stderr)
+
+    if args.text:
+        print(json.dumps(tagger.tag(args.text), ensure_ascii=False))
+        return 0
+    if args.file:
+        from near_dup import read_lines
+        rows = read_lines(args.file)
+    else:
+        from near_dup import fetch_messages
+        from ops_config import require_credentials
+        url, _ = require_credentials()
+        since = (datetime.now(timezone.utc) - timedelta(hours=args.hours)).isoformat()
+        rows = fetch_messages(url, since, args.limit)
+
+    n = with_ticker = with_broker = chars = 0
+    elapsed = 0.0
+    for row in rows:
+        text = row.get("message") or ""
+        t = time.perf_counter()
+        tags = tagger.tag(text)
+        elapsed += time.perf_counter() - t
+        n += 1
+        chars += len(text)
+        with_ticker += bool(tags["tickers"])
+        with_broker += bool(tags["broker"])
+        if not args.summary:
+            print(json.dumps({"id": row.get("id"), "created_at": row.get("created_at"), **tags}, ensure_ascii=False))
+    rate = n / elapsed if elapsed else 0.0
+    print(f"📊 {n} messages ({chars / max(n, 1):.0f} chars avg): {with_ticker} with tickers, {with_broker} with a broker; "
+          f"{rate:,.0f} msg/s", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    main()
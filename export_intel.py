@@ -0,0 +1,242 @@
+
+import argparse
+import json
+import os
+import shutil
+import time
+from datetime import datetime, timezone
+
+import requests
+from ops_config import keyset_filter, parse_ts, require_credentials, rest_session
+
+DEFAULT_OUT_DIR = "exports"
+PAGE_SIZE = 1000
+# Rows buffered per table before a part file is written.
+FLUSH_ROWS = 50_000
+# Partition for rows whose created_at is NULL (the column is nullable in every schema).
+UNDATED_DAY = "unknown"
+
+# Column types per table (from the .supabase/*.sql and fix_table_schema.sql definitions).
+# JSON columns are stored as JSON text; columns not listed here are kept as text too.
+TABLE_COLUMNS = {
+    "ai_thought_logs": {
+        "id": "string", "created_at": "timestamp", "ticker": "string", "action": "string",
+        "confidence": "float64", "message": "string", "details": "json", "strategy": "string",
+    },
+    "telegram_messages": {
+        "id": "int64", "created_at": "timestamp", "message": "string", "market": "string", "channel": "string",
+        "channel_id": "string", "message_id": "int64", "sender_id": "int64",
+    },
+    "ai_token_usage": {
+        "id": "string", "created_at": "timestamp", "model": "string", "input_tokens": "int64",
+        "output_tokens": "int64", "total_tokens": "int64", "cost_usd": "float64",
+    },
+}
+
+
+def fetch_pages(session, url, table, cursor, page_size=PAGE_SIZE):
+    """Yields pages of rows after `cursor` = (created_at, id), oldest first, using keyset pagination."""
+    endpoint = f"{url}/rest/v1/{table}"
+    while True:
+        # NULL never compares greater than the cursor, so undated rows get their own pass.
+        params = {"select": "*", "created_at": "not.is.null", "order": "created_at.asc,id.asc", "limit": str(page_size)}
+        if cursor:
+            params["or"] = keyset_filter(cursor)
+        r = session.get(endpoint, params=params, timeout=60)
+        r.raise_for_status()
+        rows = r.json()
+        if not rows:
+            return
+        yield rows
+        cursor = (rows[-1]["created_at"], rows[-1]["id"])
+        if len(rows) < page_size:
+            return
+
+
+def fetch_undated(session, url, table, after_id, page_size=PAGE_SIZE):
+    """Yields pages of rows with a NULL created_at and an id above `after_id`, by id."""
+    endpoint = f"{url}/rest/v1/{table}"
+    while True:
+        params = {"select": "*", "created_at": "is.null", "order": "id.asc", "limit": str(page_size)}
+        if after_id is not None:
+            params["id"] = f"gt.{after_id}"
+        r = session.get(endpoint, params=params, timeout=60)
+        r.raise_for_status()
+        rows = r.json()
+        if not rows:
+            return
+        yield rows
+        after_id = rows[-1]["id"]
+        if len(rows) < page_size:
+            return
+
+
+class StateFile:
+    """High-water marks per table, written atomically after each part file lands."""
+
+    def __init__(self, path):
+        self.path = path
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                self.data = json.load(f)
+        except FileNotFoundError:
+            self.data = {}
+
+    def cursor(self, table):
+        mark = self.data.get(table)
+        return (mark["created_at"], mark["id"]) if mark and mark.get("created_at") else None
+
+    def undated_id(self, table):
+        return self.data.get(table, {}).get("undated_id")
+
+    def reset(self, table):
+        self.data.pop(table, None)
+        self.save()
+
+    def advance(self, table, cursor, rows, undated_id=None):
+        mark = self.data.setdefault(table, {"rows_exported": 0})
+        if cursor:
+            mark.update({"created_at": cursor[0], "id": cursor[1]})
+        if undated_id is not None:
+            mark["undated_id"] = undated_id
+        mark["updated_at"] = datetime.now(timezone.utc).isoformat()
+        mark["rows_exported"] = mark.get("rows_exported", 0) + rows
+        self.save()
+
+    def save(self):
+        tmp = self.path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(self.data, f, indent=2)
+        os.replace(tmp, self.path)
+
+
+def to_arrow(table, rows):
+    import pyarrow as pa
+
+    types = {"string": pa.string(), "int64": pa.int64(), "float64": pa.float64(),
+             "timestamp": pa.timestamp("us", tz="UTC"), "json": pa.string()}
+    known = TABLE_COLUMNS.get(table, {"created_at": "timestamp"})
+    extra = sorted({k for row in rows for k in row} - set(known))
+    columns = {**known, **{k: "json" for k in extra}}
+
+    arrays, fields = [], []
+    for name, kind in columns.items():
+        values = [row.get(name) for row in rows]
+        if kind == "timestamp":
+            values = [parse_ts(v) for v in values]
+        elif kind == "json":
+            values = [v if v is None or isinstance(v, str) else json.dumps(v, ensure_ascii=False) for v in values]
+        elif kind == "string":
+            values = [v if v is None or isinstance(v, str) else str(v) for v in values]
+        arrays.append(pa.array(values, type=types[kind]))
+        fields.append(pa.field(name, types[kind]))
+    return pa.Table.from_arrays(arrays, schema=pa.schema(fields))
+
+
+def write_parts(out_dir, table, rows, run_tag, compression):
+    """Writes rows as one Parquet file per UTC day: <out>/<table>/date=YYYY-MM-DD/part-<run>.parquet."""
+    import pyarrow.parquet as pq
+
+    by_day = {}
+    for row in rows:
+        ts = parse_ts(row.get("created_at"))
+        day = ts.astimezone(timezone.utc).date().isoformat() if ts else UNDATED_DAY
+        by_day.setdefault(day, []).append(row)
+
+    written = []
+    for day, day_rows in sorted(by_day.items()):
+        part_dir = os.path.join(out_dir, table, f"date={day}")
+        os.makedirs(part_dir, exist_ok=True)
+        path = os.path.join(part_dir, f"part-{run_tag}.parquet")
+        n = 0
+        while os.path.exists(path):
+            n += 1
+            path = os.path.join(part_dir, f"part-{run_tag}-{n}.parquet")
+        tmp = path + ".tmp"
+        pq.write_table(to_arrow(table, day_rows), tmp, compression=compression)
+        os.replace(tmp, path)
+        written.append(path)
+    return written
+
+
+def export_table(session, url, table, out_dir, state, run_tag, compression="zstd", page_size=PAGE_SIZE):
+    started = time.perf_counter()
+    cursor = state.cursor(table)
+    buffer, total, files = [], 0, []
+
+    def flush(undated=False):
+        nonlocal buffer, total
+        if not buffer:
+            return
+        files.extend(write_parts(out_dir, table, buffer, run_tag, compression))
+        # Only move the high-water mark once the rows are safely on disk.
+        last = buffer[-1]
+        if undated:
+            state.advance(table, None, len(buffer), undated_id=last["id"])
+        else:
+            state.advance(table, (last["created_at"], last["id"]), len(buffer))
+        total += len(buffer)
+        buffer = []
+
+    for page in fetch_pages(session, url, table, cursor, page_size):
+        buffer.extend(page)
+        if len(buffer) >= FLUSH_ROWS:
+            flush()
+    flush()
+    for page in fetch_undated(session, url, table, state.undated_id(table), page_size):
+        buffer.extend(page)
+        if len(buffer) >= FLUSH_ROWS:
+            flush(undated=True)
+    flush(undated=True)
+
+    elapsed = time.perf_counter() - started
+    print(f"✅ {table}: {total} new rows -> {len(files)} file(s) in {elapsed:.1f}s"
+          + (f" ({total / elapsed:.0f} rows/s)" if total and elapsed else ""))
+    return total
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Incrementally export intel tables to day-partitioned Parquet. "
+                    "Read back with pyarrow.dataset.dataset('exports/ai_thought_logs', partitioning='hive')."
+    )
+    parser.add_argument("tables", nargs="*", default=list(TABLE_COLUMNS), help="Tables to export")
+    parser.add_argument("--out", default=DEFAULT_OUT_DIR, help="Output directory")
+    parser.add_argument("--compression", default="zstd", choices=["zstd", "snappy", "gzip", "none"])
+    parser.add_argument("--page-size", type=int, default=PAGE_SIZE)
+    parser.add_argument("--reset", action="store_true",
+                        help="Delete the exported partitions of the given tables and export them again from the start")
+    args = parser.parse_args(argv)
+
+    url, key = require_credentials()
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        print("❌ Error: pyarrow is required for Parquet export (pip install pyarrow).")
+        exit(1)
+
+    os.makedirs(args.out, exist_ok=True)
+    state = StateFile(os.path.join(args.out, "_state.json"))
+    if args.reset:
+        # New parts next to the old ones would double every row in the hive dataset. The mark goes
+        # first: a crash in between leaves parts the next --reset removes, never a mark without parts.
+        for table in args.tables:
+            state.reset(table)
+            table_dir = os.path.join(args.out, table)
+            if os.path.isdir(table_dir):
+                shutil.rmtree(table_dir)
+                print(f"🗑️ {table}: removed previous export {table_dir}")
+
+    session = rest_session()
+    run_tag = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%S")
+    compression = None if args.compression == "none" else args.compression
+
+    for table in args.tables:
+        try:
+            export_table(session, url, table, args.out, state, run_tag, compression, args.page_size)
+        except requests.RequestException as e:
+            print(f"❌ {table}: export stopped at the last saved high-water mark: {e}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,9 +1,8 @@
+import sys
+from ops_config import main
 
-import os
-from dotenv import load_dotenv
-
-load_dotenv()
-key = os.environ.get("SUPABASE_ANON_KEY")
-
-with open("temp_key.txt", "w") as f:
-    f.write(key)
+# Stores SUPABASE_ANON_KEY in .cache/ops_secrets.json, where every ops command
+# (and verify_thoughts.py) finds it when the environment doesn't set it.
+# Same as `ops config save-key`.
+if __name__ == "__main__":
+    sys.exit(main(["save-key"] + sys.argv[1:]))
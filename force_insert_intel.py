@@ -1,22 +1,11 @@
 
-import os
-import time
 from datetime import datetime
-from supabase import create_client, Client
-from dotenv import load_dotenv
-
-load_dotenv()
-
-url: str = os.environ.get("SUPABASE_URL")
-key: str = os.environ.get("SUPABASE_ANON_KEY")
-
-if not url or not key:
-    print("❌ Error: SUPABASE_URL or SUPABASE_ANON_KEY not found in .env")
-    exit(1)
-
-supabase: Client = create_client(url, key)
+from ops_config import require_credentials
 
 def inject_test_log():
+    from supabase_writer import BatchedWriter
+
+    url, key = require_credentials()
     print("💉 Injecting TEST Intelligence Log...")
     
     # 1. Analyzing state
@@ -29,14 +18,6 @@ def inject_test_log():
         "created_at": datetime.utcnow().isoformat()
     }
     
-    try:
-        data = supabase.table("ai_thought_logs").insert(msg_1).execute()
-        print("✅ Inserted 'Analyzing' log.")
-    except Exception as e:
-        print(f"❌ Failed to insert log 1: {e}")
-
-    time.sleep(2)
-
     # 2. Result state
     msg_2 = {
         "action": "ANALYSIS",
@@ -54,12 +35,19 @@ def inject_test_log():
         "created_at": datetime.utcnow().isoformat()
     }
 
-    try:
-        data = supabase.table("ai_thought_logs").insert(msg_2).execute()
-        print("✅ Inserted 'Result' log.")
-        print("🎉 Test Complete. Please check the 'AI Reading & Interpretation' column in your dashboard.")
-    except Exception as e:
-        print(f"❌ Failed to insert log 2: {e}")
+    # Both states go out as one multi-row insert; created_at keeps them in order on the dashboard.
+    with BatchedWriter(url, key) as writer:
+        writer.add_many("ai_thought_logs", [msg_1, msg_2])
 
-if __name__ == "__main__":
+    if writer.stats["rows_failed"]:
+        print(f"❌ Failed to insert {writer.stats['rows_failed']} log(s).")
+        return
+
+    print("✅ Inserted 'Analyzing' and 'Result' logs.")
+    print("🎉 Test Complete. Please check the 'AI Reading & Interpretation' column in your dashboard.")
+
+def main(argv=None):
     inject_test_log()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,262 @@
+
+import argparse
+import json
+import sys
+import time
+
+import numpy as np
+
+from bar_store import DEFAULT_ROOT, BarStore
+
+# The set BacktestEngine / StrategyPresets ask for most; keys follow getIndicatorKey ("SMA_20").
+DEFAULT_SET = ["SMA_5", "SMA_10", "SMA_20", "SMA_60", "SMA_120", "SMA_200",
+               "EMA_12", "EMA_20", "EMA_26", "RSI_14", "BB_UPPER_20", "BB_MIDDLE_20", "BB_LOWER_20"]
+BB_MULTIPLIER = 2
+CHUNK_TICKERS = 512
+
+# These mirror TechnicalAnalysis.ts on a (tickers x bars) matrix, rows left-aligned and
+# NaN-padded at the end. The time recursions run one step per column across all rows,
+# with the same operation order as the TS loops, so results are bit-identical (see
+# `parity`). A row shorter than the warm-up comes out all NaN, as in TS; the padding
+# only ever reaches columns past a row's own length, which callers cut off.
+
+
+def _nan(shape):
+    return np.full(shape, np.nan)
+
+
+def _time_major(x):
+    # Each recursion step reads one time column across all tickers; in (bars x tickers)
+    # order that column is contiguous.
+    return np.ascontiguousarray(x.T)
+
+
+def sma(x, period):
+    n, t = x.shape
+    out = _nan((t, n))
+    if t < period:
+        return out.T
+    xt = _time_major(x)
+    s = np.cumsum(xt[:period], axis=0)[-1]  # sequential sum, like the TS warm-up loop
+    np.divide(s, period, out=out[period - 1])
+    for i in range(period, t):
+        np.subtract(s, xt[i - period], out=s)
+        np.add(s, xt[i], out=s)
+        np.divide(s, period, out=out[i])
+    return out.T
+
+
+def ema(x, period):
+    n, t = x.shape
+    out = _nan((t, n))
+    if t < period:
+        return out.T
+    xt = _time_major(x)
+    k = 2 / (period + 1)
+    np.divide(np.cumsum(xt[:period], axis=0)[-1], period, out=out[period - 1])
+    tmp = np.empty(n)
+    for i in range(period, t):
+        np.multiply(xt[i], k, out=tmp)
+        np.multiply(out[i - 1], 1 - k, out=out[i])
+        np.add(tmp, out[i], out=out[i])
+    return out.T
+
+
+def rsi(x, period=14):
+    n, t = x.shape
+    out = _nan((t, n))
+    if t < period + 1:
+        return out.T
+    change = np.diff(_time_major(x), axis=0)
+    with np.errstate(invalid="ignore"):
+        gain = np.where(change > 0, change, 0.0)
+        loss = np.where(change < 0, np.abs(change), 0.0)
+        # The TS warm-up puts every non-positive change (NaN included) into avgLoss.
+        warm_loss = np.where(change[:period] > 0, 0.0, np.abs(change[:period]))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        avg_gain = np.cumsum(gain[:period], axis=0)[-1] / period
+        avg_loss = np.cumsum(warm_loss, axis=0)[-1] / period
+        out[period] = 100 - (100 / (1 + avg_gain / avg_loss))
+        rs = np.empty(n)
+        for i in range(period + 1, t):
+            np.multiply(avg_gain, period - 1, out=avg_gain)
+            np.add(avg_gain, gain[i - 1], out=avg_gain)
+            np.divide(avg_gain, period, out=avg_gain)
+            np.multiply(avg_loss, period - 1, out=avg_loss)
+            np.add(avg_loss, loss[i - 1], out=avg_loss)
+            np.divide(avg_loss, period, out=avg_loss)
+            np.divide(avg_gain, avg_loss, out=rs)
+            np.add(rs, 1, out=rs)
+            np.divide(100, rs, out=rs)
+            np.subtract(100, rs, out=out[i])
+    return out.T
+
+
+def bollinger(x, period=20, multiplier=BB_MULTIPLIER):
+    middle = sma(x, period)
+    n, t = x.shape
+    upper, lower = _nan((t, n)), _nan((t, n))
+    if t < period:
+        return upper.T, middle, lower.T
+    xt = _time_major(x)
+    span = t - period + 1
+    mid = np.ascontiguousarray(middle.T[period - 1:])
+    acc = np.zeros((span, n))
+    # Blocks of time rows keep acc/tmp in cache across the `period` passes.
+    block = max(1, (1 << 18) // n)
+    tmp = np.empty((block, n))
+    for b0 in range(0, span, block):
+        b1 = min(span, b0 + block)
+        a, d = acc[b0:b1], tmp[:b1 - b0]
+        for j in range(period):  # window values in order, as `for (const val of slice)`
+            np.subtract(xt[b0 + j:b1 + j], mid[b0:b1], out=d)
+            np.multiply(d, d, out=d)
+            np.add(a, d, out=a)
+    np.divide(acc, period, out=acc)
+    np.sqrt(acc, out=acc)
+    np.multiply(acc, multiplier, out=acc)
+    np.add(mid, acc, out=upper[period - 1:])
+    np.subtract(mid, acc, out=lower[period - 1:])
+    return upper.T, middle, lower.T
+
+
+def compute(x, keys):
+    """{key: matrix} for indicator keys like SMA_20, EMA_12, RSI_14, BB_UPPER_20."""
+    out = {}
+    bands = {}
+    for key in keys:
+        name, _, param = key.rpartition("_")
+        period = int(param)
+        if name == "SMA":
+            out[key] = sma(x, period)
+        elif name == "EMA":
+            out[key] = ema(x, period)
+        elif name == "RSI":
+            out[key] = rsi(x, period)
+        elif name in ("BB_UPPER", "BB_MIDDLE", "BB_LOWER"):
+            if period not in bands:
+                bands[period] = bollinger(x, period)
+            out[key] = bands[period][("BB_UPPER", "BB_MIDDLE", "BB_LOWER").index(name)]
+        else:
+            raise ValueError(f"unknown indicator {key!r}")
+    return out
+
+
+def stack(series):
+    """Left-aligned, NaN-padded matrix from 1-D series of different lengths."""
+    width = max((len(s) for s in series), default=0)
+    x = _nan((len(series), width))
+    for i, s in enumerate(series):
+        x[i, :len(s)] = s
+    return x
+
+
+def precompute(store, market, keys=DEFAULT_SET, force=False, chunk=CHUNK_TICKERS):
+    """
+    Computes `keys` for every ticker of `market` whose bars changed since the last run.
+    Keys stored by earlier runs are kept: a rewritten ticker gets them recomputed too.
+    Tickers are grouped by length so a chunk's matrix carries little padding; a chunk
+    holds (keys x chunk x bars) floats, ~130 MB for 13 keys over 10 years of dailies.
+    """
+    todo = []
+    for ticker in store.tickers(market):
+        source = store.close_fingerprint(market, ticker)
+        meta = store.indicator_meta(market, ticker)
+        if not force and meta and meta.get("source") == source and set(keys) <= set(meta["keys"]):
+            continue
+        ticker_keys = list(keys) + [k for k in (meta["keys"] if meta else []) if k not in keys]
+        todo.append((store.read(market, ticker, "c")["c"], source, ticker, ticker_keys))
+    todo.sort(key=lambda item: len(item[0]))
+    bars = 0
+    for start in range(0, len(todo), chunk):
+        group = todo[start:start + chunk]
+        x = stack([closes for closes, _, _, _ in group])
+        index = {key: i for i, key in enumerate(dict.fromkeys(k for *_, ticker_keys in group for k in ticker_keys))}
+        values = np.empty((len(index),) + x.shape)
+        for key, i in index.items():
+            values[i] = compute(x, [key])[key]
+        for row, (closes, source, ticker, ticker_keys) in enumerate(group):
+            rows = [index[k] for k in ticker_keys]
+            store.write_indicators(market, ticker, ticker_keys, values[rows, row, :len(closes)], source)
+            bars += len(closes)
+    return len(todo), bars
+
+
+def load_ts_output(path):
+    """Output of tests/verify_indicator_parity.ts; JSON nulls are TS NaNs."""
+    with open(path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    for case in data["cases"]:
+        case["closes"] = np.asarray([np.nan if v is None else v for v in case["closes"]], dtype=np.float64)
+        case["outputs"] = {k: np.asarray([np.nan if v is None else v for v in vals], dtype=np.float64)
+                           for k, vals in case["outputs"].items()}
+    return data["cases"]
+
+
+def parity(cases, rtol=0.0):
+    """Mismatches between the TS outputs and this module, as (case, key, detail) tuples."""
+    problems = []
+    for case in cases:
+        ours = compute(case["closes"][None, :], list(case["outputs"]))
+        for key, expected in case["outputs"].items():
+            got = ours[key][0]
+            if got.shape != expected.shape:
+                problems.append((case["name"], key, f"length {got.shape[0]} != {expected.shape[0]}"))
+                continue
+            nan_diff = np.isnan(got) != np.isnan(expected)
+            if nan_diff.any():
+                problems.append((case["name"], key, f"NaN padding differs at index {int(np.argmax(nan_diff))}"))
+                continue
+            both = ~np.isnan(got)
+            if not both.any():
+                continue
+            err = np.abs(got[both] - expected[both])
+            # Inf - Inf is NaN; the TS RSI never produces Inf, but be explicit about it.
+            err = np.where(got[both] == expected[both], 0.0, err)
+            worst = float(np.max(err / np.maximum(np.abs(expected[both]), 1e-300)))
+            if worst > rtol:
+                problems.append((case["name"], key, f"max relative error {worst:.3e}"))
+    return problems
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Vectorized indicator precompute over the bar store (TechnicalAnalysis.ts semantics).")
+    parser.add_argument("--root", default=DEFAULT_ROOT)
+    sub = parser.add_subparsers(dest="command", required=True)
+    p = sub.add_parser("run", help="Precompute indicators for every ticker whose bars changed")
+    p.add_argument("markets", nargs="*", help="Default: every market in the store")
+    p.add_argument("--keys", nargs="+", default=DEFAULT_SET, help="Indicator keys, e.g. SMA_20 EMA_12 RSI_14 BB_UPPER_20")
+    p.add_argument("--force", action="store_true", help="Recompute even if the bars didn't change")
+    p = sub.add_parser("parity", help="Compare against tests/verify_indicator_parity.ts output")
+    p.add_argument("ts_output", help="JSON written by `npx tsx tests/verify_indicator_parity.ts OUT.json`")
+    p.add_argument("--rtol", type=float, default=0.0, help="Allowed relative error (default: exact)")
+    args = parser.parse_args(argv)
+
+    if args.command == "parity":
+        cases = load_ts_output(args.ts_output)
+        problems = parity(cases, args.rtol)
+        checked = sum(len(c["outputs"]) for c in cases)
+        for name, key, detail in problems:
+            print(f"❌ {name} {key}: {detail}")
+        if problems:
+            print(f"❌ {len(problems)}/{checked} series differ from TechnicalAnalysis.ts")
+            return 1
+        print(f"✅ {checked} series across {len(cases)} cases match TechnicalAnalysis.ts")
+        return 0
+
+    store = BarStore(args.root)
+    markets = [m.upper() for m in args.markets] or store.markets()
+    if not markets:
+        print(f"❌ No bars in {store.root}; run `ops bars ingest` first.")
+        return 1
+    for market in markets:
+        started = time.perf_counter()
+        tickers, bars = precompute(store, market, args.keys, args.force)
+        elapsed = time.perf_counter() - started
+        rate = f", {tickers / elapsed:.0f} tickers/s" if tickers and elapsed else ""
+        print(f"📈 {market}: {tickers} tickers ({bars} bars) x {len(args.keys)} indicators in {elapsed:.2f}s{rate}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,231 @@
+
+import argparse
+import heapq
+import json
+import random
+import threading
+import time
+import uuid
+from datetime import datetime, timezone
+
+import requests
+from ops_config import get, keyset_filter, rest_session
+from supabase_writer import BatchedWriter
+
+# `supabase start` serves PostgREST here (see supabase/config.toml); apply the .supabase/*.sql schemas to it first.
+DEFAULT_URL = "http://127.0.0.1:54321"
+
+CHANNELS = ["rassiro_channel", "hedgehara", "FastStockNews", "corevalue", "awakeplanning", "global_macro_en"]
+COMPANIES = [("에스엠씨지", "SMCG"), ("삼성전자", "005930"), ("SK하이닉스", "000660"), ("에코프로비엠", "247540"),
+             ("한미반도체", "042700"), ("알테오젠", "196170"), ("NVIDIA", "NVDA"), ("Micron", "MU"), ("Tesla", "TSLA")]
+BROKERS = ["키움증권", "한국투자증권", "미래에셋증권", "NH투자증권", "삼성증권", "KB증권", "하나증권"]
+RATINGS = ["Buy", "Not Rated", "Outperform", "Hold", "Trading Buy"]
+KO_HEADLINES = ["유리용기는 시간을 들여야...", "HBM 수요 견조, 실적 서프라이즈", "수주잔고 사상 최대", "하반기 턴어라운드 기대",
+                "밸류업 공시로 주주환원 확대", "목표주가 상향, 업황 바닥 통과", "단기 차익실현 매물 주의"]
+EN_HEADLINES = ["Global Semi Sector Outlook", "Fed pivot odds rise after soft CPI", "AI capex cycle extends into 2026",
+                "Memory pricing surprises to the upside", "EV demand slowdown weighs on suppliers"]
+SENTIMENTS = ["BULLISH", "BEARISH", "NEUTRAL"]
+
+
+def synth_message(rng, tag):
+    name, ticker = rng.choice(COMPANIES)
+    kind = rng.random()
+    if kind < 0.5:
+        title = f"[리포트 브리핑]{name}, '{rng.choice(KO_HEADLINES)}' {rng.choice(RATINGS)} - {rng.choice(BROKERS)}"
+    elif kind < 0.8:
+        title = f"[속보] {name}({ticker}) {rng.choice(KO_HEADLINES)}"
+    else:
+        title = f"[Breaking] {ticker}: {rng.choice(EN_HEADLINES)}"
+    # Long bodies are what the app sends to Gemini (> 100 chars).
+    body = " ".join(rng.choice(KO_HEADLINES + EN_HEADLINES) for _ in range(rng.randint(1, 8)))
+    return ticker, title, f"{title}\n\n{body}\n\n{tag}"
+
+
+def arrival_times(shape, rate, duration, burst_factor, rng):
+    """Seconds (from start) at which messages are produced for the given burst shape."""
+    t, times = 0.0, []
+    while True:
+        if shape == "steady":
+            current = rate
+        elif shape == "market-open":
+            # The opening bell: burst_factor x rate for the first 10% of the run, then tapering to rate.
+            head = duration * 0.1
+            current = rate * (burst_factor if t < head else 1 + (burst_factor - 1) * max(0.0, 1 - (t - head) / head))
+        elif shape == "square":
+            # 10s on at burst_factor x rate, 10s quiet.
+            current = rate * burst_factor if int(t // 10) % 2 == 0 else rate * 0.05
+        else:  # poisson
+            current = rate
+        gap = rng.expovariate(current) if shape in ("poisson", "market-open", "square") else 1.0 / current
+        t += gap
+        if t >= duration:
+            return times
+        times.append(t)
+
+
+def percentiles(values, points=(50, 90, 95, 99)):
+    if not values:
+        return {f"p{p}": None for p in points} | {"max": None}
+    ordered = sorted(values)
+    out = {f"p{p}": ordered[min(len(ordered) - 1, int(round(p / 100 * (len(ordered) - 1))))] for p in points}
+    out["max"] = ordered[-1]
+    return out
+
+
+class ResultWatcher(threading.Thread):
+    """Polls ai_thought_logs for this run's DECISION rows and records when each one becomes visible."""
+
+    def __init__(self, url, key, run_id, interval=0.2):
+        super().__init__(daemon=True)
+        self.endpoint = f"{url.rstrip('/')}/rest/v1/ai_thought_logs"
+        self.run_id = run_id
+        self.interval = interval
+        self.session = rest_session(url, key)
+        self.seen = {}
+        self.stop_event = threading.Event()
+        self.errors = 0
+
+    def run(self):
+        cursor = None
+        while not self.stop_event.is_set():
+            params = {
+                "select": "id,created_at,details",
+                "action": "eq.DECISION",
+                "details->>loadgen_run": f"eq.{self.run_id}",
+                "order": "created_at.asc,id.asc",
+                "limit": "1000",
+            }
+            if cursor:
+                params["or"] = keyset_filter(cursor)
+            try:
+                r = self.session.get(self.endpoint, params=params, timeout=10)
+                r.raise_for_status()
+                rows = r.json()
+            except requests.RequestException:
+                self.errors += 1
+                rows = []
+            now = time.monotonic()
+            for row in rows:
+                seq = (row.get("details") or {}).get("loadgen_seq")
+                if seq is not None:
+                    self.seen.setdefault(seq, now)
+            if rows:
+                cursor = (rows[-1]["created_at"], rows[-1]["id"])
+            if len(rows) < 1000:
+                self.stop_event.wait(self.interval)
+
+
+def run_load(args):
+    rng = random.Random(args.seed)
+    run_id = uuid.uuid4().hex[:8]
+    schedule = arrival_times(args.shape, args.rate, args.duration, args.burst_factor, rng)
+    print(f"🚀 Run {run_id}: {len(schedule)} messages over {args.duration}s ({args.shape}, base {args.rate}/s) -> {args.url}")
+
+    writer = BatchedWriter(args.url, args.key, batch_size=args.batch_size, flush_interval=args.flush_interval)
+    watcher = ResultWatcher(args.url, args.key, run_id)
+    watcher.start()
+
+    # Events are (due_time, order, kind, seq, payload); analysis rows are scheduled relative to their message.
+    events = [(t, i, "message", i, None) for i, t in enumerate(schedule)]
+    heapq.heapify(events)
+    produced_at = {}
+    counts = {"telegram_messages": 0, "ai_thought_logs": 0}
+    order = len(events)
+    started = time.monotonic()
+
+    while events:
+        due, _, kind, seq, payload = heapq.heappop(events)
+        delay = started + due - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+        now_iso = datetime.now(timezone.utc).isoformat()
+
+        if kind == "message":
+            ticker, title, text = synth_message(rng, f"#lg-{run_id}-{seq}")
+            writer.add("telegram_messages", {"channel": rng.choice(CHANNELS), "message": text, "created_at": now_iso})
+            produced_at[seq] = time.monotonic()
+            counts["telegram_messages"] += 1
+            analysis_delay = rng.lognormvariate(0, 0.5) * args.analysis_latency
+            order += 2
+            heapq.heappush(events, (due + 0.05, order - 1, "analyzing", seq, (ticker, title)))
+            heapq.heappush(events, (due + analysis_delay, order, "decision", seq, (ticker, title)))
+        elif kind == "analyzing":
+            ticker, title = payload
+            writer.add("ai_thought_logs", {
+                "action": "ANALYSIS", "strategy": "CONTENT_ANALYSIS", "ticker": ticker, "confidence": 0,
+                "message": f"[Intel] ⏳ AI Analyzing: {title}", "created_at": now_iso,
+                "details": {"loadgen_run": run_id, "loadgen_seq": seq},
+            })
+            counts["ai_thought_logs"] += 1
+        else:
+            ticker, title = payload
+            sentiment = rng.choice(SENTIMENTS)
+            writer.add("ai_thought_logs", {
+                "action": "DECISION", "strategy": "CONTENT_ANALYSIS", "ticker": ticker,
+                "confidence": rng.randint(40, 95), "created_at": now_iso,
+                "message": f"[Intel] ✅ 분석 완료: {title} -> {sentiment}",
+                "details": {"loadgen_run": run_id, "loadgen_seq": seq, "source_title": title,
+                            "analysis_result": {"sentiment": sentiment, "urgency": rng.choice(["HIGH", "MEDIUM", "LOW"])}},
+            })
+            counts["ai_thought_logs"] += 1
+
+    writer.close()
+    produce_elapsed = time.monotonic() - started
+
+    # Give the watcher time to observe the tail of the run.
+    deadline = time.monotonic() + args.drain_timeout
+    while len(watcher.seen) < len(schedule) and time.monotonic() < deadline:
+        time.sleep(0.1)
+    watcher.stop_event.set()
+    watcher.join()
+
+    latencies = [watcher.seen[s] - produced_at[s] for s in watcher.seen if s in produced_at]
+    report = {
+        "run_id": run_id,
+        "messages": counts["telegram_messages"],
+        "thought_logs": counts["ai_thought_logs"],
+        "rows_written": writer.stats["rows_written"],
+        "rows_failed": writer.stats["rows_failed"],
+        "insert_requests": writer.stats["requests"],
+        # Achieved rate including the final flush; it tracks the offered load until the store falls behind.
+        "insert_rows_per_sec": writer.stats["rows_written"] / produce_elapsed if produce_elapsed else None,
+        "results_seen": len(latencies),
+        "watch_errors": watcher.errors,
+        "e2e_latency_sec": percentiles(latencies),
+    }
+    return report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Synthetic telegram_messages / ai_thought_logs load against a local PostgREST.")
+    parser.add_argument("--url", default=get("LOCAL_SUPABASE_URL", default=DEFAULT_URL))
+    parser.add_argument("--key", default=get("LOCAL_SUPABASE_ANON_KEY", "SUPABASE_ANON_KEY"))
+    parser.add_argument("--rate", type=float, default=5.0, help="Base messages per second")
+    parser.add_argument("--duration", type=float, default=60.0, help="Seconds of load to generate")
+    parser.add_argument("--shape", choices=["steady", "poisson", "market-open", "square"], default="poisson")
+    parser.add_argument("--burst-factor", type=float, default=10.0, help="Peak multiplier for market-open/square shapes")
+    parser.add_argument("--analysis-latency", type=float, default=3.0, help="Median simulated analysis time in seconds")
+    parser.add_argument("--batch-size", type=int, default=200)
+    parser.add_argument("--flush-interval", type=float, default=0.25)
+    parser.add_argument("--drain-timeout", type=float, default=15.0, help="Seconds to wait for the last results")
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--json", action="store_true", help="Print the report as JSON")
+    args = parser.parse_args(argv)
+
+    if not args.key:
+        print("❌ Error: no API key (set LOCAL_SUPABASE_ANON_KEY or pass --key).")
+        exit(1)
+
+    report = run_load(args)
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return
+    lat = report["e2e_latency_sec"]
+    print(f"✅ Inserted {report['rows_written']} rows ({report['rows_failed']} failed) in {report['insert_requests']} requests "
+          f"- {report['insert_rows_per_sec']:.0f} rows/s")
+    print(f"📊 Results seen {report['results_seen']}/{report['messages']} | e2e latency "
+          + " ".join(f"{k}={v:.2f}s" if v is not None else f"{k}=-" for k, v in lat.items()))
+
+
+if __name__ == "__main__":
+    main()
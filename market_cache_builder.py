@@ -0,0 +1,359 @@
+
+import argparse
+import csv
+import hashlib
+import io
+import json
+import mmap
+import os
+import re
+import struct
+from bisect import bisect_left
+from datetime import datetime, timezone
+
+from text_decoding import read_text
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+CACHE_DIR = os.path.join(ROOT, "services", "marketResolver")
+CACHE_PATH = os.path.join(CACHE_DIR, "market_cache.json")
+META_PATH = os.path.join(CACHE_DIR, "market_cache.meta.json")
+INDEX_PATH = os.path.join(CACHE_DIR, "market_cache.idx")
+KNOWN_MAP_PATH = os.path.join(ROOT, "services", "utils", "marketExchangeMap.ts")
+
+# KIS overseas EXCD codes the resolver understands. NYSE Arca / Cboe / IEX listings
+# (mostly ETFs) are quoted under AMS by KIS, the same way SPY is.
+EXCHANGES = ("NAS", "NYS", "AMS")
+OTHERLISTED_EXCHANGE = {"N": "NYS", "A": "AMS", "P": "AMS", "Z": "AMS", "V": "AMS"}
+# Screener-style dumps don't carry the exchange; it comes from which flag they were passed with.
+SCREENER_EXCHANGE = {"nasdaq": "NAS", "nyse": "NYS", "amex": "AMS"}
+# Lower rank wins when two sources disagree: the Nasdaq Trader symbol directories are authoritative.
+SOURCE_RANK = {"nasdaqlisted": 0, "otherlisted": 0, "screener": 1}
+
+KR_CODE_RE = re.compile(r'^(\d{6})(?:\.(KS|KQ))?$')
+SYMBOL_RE = re.compile(r'^[A-Z][A-Z0-9.\-]{0,9}$')
+KNOWN_ENTRY_RE = re.compile(r"'([A-Z0-9.\-]+)'\s*:\s*'([A-Z]{3})'")
+
+INDEX_MAGIC = b"MKTIDX1\0"
+INDEX_HEADER = struct.Struct("<8sIIII")  # magic, version, count, key width, reserved
+
+
+def normalize_symbol(symbol):
+    # Screener dumps write class shares as BRK/B or BRK^B; the app and KIS use BRK.B.
+    return symbol.strip().upper().replace("/", ".").replace("^", ".")
+
+
+def sha256_file(path):
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def sniff_rows(path):
+    """Rows of a '|' or ',' delimited dump as dicts, whatever its encoding (KRX files are cp949)."""
+    text, _ = read_text(path)
+    head = text.split("\n", 1)[0]
+    delimiter = "|" if head.count("|") > head.count(",") else ","
+    reader = csv.DictReader(io.StringIO(text), delimiter=delimiter)
+    for row in reader:
+        yield {(k or "").strip().lstrip("\ufeff"): (v or "").strip() for k, v in row.items()}
+
+
+def read_us_listing(path, exchange=None):
+    """
+    (symbol, exchange, source) from a Nasdaq Trader nasdaqlisted.txt / otherlisted.txt,
+    or from a screener CSV with a Symbol column (exchange given by the caller).
+    """
+    for row in sniff_rows(path):
+        if "Symbol" in row and "Market Category" in row:
+            source, excd, symbol = "nasdaqlisted", "NAS", row["Symbol"]
+        elif "ACT Symbol" in row:
+            source, symbol = "otherlisted", row["ACT Symbol"]
+            excd = OTHERLISTED_EXCHANGE.get(row.get("Exchange", ""))
+        elif "Symbol" in row and exchange:
+            source, excd, symbol = "screener", exchange, row["Symbol"]
+        else:
+            raise ValueError(f"{path}: unrecognized listing format (columns: {', '.join(list(row)[:6])})")
+        if row.get("Test Issue") == "Y" or symbol.startswith("File Creation Time"):
+            continue
+        symbol = normalize_symbol(symbol)
+        if excd and SYMBOL_RE.match(symbol):
+            yield symbol, excd, source
+
+
+def read_krx_listing(path):
+    """6-digit codes -> market from a KRX data portal (or KIND) listed-companies download."""
+    codes = {}
+    for row in sniff_rows(path):
+        code = row.get("단축코드") or row.get("종목코드") or row.get("Code") or ""
+        code = code.strip().lstrip("A")
+        if code.isdigit():
+            code = code.zfill(6)
+            codes[code] = row.get("시장구분") or row.get("Market") or "KRX"
+    return codes
+
+
+def load_known_exchanges(path=KNOWN_MAP_PATH):
+    """The hardcoded Tier 1 map in marketExchangeMap.ts, to cross-check against the listings."""
+    if not os.path.isfile(path):
+        return {}
+    text, _ = read_text(path)
+    return dict(KNOWN_ENTRY_RE.findall(text))
+
+
+def build_map(us_sources):
+    """us_sources: [(path, exchange or None)] -> (ticker map, conflicts, per-source row counts)."""
+    chosen = {}
+    conflicts = []
+    counts = {}
+    for path, exchange in us_sources:
+        n = 0
+        for symbol, excd, source in read_us_listing(path, exchange):
+            n += 1
+            rank = SOURCE_RANK[source]
+            prev = chosen.get(symbol)
+            if prev is None or rank < prev[1]:
+                if prev is not None and prev[0] != excd:
+                    conflicts.append((symbol, prev[0], excd))
+                chosen[symbol] = (excd, rank)
+            elif prev[0] != excd:
+                conflicts.append((symbol, prev[0], excd))
+        counts[path] = n
+    return {s: v[0] for s, v in sorted(chosen.items())}, conflicts, counts
+
+
+def write_cache(mapping, path=CACHE_PATH):
+    """
+    Sorted, one entry per line: still a plain Record<string, string> for storageUtils.loadCache,
+    but small and diff-friendly when the listings change.
+    """
+    body = ",\n".join(f"{json.dumps(k)}:{json.dumps(v)}" for k, v in mapping.items())
+    data = ("{\n" + body + "\n}\n") if mapping else "{}\n"
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8", newline="\n") as f:
+        f.write(data)
+    os.replace(tmp, path)
+    return hashlib.sha256(data.encode("utf-8")).hexdigest()
+
+
+def write_index(mapping, version, path=INDEX_PATH):
+    """
+    Fixed-width sorted records (ticker padded to `width` bytes + 3-byte EXCD), so a
+    lookup is a binary search over an mmap with no parsing at startup.
+    """
+    width = max((len(k) for k in mapping), default=1)
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as f:
+        f.write(INDEX_HEADER.pack(INDEX_MAGIC, version, len(mapping), width, 0))
+        for ticker, excd in mapping.items():
+            f.write(ticker.encode("ascii").ljust(width, b"\0") + excd.encode("ascii"))
+    os.replace(tmp, path)
+
+
+class MarketIndex:
+    """Read side of market_cache.idx: `MarketIndex(path).get("AAPL") -> "NAS"`."""
+
+    def __init__(self, path=INDEX_PATH):
+        self._file = open(path, "rb")
+        self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, self.version, self.count, self.width, _ = INDEX_HEADER.unpack_from(self._mm, 0)
+        if magic != INDEX_MAGIC:
+            raise ValueError(f"{path}: not a market cache index")
+        self._record = self.width + 3
+
+    def _key(self, i):
+        start = INDEX_HEADER.size + i * self._record
+        return self._mm[start:start + self.width]
+
+    def __len__(self):
+        return self.count
+
+    def __getitem__(self, i):
+        return self._key(i)
+
+    def get(self, ticker, default=None):
+        key = normalize_symbol(ticker).encode("ascii", "ignore")
+        if len(key) > self.width:
+            return default
+        key = key.ljust(self.width, b"\0")
+        i = bisect_left(self, key)
+        if i < self.count and self._key(i) == key:
+            start = INDEX_HEADER.size + i * self._record + self.width
+            return self._mm[start:start + 3].decode("ascii")
+        return default
+
+    def close(self):
+        self._mm.close()
+        self._file.close()
+
+
+def previous_meta(path=META_PATH):
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def fetch_db_tickers(session, url, table, columns="ticker", page_size=1000):
+    """
+    Distinct tickers from `table`. Pages by `ticker > last`, so each ticker's rows are
+    skipped after its first page instead of being read in full.
+    """
+    tickers = {}
+    last = None
+    while True:
+        params = {"select": columns, "ticker": "not.is.null", "order": "ticker.asc", "limit": str(page_size)}
+        if last is not None:
+            params["ticker"] = f'gt."{last}"'
+        r = session.get(f"{url}/rest/v1/{table}", params=params, timeout=30)
+        r.raise_for_status()
+        rows = r.json()
+        for row in rows:
+            tickers.setdefault(row["ticker"], row)
+        if len(rows) < page_size:
+            return tickers
+        last = rows[-1]["ticker"]
+
+
+def coverage(tickers, mapping, krx_codes):
+    """Splits DB tickers into covered / missing per market; KR coverage is None without a KRX listing."""
+    report = {"us_total": 0, "us_covered": 0, "kr_total": 0, "kr_covered": 0 if krx_codes else None,
+              "us_missing": [], "kr_missing": []}
+    for raw in tickers:
+        t = raw.strip().upper()
+        m = KR_CODE_RE.match(t)
+        if m:
+            report["kr_total"] += 1
+            if not krx_codes:
+                continue
+            if m.group(1) in krx_codes:
+                report["kr_covered"] += 1
+            else:
+                report["kr_missing"].append(t)
+        elif SYMBOL_RE.match(normalize_symbol(t)):
+            report["us_total"] += 1
+            if normalize_symbol(t) in mapping:
+                report["us_covered"] += 1
+            else:
+                report["us_missing"].append(t)
+    report["us_missing"].sort()
+    report["kr_missing"].sort()
+    return report
+
+
+def pct(a, b):
+    return f"{a / b:.1%}" if b else "n/a"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build services/marketResolver/market_cache.json (ticker -> KIS EXCD) from listing dumps.")
+    parser.add_argument("--listing", action="append", default=[], help="Nasdaq Trader nasdaqlisted.txt / otherlisted.txt (repeatable)")
+    parser.add_argument("--nasdaq", action="append", default=[], help="Screener CSV of NASDAQ listings (Symbol column)")
+    parser.add_argument("--nyse", action="append", default=[], help="Screener CSV of NYSE listings")
+    parser.add_argument("--amex", action="append", default=[], help="Screener CSV of NYSE American (AMEX) listings")
+    parser.add_argument("--krx", action="append", default=[], help="KRX listed-companies download (단축코드/시장구분), for KR coverage")
+    parser.add_argument("--out", default=CACHE_PATH)
+    parser.add_argument("--index", action="store_true", help="Also write the mmap-able binary index next to the cache")
+    parser.add_argument("--tickers", help="File with one ticker per line to check coverage against, instead of the DB")
+    parser.add_argument("--no-db", action="store_true", help="Skip the coverage check against Supabase")
+    parser.add_argument("--show-missing", type=int, default=20, help="How many uncovered tickers to list")
+    parser.add_argument("--dry-run", action="store_true", help="Report only; don't write the cache")
+    args = parser.parse_args(argv)
+
+    us_sources = [(p, None) for p in args.listing]
+    for flag, excd in SCREENER_EXCHANGE.items():
+        us_sources += [(p, excd) for p in getattr(args, flag)]
+    if not us_sources:
+        parser.error("give at least one US listing (--listing, --nasdaq, --nyse or --amex)")
+
+    try:
+        mapping, conflicts, counts = build_map(us_sources)
+    except (OSError, ValueError) as e:
+        print(f"❌ {e}")
+        return 1
+    krx_codes = {}
+    for path in args.krx:
+        krx_codes.update(read_krx_listing(path))
+
+    per_exchange = {e: 0 for e in EXCHANGES}
+    for excd in mapping.values():
+        per_exchange[excd] += 1
+    print(f"📚 {len(mapping)} US tickers ({', '.join(f'{e} {n}' for e, n in per_exchange.items())}), {len(krx_codes)} KRX codes")
+    for path, n in counts.items():
+        print(f"   {os.path.basename(path)}: {n} rows")
+    if conflicts:
+        print(f"⚠️ {len(conflicts)} symbols listed on more than one exchange (authoritative source kept), e.g. "
+              + ", ".join(f"{s} {a}/{b}" for s, a, b in conflicts[:5]))
+
+    known = load_known_exchanges()
+    disagree = sorted(t for t, e in known.items() if t in mapping and mapping[t] != e)
+    if disagree:
+        print("⚠️ marketExchangeMap.ts disagrees with the listings for: "
+              + ", ".join(f"{t} ({known[t]}→{mapping[t]})" for t in disagree))
+
+    if not args.dry_run:
+        prev = previous_meta()
+        digest = write_cache(mapping, args.out)
+        version = prev.get("version", 0) + (prev.get("sha256") != digest)
+        meta = {
+            "version": version,
+            "sha256": digest,
+            "built_at": datetime.now(timezone.utc).isoformat(timespec="seconds") if prev.get("sha256") != digest else prev.get("built_at"),
+            "count": len(mapping),
+            "per_exchange": per_exchange,
+            "sources": [{"file": os.path.basename(p), "sha256": sha256_file(p), "rows": counts[p]} for p, _ in us_sources],
+        }
+        if args.out == CACHE_PATH:
+            with open(META_PATH, "w", encoding="utf-8", newline="\n") as f:
+                json.dump(meta, f, indent=2)
+                f.write("\n")
+        if args.index:
+            write_index(mapping, version, os.path.splitext(args.out)[0] + ".idx")
+        print(f"💾 Wrote {os.path.relpath(args.out)} v{version} ({os.path.getsize(args.out) / 1024:.0f} KB)")
+
+    tickers = None
+    if args.tickers:
+        with open(args.tickers, "r", encoding="utf-8") as f:
+            tickers = {line.strip(): {} for line in f if line.strip()}
+    elif not args.no_db:
+        from ops_config import rest_session, supabase_credentials
+
+        url, key = supabase_credentials()
+        if url and key:
+            import requests
+
+            session = rest_session(url, key)
+            tickers = {}
+            try:
+                tickers.update(fetch_db_tickers(session, url, "ai_thought_logs"))
+                learned = fetch_db_tickers(session, url, "ticker_exchange_cache", "ticker,exchange_code")
+            except requests.RequestException as e:
+                print(f"⚠️ Coverage check skipped: {e}")
+                return 0
+            tickers.update(learned)
+            wrong = sorted(t for t, row in learned.items() if mapping.get(t) and mapping[t] != row.get("exchange_code"))
+            if wrong:
+                print(f"⚠️ ticker_exchange_cache has {len(wrong)} codes the listings contradict "
+                      f"(likely the 'NAS' fallback): {', '.join(wrong[:args.show_missing])}")
+        else:
+            print("ℹ️ No Supabase credentials; skipping coverage (use --tickers FILE).")
+
+    if tickers is not None:
+        report = coverage(tickers, mapping, krx_codes)
+        if report["kr_covered"] is None:
+            kr = f"KR n/a ({report['kr_total']} tickers, no --krx listing)"
+        else:
+            kr = f"KR {report['kr_covered']}/{report['kr_total']} ({pct(report['kr_covered'], report['kr_total'])})"
+        print(f"🎯 Coverage: US {report['us_covered']}/{report['us_total']} ({pct(report['us_covered'], report['us_total'])}), {kr}")
+        for market in ("us", "kr"):
+            missing = report[f"{market}_missing"]
+            if missing:
+                more = f" (+{len(missing) - args.show_missing} more)" if len(missing) > args.show_missing else ""
+                print(f"   {market.upper()} missing: {', '.join(missing[:args.show_missing])}{more}")
+    return 0
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,257 @@
+
+import argparse
+import hashlib
+import json
+import random
+import re
+import struct
+import sys
+import unicodedata
+from collections import deque
+from datetime import datetime, timedelta, timezone
+
+from ops_config import keyset_filter, parse_ts, require_credentials, rest_session
+
+NUM_PERM = 64
+BANDS = 16  # 16 bands x 4 rows: pairs above ~0.5 Jaccard almost always share a band
+SHINGLE = 3
+DEFAULT_THRESHOLD = 0.7
+DEFAULT_WINDOW_HOURS = 6
+# Messages at or below this length are not sent to the AI (see test_url_pipeline.py), so they cost nothing.
+ANALYZED_MIN_CHARS = 100
+
+_MERSENNE = (1 << 61) - 1
+_rng = random.Random(0x5EED)
+PERMUTATIONS = [(_rng.randrange(1, _MERSENNE), _rng.randrange(0, _MERSENNE)) for _ in range(NUM_PERM)]
+
+URL_RE = re.compile(r'https?://\S+')
+TAG_RE = re.compile(r'^\s*\[[\w.@-]+\]\s*')  # leading "[rassiro_channel]" forward tag
+NOISE_RE = re.compile(r'[^\w가-힣]+')
+CRAWL_NOISE = ("[Auto-Crawled Summary]:", "Original Link:")
+
+
+def normalize_text(text):
+    """NFKC, lowercase, drops links, forward tags and punctuation; Hangul and digits are kept."""
+    text = unicodedata.normalize("NFKC", text or "")
+    for marker in CRAWL_NOISE:
+        text = text.replace(marker, " ")
+    text = URL_RE.sub(" ", text)
+    text = TAG_RE.sub("", text)
+    return NOISE_RE.sub(" ", text.lower()).strip()
+
+
+def shingles(normalized, n=SHINGLE):
+    # Character n-grams over the text without spaces: no Korean tokenizer needed and
+    # spacing differences ("유리 용기" vs "유리용기") don't change the set.
+    compact = normalized.replace(" ", "")
+    if len(compact) <= n:
+        return {compact} if compact else set()
+    return {compact[i:i + n] for i in range(len(compact) - n + 1)}
+
+
+def minhash(shingle_set):
+    if not shingle_set:
+        return None
+    hashes = [struct.unpack("<Q", hashlib.blake2b(s.encode("utf-8"), digest_size=8).digest())[0] for s in shingle_set]
+    return tuple(min((a * h + b) % _MERSENNE for h in hashes) for a, b in PERMUTATIONS)
+
+
+def similarity(sig_a, sig_b):
+    """Estimated Jaccard similarity of two MinHash signatures."""
+    return sum(x == y for x, y in zip(sig_a, sig_b)) / len(sig_a)
+
+
+def band_keys(sig, bands=BANDS):
+    rows = len(sig) // bands
+    return [(b, hash(sig[b * rows:(b + 1) * rows])) for b in range(bands)]
+
+
+class NearDupFilter:
+    """
+    Sliding-window near-duplicate detector (MinHash + LSH).
+
+    check() compares a message against everything seen in the last
+    `window` seconds. Candidates come from LSH band collisions and are
+    confirmed by estimated Jaccard >= `threshold`. A duplicate joins the
+    cluster of its closest match; otherwise the message starts a new
+    cluster whose id is its own key. Entries older than the window are
+    dropped from the index and their clusters as new messages arrive; a
+    cluster is forgotten once its last member has aged out.
+    """
+
+    def __init__(self, threshold=DEFAULT_THRESHOLD, window=DEFAULT_WINDOW_HOURS * 3600):
+        self.threshold = threshold
+        self.window = window
+        self.buckets = {}       # band key -> set of entry keys
+        self.entries = {}       # entry key -> (signature, cluster id, band keys, similarity)
+        self.order = deque()    # (timestamp, entry key), oldest first
+        self.clusters = {}      # cluster id -> deque of live member keys, oldest first
+        self._auto_key = 0
+        self.stats = {"seen": 0, "duplicates": 0, "empty": 0, "clusters": 0, "analyzed_seen": 0, "analyzed_duplicates": 0}
+
+    def _expire(self, now):
+        while self.order and self.order[0][0] < now - self.window:
+            _, key = self.order.popleft()
+            entry = self.entries.pop(key, None)
+            if entry is None:
+                continue
+            _, cluster, keys, _ = entry
+            for bk in keys:
+                members = self.buckets.get(bk)
+                if members:
+                    members.discard(key)
+                    if not members:
+                        del self.buckets[bk]
+            # Members join in time order, so the expiring key is the cluster's oldest.
+            members = self.clusters.get(cluster)
+            if members:
+                members.popleft()
+                if not members:
+                    del self.clusters[cluster]
+
+    def check(self, text, ts=None, key=None):
+        """
+        Returns (is_duplicate, cluster_id, similarity) and indexes the message.
+        `ts` is a POSIX timestamp (default: now); messages should arrive roughly in time order.
+        A key still in the window is not indexed twice: its earlier verdict is returned.
+        """
+        now = ts if ts is not None else datetime.now(timezone.utc).timestamp()
+        if key is None:
+            self._auto_key += 1
+            key = self._auto_key
+        self._expire(now)
+        if key in self.entries:
+            _, cluster, _, sim = self.entries[key]
+            return cluster != key, cluster, sim
+        self.stats["seen"] += 1
+        analyzed = len(text or "") > ANALYZED_MIN_CHARS
+        self.stats["analyzed_seen"] += analyzed
+
+        sig = minhash(shingles(normalize_text(text)))
+        if sig is None:
+            self.stats["empty"] += 1
+            return False, key, 0.0
+
+        keys = band_keys(sig)
+        best, best_sim = None, 0.0
+        candidates = set()
+        for bk in keys:
+            candidates |= self.buckets.get(bk, set())
+        for other in candidates:
+            sim = similarity(sig, self.entries[other][0])
+            if sim > best_sim:
+                best, best_sim = other, sim
+
+        if best is not None and best_sim >= self.threshold:
+            cluster = self.entries[best][1]
+            self.stats["duplicates"] += 1
+            self.stats["analyzed_duplicates"] += analyzed
+        else:
+            cluster = key
+            self.stats["clusters"] += 1
+        self.clusters.setdefault(cluster, deque()).append(key)
+
+        # Duplicates stay indexed too, so a slowly drifting rewrite still chains to its cluster.
+        self.entries[key] = (sig, cluster, keys, best_sim)
+        self.order.append((now, key))
+        for bk in keys:
+            self.buckets.setdefault(bk, set()).add(key)
+        return cluster != key, cluster, best_sim
+
+    def ratio(self):
+        return self.stats["duplicates"] / self.stats["seen"] if self.stats["seen"] else 0.0
+
+    def report(self):
+        s = self.stats
+        return {
+            **s,
+            "dedupe_ratio": round(self.ratio(), 4),
+            "llm_calls_saved": s["analyzed_duplicates"],
+            "llm_call_reduction": round(s["analyzed_duplicates"] / s["analyzed_seen"], 4) if s["analyzed_seen"] else 0.0,
+        }
+
+
+def fetch_messages(url, since, limit=None, page_size=1000):
+    """Yields telegram_messages rows created after `since` (ISO string), oldest first."""
+    session = rest_session()
+    endpoint = f"{url}/rest/v1/telegram_messages"
+    cursor, served = None, 0
+    while True:
+        params = {"select": "id,created_at,channel,message", "order": "created_at.asc,id.asc",
+                  "limit": str(page_size), "created_at": f"gt.{since}"}
+        if cursor:
+            params["or"] = keyset_filter(cursor)
+        r = session.get(endpoint, params=params, timeout=60)
+        r.raise_for_status()
+        rows = r.json()
+        for row in rows:
+            yield row
+            served += 1
+            if limit and served >= limit:
+                return
+        if len(rows) < page_size:
+            return
+        cursor = (rows[-1]["created_at"], rows[-1]["id"])
+
+
+def read_lines(path):
+    """Messages from a file: JSON lines with a 'message' field (and optional created_at/id), or plain text lines."""
+    stream = sys.stdin if path == "-" else open(path, "r", encoding="utf-8")
+    with stream:
+        for i, line in enumerate(stream):
+            line = line.rstrip("\n")
+            if not line.strip():
+                continue
+            try:
+                row = json.loads(line)
+            except ValueError:
+                row = None
+            yield row if isinstance(row, dict) else {"id": i, "message": line}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Find near-duplicate telegram messages (MinHash + LSH over a sliding window).")
+    parser.add_argument("file", nargs="?", help="JSON-lines or text file of messages ('-' for stdin); default: recent telegram_messages")
+    parser.add_argument("--hours", type=float, default=24, help="How far back to read telegram_messages")
+    parser.add_argument("--limit", type=int, default=None)
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD, help="Estimated Jaccard similarity for a duplicate")
+    parser.add_argument("--window", type=float, default=DEFAULT_WINDOW_HOURS, help="Sliding window in hours")
+    parser.add_argument("--show", type=int, default=10, help="Print the N largest clusters")
+    parser.add_argument("--json", action="store_true", help="Print the report as JSON")
+    args = parser.parse_args(argv)
+
+    if args.file:
+        rows = read_lines(args.file)
+    else:
+        url, _ = require_credentials()
+        since = (datetime.now(timezone.utc) - timedelta(hours=args.hours)).isoformat()
+        rows = fetch_messages(url, since, args.limit)
+
+    dedupe = NearDupFilter(args.threshold, args.window * 3600)
+    # The filter forgets clusters as they leave the window; the report keeps every one.
+    texts, clusters = {}, {}
+    for row in rows:
+        ts = row.get("created_at")
+        ts = parse_ts(ts).timestamp() if ts else None
+        key = row.get("id")
+        _, cluster, _ = dedupe.check(row.get("message") or "", ts, key)
+        texts[key] = row.get("message") or ""
+        clusters.setdefault(cluster, []).append(key)
+
+    report = dedupe.report()
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return
+
+    print(f"📊 {report['seen']} messages -> {report['clusters']} clusters, {report['duplicates']} near-duplicates "
+          f"(dedupe ratio {report['dedupe_ratio']:.1%})")
+    print(f"💸 AI analyses avoidable: {report['llm_calls_saved']}/{report['analyzed_seen']} "
+          f"({report['llm_call_reduction']:.1%} of messages long enough to be analyzed)")
+    largest = sorted((m for m in clusters.values() if len(m) > 1), key=len, reverse=True)[:args.show]
+    for members in largest:
+        head = " ".join(texts.get(members[0], "").split())[:80]
+        print(f"  x{len(members):<4} {head}")
+
+
+if __name__ == "__main__":
+    main()
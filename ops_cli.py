@@ -0,0 +1,126 @@
+
+import importlib
+import sys
+import time
+
+# name -> (module, entry point, summary). Modules are imported only when their command runs,
+# so `ops cat` never pays for requests/aiohttp/pyarrow.
+COMMANDS = {
+    "config": ("ops_config", "main", "Show resolved settings, or `save-key` to store the Supabase key"),
+    "verify": ("verify_thoughts", "main", "Check recent ai_thought_logs (--once), or --tail them as JSON lines"),
+    "insert-test": ("force_insert_intel", "main", "Insert the test CONTENT_ANALYSIS thought logs"),
+    "url-pipeline": ("test_url_pipeline", "main", "Fetch the sample report URL and insert it as a message"),
+    "crawl": ("url_crawler", "main", "Concurrent crawl-and-ingest of report links"),
+    "url-cache": ("url_cache", "main", "Inspect or evict the crawled-URL cache"),
+    "extract": ("article_extractor", "main", "Extract article text from a saved HTML page"),
+    "monitor": ("pipeline_monitor", "main", "Collector freshness and ingest->analysis lag (JSON lines or /metrics)"),
+    "trace": ("pipeline_trace", "main", "Show merged stage-latency traces, or convert them to Prometheus text"),
+    "dedupe": ("near_dup", "main", "Near-duplicate report on recent telegram_messages"),
+    "tag": ("entity_tagger", "main", "Tag telegram messages with candidate tickers and the broker"),
+    "export": ("export_intel", "main", "Incremental Parquet export of intel tables"),
+    "retention": ("retention_job", "main", "Archive old intel rows to .jsonl.gz and delete them in batches"),
+    "market-cache": ("market_cache_builder", "main", "Build the ticker -> EXCD resolver cache from listing dumps"),
+    "bars": ("bar_store", "main", "Memory-mapped OHLCV bar store: ingest, ls, show"),
+    "indicators": ("indicator_batch", "main", "Precompute SMA/EMA/RSI/BB for the bar store, or check TS parity"),
+    "tokens": ("token_rollup", "main", "Token usage rollups and rate-limit alerts"),
+    "analysis-queue": ("analysis_queue", "main", "Budget-aware priority queue for LLM analysis of messages (run, or bench with a stub)"),
+    "loadgen": ("load_generator", "main", "Synthetic load against a local PostgREST"),
+    "replay": ("replay_intel", "main", "Replay a recorded day of intel at 1x/10x/100x and measure consumer lag"),
+    "standin": ("postgrest_standin", "main", "Local PostgREST stand-in (SQLite) with the repo's table definitions"),
+    "cat": ("debug_cat", "main", "Print the start of a file with its detected encoding"),
+    "cat-all": ("debug_cat_force", "main", "Print a whole file, any encoding"),
+    "grep": ("debug_grep", "main", "Literal search of one path: grep PATH [KEYWORD]"),
+    "search": ("code_search", "main", "Regex search over the source tree (optional trigram index)"),
+    "intervals": ("debug_intervals", "main", "setInterval/setTimeout timers and fires per hour"),
+    "prompts": ("prompt_profiler", "main", "Prompt tokens per Gemini call site, ranked by tokens/day"),
+    "patch": ("patch_engine", "main", "Apply TS function patch manifests"),
+    "patch-screener": ("patch_screener", "run", "Apply patches/screener_v1.json"),
+    "patch-screener-v3": ("patch_screener_v3", "run", "Apply patches/screener_v3.json"),
+}
+CHAIN = "+"
+
+USAGE = """usage: ops [--timing] COMMAND [ARGS...] [+ COMMAND [ARGS...] ...]
+
+Commands separated by '+' run in one process and share the cached
+config and HTTP session (e.g. `ops insert-test + verify --once`).
+`ops COMMAND -h` shows a command's options.
+
+commands:
+"""
+
+
+def usage():
+    width = max(map(len, COMMANDS))
+    return USAGE + "\n".join(f"  {name:<{width}}  {summary}" for name, (_, _, summary) in COMMANDS.items())
+
+
+def split_chain(argv):
+    chain, current = [], []
+    for arg in argv:
+        if arg == CHAIN:
+            if current:
+                chain.append(current)
+            current = []
+        else:
+            current.append(arg)
+    if current:
+        chain.append(current)
+    return chain
+
+
+def run_command(name, args, timing=False):
+    module_name, entry, _ = COMMANDS[name]
+    started = time.perf_counter()
+    module = importlib.import_module(module_name)
+    imported = time.perf_counter()
+    try:
+        code = getattr(module, entry)(args)
+    except SystemExit as e:
+        code = e.code
+    except KeyboardInterrupt:
+        code = 130
+    if timing:
+        done = time.perf_counter()
+        print(f"⏱️ {name}: import {(imported - started) * 1000:.1f} ms, run {(done - imported) * 1000:.1f} ms",
+              file=sys.stderr)
+    if code is None or code is True:
+        return 0
+    return code if isinstance(code, int) else 1
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    timing = False
+    while argv and argv[0].startswith("-"):
+        if argv[0] == "--timing":
+            timing = True
+            argv = argv[1:]
+        elif argv[0] in ("-h", "--help"):
+            print(usage())
+            return 0
+        else:
+            print(f"ops: unknown option {argv[0]}\n\n{usage()}", file=sys.stderr)
+            return 2
+
+    chain = split_chain(argv)
+    if not chain:
+        print(usage())
+        return 2
+    for cmd in chain:
+        if cmd[0] not in COMMANDS:
+            print(f"ops: unknown command {cmd[0]!r}\n\n{usage()}", file=sys.stderr)
+            return 2
+
+    started = time.perf_counter()
+    for cmd in chain:
+        code = run_command(cmd[0], cmd[1:], timing)
+        if code:
+            # Later commands usually depend on earlier ones (insert, then verify).
+            return code
+    if timing and len(chain) > 1:
+        print(f"⏱️ total {(time.perf_counter() - started) * 1000:.1f} ms", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,194 @@
+
+import argparse
+import json
+import os
+import re
+import sys
+from datetime import datetime, timezone
+from functools import lru_cache
+
+from text_decoding import read_text
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+# Read in order; earlier files win, and real environment variables always win.
+ENV_FILES = ('.env', '.env.local')
+SECRETS_PATH = os.path.join(ROOT, '.cache', 'ops_secrets.json')
+
+URL_VARS = ('SUPABASE_URL', 'VITE_SUPABASE_URL')
+KEY_VARS = ('SUPABASE_ANON_KEY', 'VITE_SUPABASE_ANON_KEY')
+
+
+def parse_env(text):
+    """KEY=VALUE lines as written by dotenv/PowerShell: comments, `export`, and quoted values."""
+    values = {}
+    for line in text.splitlines():
+        line = line.strip().lstrip('\ufeff')
+        if not line or line.startswith('#') or '=' not in line:
+            continue
+        if line.startswith('export '):
+            line = line[7:]
+        name, _, value = line.partition('=')
+        value = value.strip()
+        if len(value) >= 2 and value[0] == value[-1] and value[0] in '"\'':
+            value = value[1:-1]
+        elif ' #' in value:
+            value = value.split(' #', 1)[0].rstrip()
+        values[name.strip()] = value
+    return values
+
+
+@lru_cache(maxsize=None)
+def load_env():
+    """
+    Loads the .env files once per process into os.environ (without overriding
+    what is already set) and returns the merged values. Files are decoded with
+    text_decoding, so the UTF-16 .env files PowerShell writes work too.
+    """
+    merged = {}
+    dirs = [os.getcwd()] + ([ROOT] if os.path.abspath(os.getcwd()) != ROOT else [])
+    for d in dirs:
+        for name in ENV_FILES:
+            path = os.path.join(d, name)
+            if not os.path.isfile(path):
+                continue
+            text, _ = read_text(path)
+            for k, v in parse_env(text).items():
+                merged.setdefault(k, v)
+    for k, v in merged.items():
+        os.environ.setdefault(k, v)
+    return merged
+
+
+def load_secrets():
+    try:
+        with open(SECRETS_PATH, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def save_secret(name, value):
+    """Stores a secret in the local, user-only secrets file (replaces the old temp_key.txt handoff)."""
+    secrets = load_secrets()
+    secrets[name] = value
+    os.makedirs(os.path.dirname(SECRETS_PATH), exist_ok=True)
+    tmp = SECRETS_PATH + '.tmp'
+    fd = os.open(tmp, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    with os.fdopen(fd, 'w', encoding='utf-8') as f:
+        json.dump(secrets, f, indent=2)
+    os.replace(tmp, SECRETS_PATH)
+    get.cache_clear()
+    supabase_credentials.cache_clear()
+
+
+@lru_cache(maxsize=None)
+def get(*names, default=None):
+    """First value set for any of `names`: environment / .env files, then the saved secrets."""
+    load_env()
+    for name in names:
+        if os.environ.get(name):
+            return os.environ[name]
+    secrets = load_secrets()
+    for name in names:
+        if secrets.get(name):
+            return secrets[name]
+    return default
+
+
+@lru_cache(maxsize=None)
+def supabase_credentials():
+    """(url, key) for the project's Supabase REST API; either may be None."""
+    url = get(*URL_VARS)
+    return (url.rstrip('/') if url else None), get(*KEY_VARS)
+
+
+def require_credentials():
+    url, key = supabase_credentials()
+    if not url or not key:
+        print("❌ Error: SUPABASE_URL or SUPABASE_ANON_KEY not found in .env")
+        sys.exit(1)
+    return url, key
+
+
+@lru_cache(maxsize=None)
+def rest_session(url=None, key=None):
+    """
+    One requests.Session per (url, key) for the whole process, so commands
+    chained in one `ops` run share connections. requests is imported here
+    rather than at module load to keep light subcommands fast.
+    """
+    import requests
+
+    if url is None and key is None:
+        url, key = require_credentials()
+    session = requests.Session()
+    session.headers.update({"apikey": key, "Authorization": f"Bearer {key}"})
+    return session
+
+
+def keyset_filter(cursor):
+    """
+    PostgREST `or` filter for the rows after `cursor` in created_at.asc,id.asc order.
+    `cursor` is (created_at, id), or (created_at, None) before any row has been seen:
+    that first page filters on the timestamp alone, because no placeholder id compares
+    against both the uuid and the bigint ids the schemas use.
+    """
+    since, last_id = cursor
+    if last_id is None:
+        return f'(created_at.gte."{since}")'
+    return f'(created_at.gt."{since}",and(created_at.eq."{since}",id.gt.{last_id}))'
+
+
+TS_FRACTION = re.compile(r'\.(\d+)')
+TS_OFFSET = re.compile(r'(T[\d:.]+[+-]\d{2}):?(\d{2})?$')
+
+
+def parse_ts(value):
+    """
+    ISO timestamp as Postgres/PostgREST print it -> aware datetime (naive means UTC); None stays None.
+    Postgres trims trailing fraction zeros ('12:00:05.12+00'), which fromisoformat() only
+    accepts from Python 3.11 on, so the fraction is padded to 6 digits and the offset to +HH:MM.
+    """
+    if value is None or isinstance(value, datetime):
+        ts = value
+    else:
+        text = str(value).strip().replace(" ", "T", 1)
+        if text[-1:] in ("Z", "z"):
+            text = text[:-1] + "+00:00"
+        text = TS_FRACTION.sub(lambda m: "." + m.group(1)[:6].ljust(6, "0"), text, count=1)
+        text = TS_OFFSET.sub(lambda m: f"{m.group(1)}:{m.group(2) or '00'}", text)
+        ts = datetime.fromisoformat(text)
+    if ts is None:
+        return None
+    return ts if ts.tzinfo else ts.replace(tzinfo=timezone.utc)
+
+
+def mask(value):
+    return f"{value[:6]}…{value[-4:]}" if value and len(value) > 12 else ("(set)" if value else "(missing)")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Show the resolved ops configuration or store the Supabase key.")
+    parser.add_argument("command", nargs="?", choices=["show", "save-key"], default="show")
+    parser.add_argument("--key", help="Key to store for 'save-key' (default: SUPABASE_ANON_KEY from the environment)")
+    args = parser.parse_args(argv)
+
+    if args.command == "save-key":
+        key = args.key or get(*KEY_VARS)
+        if not key:
+            print("❌ Error: no SUPABASE_ANON_KEY in the environment or .env; pass --key.")
+            return 1
+        save_secret("SUPABASE_ANON_KEY", key)
+        print(f"🔑 Saved SUPABASE_ANON_KEY ({mask(key)}) to {os.path.relpath(SECRETS_PATH)}")
+        return 0
+
+    url, key = supabase_credentials()
+    print(f"SUPABASE_URL:      {url or '(missing)'}")
+    print(f"SUPABASE_ANON_KEY: {mask(key)}")
+    print(f"env files:         {', '.join(n for n in ENV_FILES if os.path.isfile(n)) or '(none)'}")
+    print(f"saved secrets:     {', '.join(load_secrets()) or '(none)'}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
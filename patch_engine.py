@@ -0,0 +1,351 @@
+
+import argparse
+import difflib
+import json
+import os
+import re
+import sys
+from text_decoding import read_text, write_text
+
+# After these tokens a '/' starts a regex literal rather than a division.
+REGEX_PRECEDERS = set('(,=:[!&|?{};+-*%<>~^') | {'return', 'typeof', 'case', 'do', 'else', 'in', 'of', 'new', 'void', '=>'}
+
+# Leading whitespace plus one token per match, so whitespace, comments, strings and
+# identifiers are consumed inside the regex engine and Python only sees token boundaries.
+# Digits and other single characters fall through to `punct`, one token each.
+TOKEN = re.compile(r"""\s*(?:
+    (?P<comment>//[^\n]*|/\*[\s\S]*?(?:\*/|\Z))
+  | (?P<string>"[^"\\]*(?:\\[\s\S][^"\\]*)*"?|'[^'\\]*(?:\\[\s\S][^'\\]*)*'?)
+  | (?P<ident>[A-Za-z_$][\w$]*)
+  | (?P<punct>=>|\S)
+)""", re.X)
+# tokenize(inner=False) inside blocks: everything that can't open or close a block or a
+# string is skipped as one run.
+BLOCK_TOKEN = re.compile(r"""[^{}"'`/]*(?:
+    (?P<comment>//[^\n]*|/\*[\s\S]*?(?:\*/|\Z))
+  | (?P<string>"[^"\\]*(?:\\[\s\S][^"\\]*)*"?|'[^'\\]*(?:\\[\s\S][^'\\]*)*'?)
+  | (?P<punct>[{}`/])
+)""", re.X)
+# The last token of a skipped run, which decides whether a following '/' starts a regex.
+LAST_TOKEN = re.compile(r"([A-Za-z_$][\w$]*|=>|\S)\s*\Z")
+# The rest of a template literal chunk after '`' or a substitution's closing '}': up to '`' or '${'.
+TEMPLATE_REST = re.compile(r"[^`\\$]*(?:(?:\\[\s\S]|\$(?!\{))[^`\\$]*)*(?:`|\$\{)?")
+# The rest of a regex literal after its '/': classes may contain '/', a newline ends it regardless.
+REGEX_REST = re.compile(r"(?:[^\\/\[\n]+|\\[^\n]|\[(?:[^\]\\\n]|\\[^\n])*\]?)*[/\n]?[^\W\d_]*")
+
+
+def tokenize(src, inner=True):
+    """
+    Yields (kind, value, start, end) for a TS/JS source in one pass.
+
+    kind is 'ident', 'punct', 'string' (quotes, templates and regex literals)
+    or 'comment'. Template literals are scanned with their ${...} nesting so
+    braces inside prompts never shift the brace depth. With inner=False only
+    braces, strings, comments and '/' are yielded inside { } blocks: enough
+    to find where each block ends, without a Python step per token.
+    """
+    pos, n = 0, len(src)
+    prev = None
+    brace_stack = []  # True for a '{' that opened a template ${ } substitution
+    while pos < n:
+        in_block = not inner and bool(brace_stack)
+        # Template chunks, regex literals and entering/leaving a block (inner=False) restart the scan.
+        for m in (BLOCK_TOKEN if in_block else TOKEN).finditer(src, pos):
+            kind = m.lastgroup
+            start, end = m.span(kind)
+            value = m.group(kind)
+            if kind == 'comment':
+                yield 'comment', value, start, end
+                continue
+            if in_block and value == '/' and start > m.start():
+                last = LAST_TOKEN.search(src, m.start(), start)
+                if last:
+                    prev = last.group(1)
+            if kind == 'string':
+                prev = 'string'
+                yield 'string', value, start, end
+            elif kind == 'ident':
+                prev = value
+                yield 'ident', value, start, end
+            elif value == '`' or (value == '}' and brace_stack and brace_stack[-1]):
+                if value == '}':
+                    brace_stack.pop()
+                pos = TEMPLATE_REST.match(src, end).end()
+                if src.endswith('${', start, pos):
+                    brace_stack.append(True)
+                prev = 'string'
+                yield 'string', src[start:pos], start, pos
+                break
+            elif value == '/' and (prev is None or prev in REGEX_PRECEDERS):
+                pos = REGEX_REST.match(src, end).end()
+                prev = 'string'
+                yield 'string', src[start:pos], start, pos
+                break
+            else:
+                if value == '{':
+                    brace_stack.append(False)
+                elif value == '}' and brace_stack:
+                    brace_stack.pop()
+                prev = value
+                yield 'punct', value, start, end
+                if not inner and in_block != bool(brace_stack):
+                    pos = end
+                    break
+        else:
+            return
+
+
+def match_close(tokens, k, open_ch, close_ch):
+    """Index of the `close_ch` token that balances the `open_ch` at or after tokens[k], or None."""
+    depth = 0
+    for j in range(k, len(tokens)):
+        kind, value = tokens[j][0], tokens[j][1]
+        if kind != 'punct':
+            continue
+        if value == open_ch:
+            depth += 1
+        elif value == close_ch:
+            depth -= 1
+            if depth == 0:
+                return j
+    return None
+
+
+def body_open(tokens, k):
+    """Index of the '{' that opens a function body, skipping a return type like `: Promise<{ a: T }[]>`."""
+    depth = 0
+    for j in range(k, len(tokens)):
+        kind, value = tokens[j][0], tokens[j][1]
+        if kind != 'punct':
+            continue
+        if value == '{' and depth == 0:
+            before = tokens[j - 1]
+            # `: {`, `| {` etc. open an object type literal, not the body.
+            if not (before[0] == 'punct' and before[1] in (':', '|', '&', ',', '=>')):
+                return j
+        if value in '(<[{':
+            depth += 1
+        elif value in ')>]}':
+            depth -= 1
+        elif value == ';' and depth == 0:
+            return None
+    return None
+
+
+def scan_depth0(tokens, k, stop):
+    """First index from k where `stop(index)` holds outside any brackets, or None at a `;` or unbalanced close."""
+    depth = 0
+    for j in range(k, len(tokens)):
+        kind, value = tokens[j][0], tokens[j][1]
+        if kind != 'punct':
+            continue
+        if depth == 0 and stop(j):
+            return j
+        if value in '(<[{':
+            depth += 1
+        elif value in ')>]}':
+            depth -= 1
+            if depth < 0:
+                return None
+        elif value == ';' and depth == 0:
+            return None
+    return None
+
+
+def arrow_body(tokens, k):
+    """
+    Index of the '{' opening the body of an arrow function starting at tokens[k]
+    (`async (a: (x: T) => void): R => {`, `x => {`), or None for anything else.
+    """
+    if k < len(tokens) and tokens[k][1] == 'async':
+        k += 1
+    if k + 1 >= len(tokens):
+        return None
+    if tokens[k][1] == '(':
+        close = match_close(tokens, k, '(', ')')
+        if close is None or close + 1 >= len(tokens):
+            return None
+        arrow = close + 1
+        if tokens[arrow][1] == ':':
+            # Return type: the arrow is the first one at depth 0 that a block follows.
+            arrow = scan_depth0(tokens, arrow + 1, lambda x: tokens[x][1] == '=>' and x + 1 < len(tokens)
+                                and tokens[x + 1][1] == '{')
+    elif tokens[k][0] == 'ident':
+        arrow = k + 1
+    else:
+        return None
+    if arrow is not None and tokens[arrow][1] == '=>' and arrow + 1 < len(tokens) and tokens[arrow + 1][1] == '{':
+        return arrow + 1
+    return None
+
+
+def wrapped_call(tokens, k):
+    """Index of the '(' of a call like `memo(` or `forwardRef<P>(` starting at tokens[k], or None."""
+    if k + 1 >= len(tokens) or tokens[k][0] != 'ident':
+        return None
+    k += 1
+    if tokens[k][1] == '<':
+        k = match_close(tokens, k, '<', '>')
+        if k is None:
+            return None
+        k += 1
+    return k if k < len(tokens) and tokens[k][1] == '(' else None
+
+
+def find_exported_functions(src):
+    """
+    Maps each top-level exported function name to its (start, end) offsets:
+    `export [default] [async] function NAME(...) {...}`,
+    `export const NAME = [async] (...) => {...};` and `export const NAME = wrap((...) => {...});`.
+    """
+    # Function bodies are only scanned for their closing brace.
+    tokens = [t for t in tokenize(src, inner=False) if t[0] != 'comment']
+    found = {}
+    depth = 0
+    k = 0
+    while k < len(tokens):
+        kind, value, start, _ = tokens[k]
+        if kind == 'punct':
+            if value == '{':
+                depth += 1
+            elif value == '}':
+                depth -= 1
+            k += 1
+            continue
+        if depth != 0 or value != 'export':
+            k += 1
+            continue
+
+        j = k + 1
+        call = None
+        while j < len(tokens) and tokens[j][1] in ('default', 'async'):
+            j += 1
+        if j + 1 < len(tokens) and tokens[j][1] == 'function':
+            name_idx = j + 1 if tokens[j + 1][1] != '*' else j + 2
+            name = tokens[name_idx][1]
+            paren = next((x for x in range(name_idx + 1, len(tokens)) if tokens[x][1] == '('), None)
+            close = match_close(tokens, paren, '(', ')') if paren is not None else None
+            body = body_open(tokens, close + 1) if close is not None else None
+        elif j + 2 < len(tokens) and tokens[j][1] in ('const', 'let') and tokens[j + 2][1] in ('=', ':'):
+            name = tokens[j + 1][1]
+            eq = scan_depth0(tokens, j + 2, lambda x: tokens[x][1] == '=')
+            body = arrow_body(tokens, eq + 1) if eq is not None else None
+            call = wrapped_call(tokens, eq + 1) if eq is not None and body is None else None
+            if call is not None:
+                # `forwardRef<P>((props, ref) => {...})`: the span covers the whole call.
+                body = None if match_close(tokens, call, '(', ')') is None else arrow_body(tokens, call + 1)
+        else:
+            k = j
+            continue
+
+        end_idx = match_close(tokens, body, '{', '}') if body is not None else None
+        if end_idx is not None and call is not None:
+            end_idx = match_close(tokens, call, '(', ')')
+        if end_idx is None:
+            k = j
+            continue
+        end = tokens[end_idx][3]
+        if end_idx + 1 < len(tokens) and tokens[end_idx + 1][1] == ';':
+            end = tokens[end_idx + 1][3]
+        found.setdefault(name, (start, end))
+        k = end_idx + 1
+    return found
+
+
+def load_manifest(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        manifest = json.load(f)
+    base = os.path.dirname(os.path.abspath(path))
+    patches = []
+    for p in manifest.get('patches', []):
+        if 'source' in p:
+            replacement, _ = read_text(os.path.join(base, p['source']))
+        else:
+            replacement = p['replacement']
+        patches.append({'file': p['file'], 'function': p['function'], 'replacement': replacement.strip('\n')})
+    return patches
+
+
+def apply_patches(patches, root='.', dry_run=False, out=sys.stdout):
+    """
+    Applies all patches with one read and at most one write per file.
+    Returns {'changed': [...], 'unchanged': [...], 'missing': [...]} of (file, function) pairs.
+    A file with any missing function is left untouched.
+    """
+    result = {'changed': [], 'unchanged': [], 'missing': []}
+    by_file = {}
+    for p in patches:
+        # When several manifests patch the same function, the last one wins.
+        by_file.setdefault(p['file'], {})[p['function']] = p
+
+    for rel, file_patches in by_file.items():
+        file_patches = list(file_patches.values())
+        path = os.path.join(root, rel)
+        src, encoding = read_text(path)
+        spans = find_exported_functions(src)
+
+        edits, missing = [], []
+        for p in file_patches:
+            span = spans.get(p['function'])
+            if not span:
+                missing.append((rel, p['function']))
+                continue
+            if src[span[0]:span[1]] == p['replacement']:
+                result['unchanged'].append((rel, p['function']))
+            else:
+                edits.append((span, p['replacement'], p['function']))
+
+        if missing:
+            result['missing'].extend(missing)
+            continue
+        if not edits:
+            continue
+
+        new_src = src
+        # Splice from the end so earlier offsets stay valid.
+        for (start, end), replacement, _ in sorted(edits, key=lambda e: -e[0][0]):
+            new_src = new_src[:start] + replacement + new_src[end:]
+        result['changed'].extend((rel, name) for _, _, name in edits)
+
+        if dry_run:
+            out.writelines(difflib.unified_diff(
+                src.splitlines(keepends=True), new_src.splitlines(keepends=True),
+                fromfile=f"a/{rel}", tofile=f"b/{rel}",
+            ))
+        else:
+            write_text(path, new_src, encoding)
+    return result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Replace exported TS functions from one or more patch manifests.")
+    parser.add_argument("manifests", nargs="*", help="Manifest JSON files ({'patches': [{file, function, source|replacement}]})")
+    parser.add_argument("--root", default=".", help="Directory the manifest 'file' paths are relative to")
+    parser.add_argument("--dry-run", action="store_true", help="Print a unified diff instead of writing")
+    parser.add_argument("--list", metavar="FILE", help="List exported functions found in FILE and exit")
+    args = parser.parse_args(argv)
+
+    if args.list:
+        src, _ = read_text(args.list)
+        for name, (start, end) in find_exported_functions(src).items():
+            print(f"{src.count(chr(10), 0, start) + 1:>6}-{src.count(chr(10), 0, end) + 1:<6} {name}")
+        return 0
+    if not args.manifests:
+        parser.error("give at least one manifest (or --list FILE)")
+
+    patches = []
+    for m in args.manifests:
+        patches.extend(load_manifest(m))
+    result = apply_patches(patches, args.root, args.dry_run)
+
+    for rel, name in result['changed']:
+        print(f"{'Would replace' if args.dry_run else 'Replaced'} {name} in {rel}", file=sys.stderr)
+    for rel, name in result['unchanged']:
+        print(f"Already up to date: {name} in {rel}", file=sys.stderr)
+    for rel, name in result['missing']:
+        print(f"Could not find {name} in {rel} (file left untouched)", file=sys.stderr)
+    return 1 if result['missing'] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,60 @@
+export async function runChartPatternScreener(marketTarget: MarketTarget, _timeframe: ScreenerTimeframe): Promise<ChartPatternResult[]> {
+    if (!ai) throw new Error("AI 서비스가 비활성화되어 차트 패턴 분석을 수행할 수 없습니다.");
+
+    const gatheringPrompt = `
+    You are an expert Technical Analyst AI.
+    Your mission is to find "Chart Pattern Opportunities" in the ${marketInfo[marketTarget].name} market.
+
+    **CORE STRATEGY: Classical Chart Patterns**
+    - **Concept:** Identify securities forming robust technical patterns that suggest a high probability breakout or reversal.
+    - **Target Patterns:**
+        1. **Volatility Contraction Pattern (VCP):** Tightening price action with decreasing volume.
+        2. **Cup with Handle:** Classic bullish continuation pattern.
+        3. **Double Bottom / Flat Base:** Strong support establishment.
+        4. **Ascending Triangle:** Bullish pressure against resistance.
+
+    **Execution:**
+    1.  Scan for stocks with strong relative strength (RS).
+    2.  Identify clear chart patterns on Daily or Weekly timeframes.
+    3.  Verify Volume: Volume should be dry in consolidation and expand on breakouts.
+
+    ${ANTI_HALLUCINATION_RULE}
+    Present your findings as a detailed text report (CONTEXT) in Korean. Explicitly mention the **Pattern Name** and **Entry/Stop levels**.
+    `;
+
+    const gatheringResponse = await generateContentWithRetry({ feature: 'screener.runChartPatternScreener', model: "gemini-2.0-flash-001", contents: gatheringPrompt, config: { tools: [{ googleSearch: {} }] } });
+    const gatheredDataContext = gatheringResponse.text;
+
+    const structuringPrompt = `
+    ${DATA_GROUNDING_PROTOCOL}
+    Based ONLY on the provided context, generate a structured JSON array of "Chart Pattern Signals".
+
+    **CONTEXT:**
+    ---
+    ${gatheredDataContext}
+    ---
+
+    **Instructions:**
+    - **symbol**: Ticker (e.g., 005930.KS or AAPL).
+    - **stockName**: Korean Name (e.g., 삼성전자).
+    - **timeframe**: 'Daily' or 'Weekly'.
+    - **strategy_hits**: List detected patterns (VCP, CupAndHandle, etc.).
+    - **scores**: Estimate technical scores (0-100) based on pattern clarity.
+    - **trade_plan**: Propose specific Entry, Stop Loss, and Target levels based on the pattern height/depth.
+
+    ${ANTI_HALLUCINATION_RULE}
+    **CRITICAL:** All text must be in Korean, EXCEPT for the 'ticker'. Respond ONLY with a valid JSON array matching the schema.
+    `;
+
+    const response = await generateContentWithRetry({
+        feature: 'screener.runChartPatternScreener',
+        model: "gemini-2.0-flash-001",
+        contents: structuringPrompt,
+        config: {
+            responseMimeType: "application/json",
+            responseSchema: { type: Type.ARRAY, items: chartPatternResultSchema }
+        }
+    });
+
+    return JSON.parse(sanitizeJsonString(response.text || '[]'));
+}
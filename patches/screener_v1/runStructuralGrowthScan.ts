@@ -0,0 +1,66 @@
+export async function runStructuralGrowthScan(marketTarget: MarketTarget, candidates?: UserWatchlistItem[]): Promise<ValuePivotScreenerResult[]> {
+    if (!ai) throw new Error("AI 서비스가 비활성화되었습니다.");
+
+    const gatheringPrompt = `
+    You are an expert Fundamental Analyst AI specializing in "Structural Growth & Pivot" strategies.
+    Your mission is to find "Value + Pivot" candidates in the ${marketInfo[marketTarget].name} market.
+
+    **CORE STRATEGY: Value with a Catalyst**
+    - **Concept:** Undervalued companies undergoing structural positive change (CAPEX, Business Model Shift, Shareholder Return Policy).
+    - **Target Characteristics:**
+        1. **Valuation:** Low PER/PBR relative to peers or historical average.
+        2. **Structural Change:** Recent aggressive CAPEX exceeding Depreciation (Investing for future), or shift in business mix to high-margin segments.
+        3. **Policy:** Announcements of Shareholder Returns (Dividends, Buybacks) or Corporate Governance improvement (Value Up).
+
+    **Execution:**
+    1.  Search for companies with recent "Value Up" announcements or major CAPEX news.
+    2.  Check for "Business Transformation" stories (e.g. Traditional Chemical -> Battery Material).
+    3.  Filter for reasonable valuation (Don't pick overhyped stocks).
+
+    ${ANTI_HALLUCINATION_RULE}
+    Present your findings as a detailed text report (CONTEXT) in Korean. Focus on the "Structural Change" in your explanation.
+    `;
+
+    const gatheringResponse = await generateContentWithRetry({
+        feature: 'screener.runStructuralGrowthScan',
+        model: "gemini-2.0-flash-001",
+        contents: gatheringPrompt,
+        config: { tools: [{ googleSearch: {} }] }
+    });
+    const gatheredDataContext = gatheringResponse.text;
+
+    const structuringPrompt = `
+    ${DATA_GROUNDING_PROTOCOL}
+    Based ONLY on the provided context, generate a structured JSON array of "Value Pivot Signals".
+
+    **CONTEXT:**
+    ---
+    ${gatheredDataContext}
+    ---
+
+    **Instructions:**
+    - **ticker**: Ticker symbol.
+    - **stockName**: Korean Name (e.g., 현대차).
+    - **summary**: Brief one-line summary of the investment case.
+    - **structuralChangeScore**: Evaluate CAPEX, Business Shift, and IR mentions. Pass if evidence is strong.
+    - **policyAlignmentScore**: Pass if shareholder return policy is clear.
+
+    ${ANTI_HALLUCINATION_RULE}
+    **CRITICAL:** All text must be in Korean, EXCEPT for the 'ticker'. Respond ONLY with a valid JSON array matching the schema.
+    `;
+
+    const response = await generateContentWithRetry({
+        feature: 'screener.runStructuralGrowthScan',
+        model: "gemini-2.0-flash-001",
+        contents: structuringPrompt,
+        config: {
+            responseMimeType: "application/json",
+            responseSchema: {
+                type: Type.ARRAY,
+                items: valuePivotScreenerResultSchema
+            }
+        }
+    });
+
+    return JSON.parse(sanitizeJsonString(response.text || '[]'));
+}
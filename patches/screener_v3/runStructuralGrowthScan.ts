@@ -0,0 +1,72 @@
+export async function runStructuralGrowthScan(marketTarget: MarketTarget, candidates?: UserWatchlistItem[]): Promise<ValuePivotScreenerResult[]> {
+    if (!ai) throw new Error("AI 서비스가 비활성화되었습니다.");
+
+    const gatheringPrompt = `
+    You are an expert Fundamental Analyst AI specializing in "Structural Growth & Pivot" strategies.
+    Your mission is to find "Value + Pivot" candidates in the ${marketInfo[marketTarget].name} market (Wide Scan).
+
+    **CORE STRATEGY: Value with a Catalyst**
+    - **Target Characteristics (Relaxed for Hidden Gems):**
+        1. **Valuation:** PER < 20 (or Cheap vs Peers) & PBR < 2.0.
+        2. **Growth:** Operating Profit Growth > 10% YoY (Turnaround counts).
+        3. **Catalyst:** CAPEX Cycle, New Product, or Shareholder Return Enhancement.
+
+    **WIDE SCAN UNIVERSE:**
+    - **Market Cap:** > 100B KRW ($100M). Focus on **Hidden Champions** in Mid-Cap space.
+    
+    **SAFETY FILTER (CRITICAL):**
+    - **EXCLUDE** companies with 3 years of consecutive Operating Loss.
+    - **EXCLUDE** companies with "Impaired Capital" (자본잠식) or "Administrative Issue" (관리종목).
+
+    **Execution:**
+    1.  Search for companies with recent "Value Up" announcements or major CAPEX news.
+    2.  Check for "Business Transformation" stories.
+    3.  Filter for reasonable valuation.
+
+    ${ANTI_HALLUCINATION_RULE}
+    Present your findings as a detailed text report (CONTEXT) in Korean. Focus on the "Structural Change" in your explanation.
+    `;
+
+    const gatheringResponse = await generateContentWithRetry({
+        feature: 'screener.runStructuralGrowthScan',
+        model: "gemini-2.0-flash-001",
+        contents: gatheringPrompt,
+        config: { tools: [{ googleSearch: {} }] }
+    });
+    const gatheredDataContext = gatheringResponse.text;
+
+    const structuringPrompt = `
+    ${DATA_GROUNDING_PROTOCOL}
+    Based ONLY on the provided context, generate a structured JSON array of "Value Pivot Signals".
+
+    **CONTEXT:**
+    ---
+    ${gatheredDataContext}
+    ---
+
+    **Instructions:**
+    - **ticker**: Ticker symbol.
+    - **stockName**: Korean Name (MANDATORY).
+    - **summary**: Brief one-line summary of the investment case.
+    - **structuralChangeScore**: Evaluate CAPEX, Business Shift, and IR mentions. Pass if evidence is strong.
+    - **policyAlignmentScore**: Pass if shareholder return policy is clear.
+
+    ${ANTI_HALLUCINATION_RULE}
+    **CRITICAL:** All text must be in Korean, EXCEPT for the 'ticker'. Respond ONLY with a valid JSON array matching the schema.
+    `;
+
+    const response = await generateContentWithRetry({
+        feature: 'screener.runStructuralGrowthScan',
+        model: "gemini-2.0-flash-001",
+        contents: structuringPrompt,
+        config: {
+            responseMimeType: "application/json",
+            responseSchema: {
+                type: Type.ARRAY,
+                items: valuePivotScreenerResultSchema
+            }
+        }
+    });
+
+    return JSON.parse(sanitizeJsonString(response.text || '[]'));
+}
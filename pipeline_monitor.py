@@ -0,0 +1,279 @@
+
+import argparse
+import json
+import sys
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from load_generator import percentiles
+from near_dup import ANALYZED_MIN_CHARS, normalize_text
+from ops_config import keyset_filter, parse_ts, require_credentials
+
+# Tables the collectors and analyzers write to; each needs a created_at column.
+DEFAULT_TABLES = ["telegram_messages", "ai_thought_logs", "ai_token_usage",
+                  "user_intelligence_briefings", "alpha_engine_playbooks"]
+COUNT_WINDOWS = {"5m": 300, "1h": 3600}
+ANALYSIS_STRATEGIES = ("CONTENT_ANALYSIS", "NEWS_ANALYSIS")
+# details keys that point straight at the source message, when the analyzer records one.
+MESSAGE_ID_KEYS = ("telegram_message_id", "source_message_id", "message_row_id")
+MIN_TITLE_CHARS = 8
+CLOCK_SKEW = timedelta(seconds=5)
+PAGE_SIZE = 1000
+
+
+def iso(ts):
+    return ts.isoformat() if ts else None
+
+
+class PipelineMonitor:
+    """
+    One snapshot = every table's freshness query plus the incremental message/analysis
+    fetches, all in flight at once on a shared, pooled HTTP session.
+
+    Lag is measured from a telegram_messages row to the first CONTENT_ANALYSIS thought
+    that refers to it: by message id when the analyzer puts one in `details`,
+    otherwise by `details.source_title` appearing in the message text.
+    """
+
+    def __init__(self, url, key, tables=DEFAULT_TABLES, workers=8, window=900):
+        import requests
+        from requests.adapters import HTTPAdapter
+
+        self.url = url
+        self.tables = list(tables)
+        self.window = timedelta(seconds=window)
+        # A private session rather than the shared rest_session(): the adapter below sizes
+        # its pool for this monitor's workers, one connection each, kept alive across snapshots.
+        self.session = requests.Session()
+        self.session.headers.update({"apikey": key, "Authorization": f"Bearer {key}"})
+        self.session.mount(url, HTTPAdapter(pool_connections=1, pool_maxsize=workers))
+        self.pool = ThreadPoolExecutor(max_workers=workers)
+
+        since = iso(datetime.now(timezone.utc) - self.window)
+        self.msg_cursor = self.thought_cursor = (since, None)
+        self.messages = deque()   # (created_at, id, normalized text, channel, analyzable), oldest first
+        self.by_id = {}
+        self.matched = set()
+        self.lags = deque()       # (analysis created_at, lag seconds)
+
+    def _get(self, table, params, headers=None):
+        r = self.session.get(f"{self.url}/rest/v1/{table}", params=params, headers=headers, timeout=30)
+        r.raise_for_status()
+        return r
+
+    def table_stats(self, table, now):
+        try:
+            latest = self._get(table, {"select": "created_at", "order": "created_at.desc", "limit": "1"}).json()
+            stats = {"latest": latest[0]["created_at"] if latest else None}
+            stats["age_sec"] = round((now - parse_ts(stats["latest"])).total_seconds(), 1) if latest else None
+            for label, seconds in COUNT_WINDOWS.items():
+                r = self._get(table, {"select": "created_at", "created_at": f"gte.{iso(now - timedelta(seconds=seconds))}",
+                                      "limit": "1"}, headers={"Prefer": "count=exact"})
+                total = r.headers.get("Content-Range", "*/0").rsplit("/", 1)[-1]
+                stats[f"rows_{label}"] = int(total) if total.isdigit() else None
+            return stats
+        except Exception as e:
+            return {"error": str(e)[:200]}
+
+    def _pages(self, table, cursor, params):
+        rows = []
+        while True:
+            page = self._get(table, {**params, "order": "created_at.asc,id.asc", "limit": str(PAGE_SIZE),
+                                     "or": keyset_filter(cursor)}).json()
+            rows.extend(page)
+            if page:
+                cursor = (page[-1]["created_at"], page[-1]["id"])
+            if len(page) < PAGE_SIZE:
+                return rows, cursor
+
+    def new_messages(self):
+        return self._pages("telegram_messages", self.msg_cursor, {"select": "id,created_at,message,channel"})
+
+    def new_analyses(self):
+        return self._pages("ai_thought_logs", self.thought_cursor,
+                           {"select": "id,created_at,action,details", "strategy": f"in.({','.join(ANALYSIS_STRATEGIES)})"})
+
+    def _match(self, thought):
+        details = thought.get("details") or {}
+        if not isinstance(details, dict):
+            return None
+        for key in MESSAGE_ID_KEYS:
+            if details.get(key) in self.by_id:
+                return self.by_id[details[key]]
+        title = normalize_text(details.get("source_title") or "")
+        if len(title) < MIN_TITLE_CHARS:
+            return None
+        limit = parse_ts(thought["created_at"]) + CLOCK_SKEW
+        for msg in reversed(self.messages):
+            if msg[0] <= limit and msg[1] not in self.matched and title in msg[2]:
+                return msg
+        return None
+
+    def snapshot(self):
+        started = time.perf_counter()
+        now = datetime.now(timezone.utc)
+        stats_futures = {t: self.pool.submit(self.table_stats, t, now) for t in self.tables}
+        msg_future = self.pool.submit(self.new_messages)
+        thought_future = self.pool.submit(self.new_analyses)
+
+        errors = {}
+        try:
+            messages, self.msg_cursor = msg_future.result()
+        except Exception as e:
+            messages, errors["telegram_messages"] = [], str(e)[:200]
+        try:
+            thoughts, self.thought_cursor = thought_future.result()
+        except Exception as e:
+            thoughts, errors["ai_thought_logs"] = [], str(e)[:200]
+
+        for row in messages:
+            text = row.get("message") or ""
+            msg = (parse_ts(row["created_at"]), row["id"], normalize_text(text), row.get("channel"),
+                   len(text) > ANALYZED_MIN_CHARS)
+            self.messages.append(msg)
+            self.by_id[row["id"]] = msg
+        for thought in thoughts:
+            msg = self._match(thought)
+            if msg:
+                self.matched.add(msg[1])
+                ts = parse_ts(thought["created_at"])
+                self.lags.append((ts, max(0.0, (ts - msg[0]).total_seconds())))
+
+        # Messages are kept a little longer than the window so late analyses still find them.
+        horizon = now - 2 * self.window
+        while self.messages and self.messages[0][0] < horizon:
+            old = self.messages.popleft()
+            self.by_id.pop(old[1], None)
+            self.matched.discard(old[1])
+        while self.lags and self.lags[0][0] < now - self.window:
+            self.lags.popleft()
+
+        in_window = [m for m in self.messages if m[0] >= now - self.window]
+        unmatched = [m for m in in_window if m[4] and m[1] not in self.matched]
+        channels = {}
+        for m in in_window:
+            c = channels.setdefault(m[3] or "?", {"rows": 0, "latest": m[0]})
+            c["rows"] += 1
+            c["latest"] = max(c["latest"], m[0])
+
+        lag = percentiles([l for _, l in self.lags], points=(50, 95))
+        return {
+            "ts": iso(now),
+            "tables": {t: f.result() for t, f in stats_futures.items()},
+            "lag_sec": {"window_sec": int(self.window.total_seconds()), "matched": len(self.lags),
+                        **{k: (round(v, 2) if v is not None else None) for k, v in lag.items()}},
+            "unmatched_analyzable": len(unmatched),
+            "oldest_unmatched_sec": round((now - unmatched[0][0]).total_seconds(), 1) if unmatched else None,
+            "channels": {c: {"rows": v["rows"], "age_sec": round((now - v["latest"]).total_seconds(), 1)}
+                         for c, v in sorted(channels.items())},
+            "errors": errors,
+            "query_ms": round((time.perf_counter() - started) * 1000, 1),
+        }
+
+
+def prometheus(snap):
+    lines = ["# TYPE pipeline_table_age_seconds gauge"]
+    for table, s in snap["tables"].items():
+        if s.get("age_sec") is not None:
+            lines.append(f'pipeline_table_age_seconds{{table="{table}"}} {s["age_sec"]}')
+    lines.append("# TYPE pipeline_table_rows gauge")
+    for table, s in snap["tables"].items():
+        for label in COUNT_WINDOWS:
+            if s.get(f"rows_{label}") is not None:
+                lines.append(f'pipeline_table_rows{{table="{table}",window="{label}"}} {s[f"rows_{label}"]}')
+    lines.append("# TYPE pipeline_ingest_analysis_lag_seconds summary")
+    lag = snap["lag_sec"]
+    for q, key in (("0.5", "p50"), ("0.95", "p95")):
+        if lag[key] is not None:
+            lines.append(f'pipeline_ingest_analysis_lag_seconds{{quantile="{q}"}} {lag[key]}')
+    lines.append(f"pipeline_ingest_analysis_lag_seconds_count {lag['matched']}")
+    lines.append("# TYPE pipeline_unmatched_messages gauge")
+    lines.append(f"pipeline_unmatched_messages {snap['unmatched_analyzable']}")
+    lines.append("# TYPE pipeline_snapshot_duration_ms gauge")
+    lines.append(f"pipeline_snapshot_duration_ms {snap['query_ms']}")
+    return "\n".join(lines) + "\n"
+
+
+def serve(port, latest):
+    """/metrics (Prometheus text) and /json over the most recent snapshot."""
+
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, *args):
+            pass
+
+        def do_GET(self):
+            snap = latest.get("snapshot")
+            if snap is None:
+                body, ctype, code = b"no snapshot yet\n", "text/plain", 503
+            elif self.path.startswith("/metrics"):
+                body, ctype, code = prometheus(snap).encode(), "text/plain; version=0.0.4", 200
+            else:
+                body, ctype, code = json.dumps(snap, ensure_ascii=False).encode(), "application/json", 200
+            self.send_response(code)
+            self.send_header("Content-Type", ctype)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+    server = ThreadingHTTPServer(("0.0.0.0", port), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def summary_line(snap, stale_after):
+    parts = []
+    for table, s in snap["tables"].items():
+        if "error" in s:
+            parts.append(f"❌ {table}")
+        elif s["age_sec"] is None:
+            parts.append(f"⚪ {table} empty")
+        else:
+            icon = "🔴" if s["age_sec"] > stale_after else "🟢"
+            parts.append(f"{icon} {table} {s['age_sec']:.0f}s ago ({s['rows_5m']}/5m)")
+    lag = snap["lag_sec"]
+    lag_text = (f"lag p50={lag['p50']:.1f}s p95={lag['p95']:.1f}s (n={lag['matched']})"
+                if lag["matched"] else "lag n/a")
+    return f"[{snap['ts'][11:19]}] " + " | ".join(parts) + f" || {lag_text}, {snap['unmatched_analyzable']} unanswered, {snap['query_ms']:.0f} ms"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Collector freshness and ingest->analysis lag across the pipeline tables.")
+    parser.add_argument("--tables", nargs="+", default=DEFAULT_TABLES)
+    parser.add_argument("--interval", type=float, default=15.0, help="Seconds between snapshots")
+    parser.add_argument("--window", type=int, default=900, help="Seconds of history for lag percentiles")
+    parser.add_argument("--stale-after", type=int, default=900, help="Seconds without rows before a table shows red")
+    parser.add_argument("--workers", type=int, default=8, help="Concurrent queries / pooled connections")
+    parser.add_argument("--once", action="store_true", help="Take one snapshot and exit")
+    parser.add_argument("--jsonl", action="store_true", help="Print each snapshot as one JSON line")
+    parser.add_argument("--serve", type=int, metavar="PORT", help="Expose /metrics and /json on this port")
+    args = parser.parse_args(argv)
+
+    url, key = require_credentials()
+    monitor = PipelineMonitor(url, key, args.tables, args.workers, args.window)
+    latest = {}
+    if args.serve:
+        serve(args.serve, latest)
+        print(f"📡 Serving http://0.0.0.0:{args.serve}/metrics and /json", file=sys.stderr)
+
+    try:
+        while True:
+            started = time.monotonic()
+            snap = monitor.snapshot()
+            latest["snapshot"] = snap
+            if args.jsonl:
+                print(json.dumps(snap, ensure_ascii=False), flush=True)
+            else:
+                print(summary_line(snap, args.stale_after), flush=True)
+            if args.once:
+                return 0
+            time.sleep(max(0.0, args.interval - (time.monotonic() - started)))
+    except KeyboardInterrupt:
+        return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
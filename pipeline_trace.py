@@ -0,0 +1,306 @@
+
+import argparse
+import json
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from contextlib import contextmanager
+from datetime import datetime, timezone
+
+# 7 bits of sub-bucket resolution: every recorded value is within 1/64 (~1.6%) of the true one.
+SUB_BUCKET_BITS = 7
+QUANTILES = (50, 90, 95, 99)
+MAX_TRACES = 5000
+SLOWEST_TRACES = 20
+
+
+class Histogram:
+    """
+    HDR-style log-linear histogram of durations, counted in whole microseconds.
+
+    A value lands in a bucket keyed by its lowest equivalent value: exact below 128us,
+    then 64 sub-buckets per power of two. Recording is a dict increment, memory grows
+    with the number of distinct buckets (a few hundred for seconds-long ranges), and
+    histograms merge by adding counts, so runs can be combined after the fact.
+    """
+
+    def __init__(self):
+        self.counts = {}
+        self.count = 0
+        self.total_us = 0
+        self.min_us = None
+        self.max_us = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def bucket(us):
+        shift = max(0, us.bit_length() - SUB_BUCKET_BITS)
+        return (us >> shift) << shift, 1 << shift
+
+    def record(self, seconds):
+        us = max(0, int(seconds * 1e6))
+        low, _ = self.bucket(us)
+        with self._lock:
+            self.counts[low] = self.counts.get(low, 0) + 1
+            self.count += 1
+            self.total_us += us
+            self.max_us = max(self.max_us, us)
+            self.min_us = us if self.min_us is None else min(self.min_us, us)
+
+    def merge(self, other):
+        with self._lock:
+            for low, n in other.counts.items():
+                self.counts[low] = self.counts.get(low, 0) + n
+            self.count += other.count
+            self.total_us += other.total_us
+            self.max_us = max(self.max_us, other.max_us)
+            if other.min_us is not None:
+                self.min_us = other.min_us if self.min_us is None else min(self.min_us, other.min_us)
+
+    def percentile(self, p):
+        """Seconds at or below which p% of values fall (bucket midpoint, clamped to the observed max)."""
+        if not self.count:
+            return None
+        rank = max(1, round(p / 100 * self.count))
+        seen = 0
+        for low in sorted(self.counts):
+            seen += self.counts[low]
+            if seen >= rank:
+                _, width = self.bucket(low)
+                return min(low + (width - 1) / 2, self.max_us) / 1e6
+        return self.max_us / 1e6
+
+    def summary(self):
+        out = {"count": self.count}
+        if self.count:
+            out.update({"mean": round(self.total_us / self.count / 1e6, 6), "min": self.min_us / 1e6,
+                        "max": self.max_us / 1e6, "sum": round(self.total_us / 1e6, 6)})
+            out.update({f"p{p}": round(self.percentile(p), 6) for p in QUANTILES})
+        return out
+
+    def to_dict(self):
+        return {**self.summary(), "buckets": {str(k): v for k, v in sorted(self.counts.items())}}
+
+    @classmethod
+    def from_dict(cls, data):
+        h = cls()
+        h.counts = {int(k): v for k, v in data.get("buckets", {}).items()}
+        h.count = data.get("count", 0)
+        h.total_us = int(round(data.get("sum", 0) * 1e6))
+        h.max_us = int(round(data.get("max", 0) * 1e6))
+        h.min_us = int(round(data["min"] * 1e6)) if "min" in data else None
+        return h
+
+
+def new_correlation_id():
+    return uuid.uuid4().hex[:12]
+
+
+class Tracer:
+    """
+    Per-stage latency histograms plus the stage breakdown of each correlation id.
+
+        tracer = Tracer()
+        cid = new_correlation_id()
+        with tracer.span("fetch", cid):
+            ...
+        tracer.record("analysis_wait", seconds, cid)   # a duration measured elsewhere
+
+    A correlation id follows one report from fetch to its CONTENT_ANALYSIS thought log;
+    `slowest()` shows which stage the worst ones spent their time in.
+    """
+
+    def __init__(self, max_traces=MAX_TRACES):
+        self.stages = {}
+        self.traces = OrderedDict()
+        self.max_traces = max_traces
+        self.errors = {}
+        self.started = datetime.now(timezone.utc)
+        self._lock = threading.Lock()
+
+    def histogram(self, stage):
+        h = self.stages.get(stage)
+        if h is None:
+            with self._lock:
+                h = self.stages.setdefault(stage, Histogram())
+        return h
+
+    def record(self, stage, seconds, cid=None, error=False):
+        self.histogram(stage).record(seconds)
+        if error:
+            with self._lock:
+                self.errors[stage] = self.errors.get(stage, 0) + 1
+        if cid is not None:
+            with self._lock:
+                trace = self.traces.get(cid)
+                if trace is None:
+                    trace = self.traces[cid] = {}
+                    if len(self.traces) > self.max_traces:
+                        self.traces.popitem(last=False)
+                trace[stage] = trace.get(stage, 0.0) + seconds
+
+    @contextmanager
+    def span(self, stage, cid=None):
+        started = time.perf_counter()
+        failed = False
+        try:
+            yield
+        except BaseException:
+            failed = True
+            raise
+        finally:
+            self.record(stage, time.perf_counter() - started, cid, failed)
+
+    def slowest(self, n=SLOWEST_TRACES):
+        with self._lock:
+            items = list(self.traces.items())
+        items.sort(key=lambda kv: sum(kv[1].values()), reverse=True)
+        return [{"id": cid, "total": round(sum(stages.values()), 6),
+                 "stages": {s: round(v, 6) for s, v in stages.items()}} for cid, stages in items[:n]]
+
+    def to_dict(self, buckets=True):
+        return {
+            "started": self.started.isoformat(),
+            "generated": datetime.now(timezone.utc).isoformat(),
+            "stages": {s: (h.to_dict() if buckets else h.summary()) for s, h in sorted(self.stages.items())},
+            "errors": dict(self.errors),
+            "slowest": self.slowest(),
+        }
+
+    def prometheus(self, prefix="pipeline_stage"):
+        return prometheus_text(self.to_dict(buckets=False), prefix)
+
+    def write(self, path):
+        """JSON, or Prometheus text exposition when the path ends in .prom / .txt."""
+        text = self.prometheus() if path.endswith((".prom", ".txt")) else json.dumps(self.to_dict(), ensure_ascii=False, indent=1)
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(text)
+
+    def report(self):
+        lines = [f"{'stage':<16}{'n':>7}{'p50':>10}{'p95':>10}{'p99':>10}{'max':>10}"]
+        for stage, h in sorted(self.stages.items(), key=lambda kv: -(kv[1].percentile(95) or 0)):
+            s = h.summary()
+            lines.append(f"{stage:<16}{s['count']:>7}" + "".join(f"{s[k] * 1000:>8.1f}ms" for k in ("p50", "p95", "p99", "max")))
+        return "\n".join(lines)
+
+
+def prometheus_text(data, prefix="pipeline_stage"):
+    lines = [f"# TYPE {prefix}_seconds summary"]
+    for stage, s in data["stages"].items():
+        for p in QUANTILES:
+            if s.get(f"p{p}") is not None:
+                lines.append(f'{prefix}_seconds{{stage="{stage}",quantile="{p / 100:g}"}} {s[f"p{p}"]}')
+        lines.append(f'{prefix}_seconds_sum{{stage="{stage}"}} {s.get("sum", 0)}')
+        lines.append(f'{prefix}_seconds_count{{stage="{stage}"}} {s["count"]}')
+    if data.get("errors"):
+        lines.append(f"# TYPE {prefix}_errors_total counter")
+        for stage, n in data["errors"].items():
+            lines.append(f'{prefix}_errors_total{{stage="{stage}"}} {n}')
+    return "\n".join(lines) + "\n"
+
+
+class AnalysisWaiter:
+    """
+    Times the last hop: from a telegram_messages insert to the CONTENT_ANALYSIS thought
+    log the app writes for it. Matching follows pipeline_monitor: a message id in
+    `details` when the analyzer records one, else `details.source_title` in the text.
+    """
+
+    def __init__(self, tracer, url, key, stage="analysis_wait"):
+        from ops_config import rest_session
+
+        self.tracer = tracer
+        self.url = url
+        self.stage = stage
+        self.session = rest_session(url, key)
+        self.pending = {}   # cid -> (monotonic insert time, normalized text, message id)
+        self.cursor = (datetime.now(timezone.utc).isoformat(), None)
+        self._lock = threading.Lock()
+
+    def expect(self, cid, message, message_id=None, inserted_at=None):
+        from near_dup import normalize_text
+
+        with self._lock:
+            self.pending[cid] = (inserted_at or time.monotonic(), normalize_text(message), message_id)
+
+    def _match(self, thought):
+        from near_dup import normalize_text
+        from pipeline_monitor import MESSAGE_ID_KEYS, MIN_TITLE_CHARS
+
+        details = thought.get("details") if isinstance(thought.get("details"), dict) else {}
+        ids = {details.get(k) for k in MESSAGE_ID_KEYS} - {None}
+        title = normalize_text(details.get("source_title") or "")
+        for cid, (_, text, message_id) in self.pending.items():
+            if (message_id is not None and message_id in ids) or (len(title) >= MIN_TITLE_CHARS and title in text):
+                return cid
+        return None
+
+    def poll(self):
+        """One keyset fetch of new analyses; returns how many pending messages got answered."""
+        from ops_config import keyset_filter
+        from pipeline_monitor import ANALYSIS_STRATEGIES
+
+        r = self.session.get(f"{self.url}/rest/v1/ai_thought_logs", params={
+            "select": "id,created_at,details", "strategy": f"in.({','.join(ANALYSIS_STRATEGIES)})",
+            "order": "created_at.asc,id.asc", "limit": "1000",
+            "or": keyset_filter(self.cursor)}, timeout=30)
+        r.raise_for_status()
+        rows = r.json()
+        if rows:
+            self.cursor = (rows[-1]["created_at"], rows[-1]["id"])
+        now, answered = time.monotonic(), 0
+        with self._lock:
+            for thought in rows:
+                cid = self._match(thought)
+                if cid is not None:
+                    inserted_at = self.pending.pop(cid)[0]
+                    self.tracer.record(self.stage, now - inserted_at, cid)
+                    answered += 1
+        return answered
+
+    def wait(self, timeout, interval=2.0):
+        """Polls until every expected message is answered or `timeout` passes; returns the unanswered count."""
+        deadline = time.monotonic() + timeout
+        while self.pending and time.monotonic() < deadline:
+            try:
+                self.poll()
+            except Exception as e:
+                print(f"⚠️ Analysis poll failed: {e}")
+            if self.pending:
+                time.sleep(min(interval, max(0.0, deadline - time.monotonic())))
+        return len(self.pending)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Show or convert stage-latency traces written with --trace.")
+    parser.add_argument("files", nargs="+", help="Trace JSON files; several are merged")
+    parser.add_argument("--prom", action="store_true", help="Print Prometheus text instead of the table")
+    parser.add_argument("--slowest", type=int, default=5, help="Correlation ids to break down")
+    args = parser.parse_args(argv)
+
+    tracer = Tracer()
+    for path in args.files:
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        for stage, h in data.get("stages", {}).items():
+            tracer.histogram(stage).merge(Histogram.from_dict(h))
+        for stage, n in data.get("errors", {}).items():
+            tracer.errors[stage] = tracer.errors.get(stage, 0) + n
+        for t in data.get("slowest", []):
+            tracer.traces[t["id"]] = t["stages"]
+
+    if args.prom:
+        print(tracer.prometheus(), end="")
+        return 0
+    print(tracer.report())
+    if tracer.errors:
+        print("❌ errors: " + ", ".join(f"{s}={n}" for s, n in sorted(tracer.errors.items())))
+    for t in tracer.slowest(args.slowest):
+        parts = " ".join(f"{s}={v * 1000:.0f}ms" for s, v in sorted(t["stages"].items(), key=lambda kv: -kv[1]))
+        print(f"🐢 {t['id']} {t['total'] * 1000:.0f}ms: {parts}")
+    return 0
+
+
+if __name__ == "__main__":
+    main()
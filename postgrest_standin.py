@@ -0,0 +1,610 @@
+
+import argparse
+import glob
+import io
+import json
+import os
+import re
+import sqlite3
+import threading
+import uuid
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qsl, unquote, urlsplit
+
+from ops_config import parse_ts
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+# Read in order; the first CREATE TABLE for a name wins (IF NOT EXISTS), later ALTER ... ADD COLUMN apply.
+SCHEMA_GLOBS = (".supabase/*.sql", "supabase/*.sql", "supabase/migrations/*.sql", "fix_table_schema.sql")
+DEFAULT_PORT = 54321
+
+COMMENT_RE = re.compile(r'--[^\n]*')
+CREATE_RE = re.compile(r'create\s+table\s+(?:if\s+not\s+exists\s+)?(?:public\.)?"?(\w+)"?\s*\(', re.I)
+ALTER_ADD_RE = re.compile(r'alter\s+table\s+(?:only\s+)?(?:public\.)?"?(\w+)"?\s+add\s+column\s+(?:if\s+not\s+exists\s+)?(.+?);', re.I | re.S)
+INDEX_RE = re.compile(r'create\s+(?:unique\s+)?index\s+(?:if\s+not\s+exists\s+)?\w+\s+on\s+(?:public\.)?"?(\w+)"?\s*\(([^;]*?)\)\s*;', re.I | re.S)
+CONSTRAINT_WORDS = ("primary key", "constraint", "unique", "check", "foreign key", "exclude")
+SAFE_EXPR_RE = re.compile(r'^[\w\s+\-*/().]+$')
+JSON_PATH_RE = re.compile(r'^(\w+)((?:->>?\w+)+)$')
+
+
+def utc_now():
+    return datetime.now(timezone.utc).isoformat(timespec="microseconds")
+
+
+def norm_ts(value):
+    """Timestamps are stored as fixed-width UTC ISO strings, so text order is time order."""
+    if value is None:
+        return None
+    return parse_ts(value).astimezone(timezone.utc).isoformat(timespec="microseconds")
+
+
+class PostgrestError(Exception):
+    def __init__(self, status, code, message, details=None, hint=None):
+        super().__init__(message)
+        self.status = status
+        self.body = {"code": code, "message": message, "details": details, "hint": hint}
+
+
+# ---------------------------------------------------------------- schema
+
+
+class Column:
+    def __init__(self, name, pg_type, default=None, primary=False, identity=False, generated=None):
+        self.name = name
+        self.pg_type = pg_type.lower()
+        self.default = default
+        self.primary = primary
+        self.identity = identity
+        self.generated = generated
+
+    @property
+    def kind(self):
+        t = self.pg_type
+        if t.endswith("[]") or t.startswith("json"):
+            return "json"
+        if t.startswith("timestamp"):
+            return "timestamp"
+        if t.startswith("bool"):
+            return "bool"
+        if t.startswith(("int", "bigint", "smallint", "serial", "bigserial")):
+            return "int"
+        if t.startswith(("numeric", "decimal", "real", "double", "float")):
+            return "float"
+        return "text"
+
+    def default_value(self):
+        d = (self.default or "").strip().lower()
+        if not d or d == "null":
+            return None
+        if "uuid" in d:
+            return str(uuid.uuid4())
+        if "now()" in d or "current_timestamp" in d:
+            return utc_now()
+        if d in ("true", "false"):
+            return d == "true"
+        literal = re.match(r"^'(.*)'(?:::[\w\s\[\]]+)?$", self.default.strip(), re.S)
+        if literal:
+            text = literal.group(1).replace("''", "'")
+            return json.loads(text) if self.kind == "json" else text
+        try:
+            return int(d) if re.match(r'^-?\d+$', d) else float(d)
+        except ValueError:
+            return None
+
+
+def split_top_level(body):
+    parts, depth, current, quote = [], 0, [], False
+    for ch in body:
+        if ch == "'":
+            quote = not quote
+        elif not quote and ch == "(":
+            depth += 1
+        elif not quote and ch == ")":
+            depth -= 1
+        elif not quote and ch == "," and depth == 0:
+            parts.append("".join(current).strip())
+            current = []
+            continue
+        current.append(ch)
+    if "".join(current).strip():
+        parts.append("".join(current).strip())
+    return parts
+
+
+def parse_column(spec):
+    m = re.match(r'"?(\w+)"?\s+(.*)$', spec.strip(), re.S)
+    if not m or spec.strip().lower().startswith(CONSTRAINT_WORDS):
+        return None
+    name, rest = m.group(1), m.group(2)
+    low = rest.lower()
+    type_m = re.match(r'(timestamp(?:\s*\(\d\))?\s+with(?:out)?\s+time\s+zone|double\s+precision|character\s+varying(?:\(\d+\))?|[\w]+(?:\s*\([\d\s,]+\))?(?:\[\])?)', rest, re.I)
+    pg_type = type_m.group(1) if type_m else "text"
+    default = None
+    dm = re.search(r'\bdefault\s+(.+?)(?=\s+(?:not\s+null|null|primary\s+key|unique|check|references|constraint|generated)\b|$)', rest, re.I | re.S)
+    if dm:
+        default = dm.group(1).strip()
+    generated = None
+    gm = re.search(r'generated\s+always\s+as\s*\((.*)\)\s*stored', rest, re.I | re.S)
+    if gm and SAFE_EXPR_RE.match(gm.group(1)):
+        generated = gm.group(1)
+    identity = "identity" in low or pg_type.lower() in ("serial", "bigserial")
+    return Column(name, pg_type, default, primary="primary key" in low, identity=identity, generated=generated)
+
+
+def matching_paren(text, start):
+    depth = 0
+    for i in range(start, len(text)):
+        if text[i] == "(":
+            depth += 1
+        elif text[i] == ")":
+            depth -= 1
+            if depth == 0:
+                return i
+    return -1
+
+
+def load_schema(paths):
+    """{table: {column name: Column}} and [(table, [columns])] indexes from SQL files."""
+    tables, indexes = {}, []
+    for path in paths:
+        with open(path, "r", encoding="utf-8", errors="replace") as f:
+            sql = COMMENT_RE.sub("", f.read())
+        for m in CREATE_RE.finditer(sql):
+            end = matching_paren(sql, m.end() - 1)
+            if end < 0 or m.group(1) in tables:
+                continue
+            cols = {}
+            for spec in split_top_level(sql[m.end():end]):
+                col = parse_column(spec)
+                if col:
+                    cols[col.name] = col
+            if cols:
+                tables[m.group(1)] = cols
+        for m in ALTER_ADD_RE.finditer(sql):
+            col = parse_column(m.group(2))
+            if col and m.group(1) in tables:
+                tables[m.group(1)].setdefault(col.name, col)
+        for m in INDEX_RE.finditer(sql):
+            cols = [re.split(r'\s+', c.strip())[0].strip('"') for c in m.group(2).split(",")]
+            indexes.append((m.group(1), cols))
+    return tables, indexes
+
+
+def default_schema_paths(root=ROOT):
+    paths = []
+    for pattern in SCHEMA_GLOBS:
+        paths.extend(sorted(glob.glob(os.path.join(root, pattern))))
+    return paths
+
+
+# ---------------------------------------------------------------- filters
+
+
+def split_logic(text):
+    """'a.eq.1,and(b.gt.2,c.lt.3)' -> top-level items, honoring parens and "quoted" values."""
+    items, depth, current, quote = [], 0, [], False
+    for ch in text:
+        if ch == '"':
+            quote = not quote
+        elif not quote and ch == "(":
+            depth += 1
+        elif not quote and ch == ")":
+            depth -= 1
+        elif not quote and ch == "," and depth == 0:
+            items.append("".join(current))
+            current = []
+            continue
+        current.append(ch)
+    if current:
+        items.append("".join(current))
+    return items
+
+
+def unquote_value(value):
+    return value[1:-1] if len(value) >= 2 and value[0] == value[-1] == '"' else value
+
+
+class Query:
+    """Translates PostgREST filters for one table into SQLite WHERE clauses with bound parameters."""
+
+    OPS = {"eq": "=", "neq": "<>", "gt": ">", "gte": ">=", "lt": "<", "lte": "<=", "like": "LIKE", "ilike": "LIKE"}
+
+    def __init__(self, table, columns):
+        self.table = table
+        self.columns = columns
+
+    def column_sql(self, name):
+        m = JSON_PATH_RE.match(name)
+        if m and m.group(1) in self.columns:
+            keys = re.findall(r'->>?(\w+)', m.group(2))
+            return f"json_extract(\"{m.group(1)}\", '$.{'.'.join(keys)}')", None
+        if name not in self.columns:
+            raise PostgrestError(400, "42703", f"column {self.table}.{name} does not exist")
+        return f'"{name}"', self.columns[name]
+
+    def coerce(self, col, value):
+        if col is None:
+            return value
+        if col.kind == "timestamp":
+            return norm_ts(value)
+        if col.kind == "int":
+            return int(value)
+        if col.kind == "float":
+            return float(value)
+        if col.kind == "bool":
+            return 1 if str(value).lower() == "true" else 0
+        return value
+
+    def condition(self, name, expr, params):
+        sql_col, col = self.column_sql(name)
+        negate = expr.startswith("not.")
+        if negate:
+            expr = expr[4:]
+        op, _, value = expr.partition(".")
+        if op == "is":
+            v = value.lower()
+            clause = f"{sql_col} IS NULL" if v == "null" else f"{sql_col} = {1 if v == 'true' else 0}"
+        elif op == "in":
+            items = [unquote_value(v.strip()) for v in split_logic(value.strip()[1:-1])] if value.strip() else []
+            params.extend(self.coerce(col, v) for v in items)
+            clause = f"{sql_col} IN ({','.join('?' * len(items))})" if items else "0"
+        elif op in self.OPS:
+            value = unquote_value(value)
+            if op == "ilike":
+                params.append(value.replace("*", "%"))
+                clause = f"{sql_col} LIKE ?"
+            elif op == "like":
+                # SQLite's LIKE ignores ASCII case; GLOB is the case-sensitive one.
+                params.append(value.replace("%", "*").replace("_", "?"))
+                clause = f"{sql_col} GLOB ?"
+            else:
+                params.append(self.coerce(col, value))
+                clause = f"{sql_col} {self.OPS[op]} ?"
+        else:
+            raise PostgrestError(400, "PGRST100", f'"failed to parse filter ({op}.{value})"')
+        return f"NOT ({clause})" if negate else clause
+
+    def logic(self, op, body, params, negate=False):
+        parts = []
+        for item in split_logic(body):
+            item = item.strip()
+            m = re.match(r'^(not\.)?(and|or)\((.*)\)$', item, re.S)
+            if m:
+                parts.append(self.logic(m.group(2), m.group(3), params, bool(m.group(1))))
+            else:
+                name, _, expr = item.partition(".")
+                parts.append(self.condition(name, expr, params))
+        joined = f" {op.upper()} ".join(f"({p})" for p in parts) or "1"
+        return f"NOT ({joined})" if negate else f"({joined})"
+
+    def where(self, args):
+        clauses, params = [], []
+        for key, value in args:
+            if key in ("select", "order", "limit", "offset", "columns", "on_conflict"):
+                continue
+            m = re.match(r'^(not\.)?(and|or)$', key)
+            if m:
+                clauses.append(self.logic(m.group(2), value.strip()[1:-1], params, bool(m.group(1))))
+            else:
+                clauses.append(self.condition(key, value, params))
+        return (" WHERE " + " AND ".join(clauses)) if clauses else "", params
+
+    def order(self, spec):
+        terms = []
+        for part in filter(None, spec.split(",")):
+            bits = part.split(".")
+            sql_col, _ = self.column_sql(bits[0])
+            desc = "desc" in bits[1:]
+            nulls_first = "nullsfirst" in bits[1:] or (desc and "nullslast" not in bits[1:])
+            terms.append(f"({sql_col} IS NULL) {'DESC' if nulls_first else 'ASC'}, {sql_col} {'DESC' if desc else 'ASC'}")
+        return (" ORDER BY " + ", ".join(terms)) if terms else ""
+
+
+# ---------------------------------------------------------------- store
+
+
+class StandIn:
+    """
+    PostgREST-compatible subset over SQLite, with the tables from the repo's SQL files.
+
+        with StandIn() as db:
+            url = db.serve()            # http://127.0.0.1:<port>, any API key accepted
+            ... run ops scripts with SUPABASE_URL=url ...
+
+    `db.adapter()` gives a requests transport adapter for fully in-process use
+    (`session.mount(url, db.adapter())`), with no sockets at all.
+    """
+
+    def __init__(self, db=":memory:", schema_paths=None):
+        self.tables, indexes = load_schema(schema_paths if schema_paths is not None else default_schema_paths())
+        self.conn = sqlite3.connect(db, check_same_thread=False, isolation_level=None)
+        self.conn.execute("PRAGMA journal_mode=WAL" if db != ":memory:" else "PRAGMA journal_mode=MEMORY")
+        self.lock = threading.Lock()
+        self.server = None
+        for name, cols in self.tables.items():
+            self._create(name, cols)
+        for table, cols in indexes:
+            if table in self.tables and all(c in self.tables[table] for c in cols):
+                idx = f"idx_{table}_{'_'.join(cols)}"
+                self.conn.execute(f'CREATE INDEX IF NOT EXISTS "{idx}" ON "{table}" ({", ".join(chr(34) + c + chr(34) for c in cols)})')
+
+    def _create(self, name, cols):
+        defs = []
+        for col in cols.values():
+            sql_type = {"int": "INTEGER", "float": "REAL", "bool": "INTEGER"}.get(col.kind, "TEXT")
+            d = f'"{col.name}" {sql_type}'
+            if col.primary and col.identity and col.kind == "int":
+                d += " PRIMARY KEY AUTOINCREMENT"
+            elif col.primary:
+                d += " PRIMARY KEY"
+            if col.generated:
+                d += f" GENERATED ALWAYS AS ({col.generated}) STORED"
+            defs.append(d)
+        self.conn.execute(f'CREATE TABLE IF NOT EXISTS "{name}" ({", ".join(defs)})')
+        # Keyset pagination and the dashboard's order=created_at.desc both need this.
+        if "created_at" in cols:
+            key = ', "id"' if "id" in cols else ""
+            self.conn.execute(f'CREATE INDEX IF NOT EXISTS "idx_{name}_created_at_id" ON "{name}" ("created_at"{key})')
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        if self.server:
+            self.server.shutdown()
+            self.server.server_close()
+            self.server = None
+        self.conn.close()
+
+    # -- row conversion
+
+    def _table(self, name):
+        if name not in self.tables:
+            raise PostgrestError(404, "42P01", f'relation "public.{name}" does not exist')
+        return self.tables[name]
+
+    def _to_sql(self, col, value):
+        if value is None:
+            return None
+        if col.kind == "json":
+            return json.dumps(value, ensure_ascii=False)
+        if col.kind == "timestamp":
+            return norm_ts(value)
+        if col.kind == "bool":
+            return 1 if value else 0
+        if col.kind == "int" and not isinstance(value, bool):
+            return int(value)
+        return value
+
+    def _from_sql(self, col, value):
+        if value is None or col is None:
+            return value
+        if col.kind == "json":
+            return json.loads(value)
+        if col.kind == "bool":
+            return bool(value)
+        return value
+
+    # -- operations
+
+    def select(self, table, args, count=False):
+        cols = self._table(table)
+        q = Query(table, cols)
+        argd = dict(args)
+        wanted = [c.strip() for c in argd.get("select", "*").split(",") if c.strip()]
+        names = list(cols) if wanted == ["*"] else wanted
+        select_sql = ", ".join(q.column_sql(n)[0] for n in names)
+        where, params = q.where(args)
+        sql = f'SELECT {select_sql} FROM "{table}"{where}{q.order(argd.get("order", ""))}'
+        if "limit" in argd or "offset" in argd:
+            sql += f" LIMIT {int(argd.get('limit', -1))} OFFSET {int(argd.get('offset', 0))}"
+        with self.lock:
+            rows = self.conn.execute(sql, params).fetchall()
+            total = self.conn.execute(f'SELECT COUNT(*) FROM "{table}"{where}', params).fetchone()[0] if count else None
+        out = [{n: self._from_sql(cols.get(n), v) for n, v in zip(names, row)} for row in rows]
+        return out, total
+
+    def insert(self, table, payload, columns=None, missing_default=False, on_conflict=None, resolution=None):
+        cols = self._table(table)
+        rows = payload if isinstance(payload, list) else [payload]
+        if columns:
+            names = [c.strip() for c in columns.split(",")]
+        elif rows:
+            names = list(rows[0])
+            if isinstance(payload, list) and any(set(r) != set(names) for r in rows):
+                raise PostgrestError(400, "PGRST102", "All object keys must match")
+        else:
+            return []
+        for n in names:
+            if n not in cols:
+                raise PostgrestError(400, "PGRST204", f"Could not find the '{n}' column of '{table}' in the schema cache")
+            if cols[n].generated:
+                raise PostgrestError(400, "428C9", f'cannot insert a non-DEFAULT value into column "{n}"')
+        # Columns not sent at all take their defaults; sent-but-missing keys do too with missing=default.
+        conflict = [c.strip() for c in (on_conflict or "").split(",") if c.strip()] or [c.name for c in cols.values() if c.primary]
+        inserted = []
+        with self.lock:
+            self.conn.execute("BEGIN")
+            try:
+                for row in rows:
+                    values = {}
+                    for col in cols.values():
+                        if col.generated:
+                            continue
+                        if col.name in names and (col.name in row or not missing_default):
+                            values[col.name] = self._to_sql(col, row.get(col.name))
+                        elif col.identity and col.kind == "int":
+                            continue
+                        else:
+                            values[col.name] = self._to_sql(col, col.default_value())
+                    keys = list(values)
+                    sql = f'INSERT INTO "{table}" ({", ".join(chr(34) + k + chr(34) for k in keys)}) VALUES ({", ".join("?" * len(keys))})'
+                    if resolution == "ignore-duplicates":
+                        sql += f' ON CONFLICT ({", ".join(conflict)}) DO NOTHING'
+                    elif resolution == "merge-duplicates":
+                        updates = ", ".join(f'"{k}" = excluded."{k}"' for k in keys if k not in conflict)
+                        sql += f' ON CONFLICT ({", ".join(conflict)}) DO ' + (f"UPDATE SET {updates}" if updates else "NOTHING")
+                    sql += " RETURNING *"
+                    got = self.conn.execute(sql, [values[k] for k in keys]).fetchone()
+                    if got is not None:
+                        inserted.append({n: self._from_sql(c, v) for (n, c), v in zip(cols.items(), got)})
+                self.conn.execute("COMMIT")
+            except sqlite3.IntegrityError as e:
+                self.conn.execute("ROLLBACK")
+                raise PostgrestError(409, "23505", f"duplicate key value violates unique constraint ({e})")
+            except Exception:
+                self.conn.execute("ROLLBACK")
+                raise
+        return inserted
+
+    def update(self, table, args, patch):
+        cols = self._table(table)
+        q = Query(table, cols)
+        for n in patch:
+            if n not in cols:
+                raise PostgrestError(400, "PGRST204", f"Could not find the '{n}' column of '{table}' in the schema cache")
+        where, params = q.where(args)
+        sets = ", ".join(f'"{n}" = ?' for n in patch)
+        with self.lock:
+            rows = self.conn.execute(f'UPDATE "{table}" SET {sets}{where} RETURNING *',
+                                     [self._to_sql(cols[n], v) for n, v in patch.items()] + params).fetchall()
+        return [{n: self._from_sql(c, v) for (n, c), v in zip(cols.items(), row)} for row in rows]
+
+    def delete(self, table, args):
+        cols = self._table(table)
+        where, params = Query(table, cols).where(args)
+        with self.lock:
+            rows = self.conn.execute(f'DELETE FROM "{table}"{where} RETURNING *', params).fetchall()
+        return [{n: self._from_sql(c, v) for (n, c), v in zip(cols.items(), row)} for row in rows]
+
+    # -- HTTP surface
+
+    def handle(self, method, path, query, headers, body):
+        """One REST call -> (status, headers, body bytes). Shared by the HTTP server and the adapter."""
+        prefer = {}
+        for part in (headers.get("Prefer") or headers.get("prefer") or "").split(","):
+            k, _, v = part.strip().partition("=")
+            if k:
+                prefer[k] = v
+        try:
+            m = re.match(r'^/rest/v1/(\w+)/?$', path)
+            if not m or m.group(1) == "rpc":
+                raise PostgrestError(404, "PGRST202", f"{path} is not supported by the stand-in")
+            table = m.group(1)
+            args = parse_qsl(query, keep_blank_values=True)
+            out_headers = {"Content-Type": "application/json; charset=utf-8"}
+            if method in ("GET", "HEAD"):
+                rows, total = self.select(table, args, count=prefer.get("count") in ("exact", "planned", "estimated"))
+                start = int(dict(args).get("offset", 0))
+                out_headers["Content-Range"] = (f"{start}-{start + len(rows) - 1}" if rows else "*") + f"/{total if total is not None else '*'}"
+                if (headers.get("Accept") or "").startswith("application/vnd.pgrst.object"):
+                    if len(rows) != 1:
+                        raise PostgrestError(406, "PGRST116", "JSON object requested, multiple (or no) rows returned")
+                    rows = rows[0]
+                return 200, out_headers, (b"" if method == "HEAD" else json.dumps(rows, ensure_ascii=False).encode())
+            payload = json.loads(body or b"null")
+            if method == "POST":
+                argd = dict(args)
+                rows = self.insert(table, payload, argd.get("columns"), prefer.get("missing") == "default",
+                                   argd.get("on_conflict"), prefer.get("resolution"))
+                status = 201
+            elif method == "PATCH":
+                rows, status = self.update(table, args, payload), 200
+            elif method == "DELETE":
+                rows, status = self.delete(table, args), 200
+            else:
+                raise PostgrestError(405, "PGRST117", f"Unsupported HTTP method: {method}")
+            if prefer.get("count") == "exact":
+                out_headers["Content-Range"] = f"*/{len(rows)}"
+            if prefer.get("return") == "representation":
+                return status, out_headers, json.dumps(rows, ensure_ascii=False).encode()
+            return (204 if method in ("PATCH", "DELETE") else status), out_headers, b""
+        except PostgrestError as e:
+            return e.status, {"Content-Type": "application/json"}, json.dumps(e.body).encode()
+        except (ValueError, TypeError, sqlite3.Error) as e:
+            return 400, {"Content-Type": "application/json"}, json.dumps(
+                {"code": "22P02", "message": str(e), "details": None, "hint": None}).encode()
+
+    def serve(self, host="127.0.0.1", port=0):
+        """Starts the HTTP server on a background thread and returns its base URL."""
+        standin = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args):
+                pass
+
+            def _any(self):
+                u = urlsplit(self.path)
+                length = int(self.headers.get("Content-Length") or 0)
+                body = self.rfile.read(length) if length else b""
+                status, headers, data = standin.handle(self.command, unquote(u.path), u.query, self.headers, body)
+                self.send_response(status)
+                for k, v in headers.items():
+                    self.send_header(k, v)
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                if self.command != "HEAD":
+                    self.wfile.write(data)
+
+            do_GET = do_POST = do_PATCH = do_DELETE = do_HEAD = _any
+
+        self.server = ThreadingHTTPServer((host, port), Handler)
+        self.server.daemon_threads = True
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        return f"http://{host}:{self.server.server_address[1]}"
+
+    def adapter(self):
+        from requests.adapters import BaseAdapter
+        from requests.models import Response
+        from requests.structures import CaseInsensitiveDict
+
+        standin = self
+
+        class StandInAdapter(BaseAdapter):
+            def send(self, request, **kwargs):
+                u = urlsplit(request.url)
+                body = request.body.encode() if isinstance(request.body, str) else (request.body or b"")
+                status, headers, data = standin.handle(request.method, unquote(u.path), u.query, request.headers, body)
+                resp = Response()
+                resp.status_code = status
+                resp.headers = CaseInsensitiveDict(headers)
+                resp.raw = io.BytesIO(data)
+                resp._content = data
+                resp.url = request.url
+                resp.request = request
+                resp.encoding = "utf-8"
+                return resp
+
+            def close(self):
+                pass
+
+        return StandInAdapter()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Local PostgREST stand-in (SQLite) with the tables from the repo's SQL files.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT, help="Default matches the local Supabase API port")
+    parser.add_argument("--db", default=":memory:", help="SQLite file to keep data across runs (default: in memory)")
+    parser.add_argument("--schema", nargs="+", help="SQL files to load instead of .supabase/*.sql, supabase/**/*.sql")
+    args = parser.parse_args(argv)
+
+    standin = StandIn(args.db, args.schema)
+    url = standin.serve(args.host, args.port)
+    print(f"🧪 PostgREST stand-in at {url}/rest/v1 ({len(standin.tables)} tables: {', '.join(sorted(standin.tables))})")
+    print(f"   Any API key is accepted, e.g. SUPABASE_URL={url} SUPABASE_ANON_KEY=local")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        standin.close()
+    return 0
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,487 @@
+
+import argparse
+import bisect
+import json
+import math
+import os
+import re
+from collections import deque
+
+from code_search import iter_files
+from debug_intervals import TIMER_CALL, analyze as analyze_timers, blank_comments, split_call_args
+from patch_engine import body_open, match_close, tokenize
+from text_decoding import read_text
+
+PROMPT_ROOTS = ['services/gemini', 'services/gems']
+# Timers anywhere in these roots can drive the prompt call sites.
+GRAPH_ROOTS = ['services', 'hooks', 'components']
+TS_EXTENSIONS = {'.ts', '.tsx'}
+CALL_NAME = 'generateContentWithRetry'
+DEFAULT_SLOT_TOKENS = 150
+MAX_DEPTH = 6
+
+HANGUL = re.compile(r'[ㄱ-ㆎ가-힣]')
+IDENT_RE = re.compile(r'[A-Za-z_$][\w$]*')
+IMPORT_FROM = re.compile(r'\bfrom\s*[\'"]([^\'"]+)[\'"]|\bimport\s*\(\s*[\'"]([^\'"]+)[\'"]\s*\)')
+# Schedulers that tick every minute but only act at a wall-clock time ("08:30") run their work once a day.
+TIME_GATE = re.compile(r'currentTime\s*===|\b(?:hour|hours|minute|minutes)\s*===|getHours\(\)\s*===|===\s*[\'"]\d{1,2}:\d{2}[\'"]')
+KEYWORDS = {'if', 'for', 'while', 'switch', 'catch', 'return', 'function', 'await', 'new', 'typeof', 'true', 'false',
+            'null', 'undefined', 'this', 'async', 'const', 'let', 'var', 'of', 'in', 'else', 'do', 'void', 'super'}
+STATEMENT_STARTS = {'const', 'let', 'var', 'return', 'if', 'await', 'export', 'for', 'while', 'try', 'throw', 'console'}
+
+
+def estimate_tokens(text):
+    """Rough Gemini token count: ~1.4 Hangul syllables or ~4 other characters per token, whitespace runs collapsed."""
+    hangul = len(HANGUL.findall(text))
+    other = len(re.sub(r'\s+', ' ', HANGUL.sub('', text)))
+    return math.ceil(hangul / 1.4 + other / 4)
+
+
+def template_text(value):
+    if value[0] in '"\'':
+        return value[1:-1]
+    if value[0] == '/':
+        return ''  # regex literal
+    body = value[1:]
+    if body.endswith('${'):
+        return body[:-2]
+    return body[:-1] if body.endswith('`') else body
+
+
+class SourceFile:
+    """Tokens, function spans, constant definitions and imports of one TS file."""
+
+    def __init__(self, path, src):
+        self.path = path
+        self.src = src
+        self.tokens = [t for t in tokenize(src) if t[0] != 'comment']
+        self.starts = [t[2] for t in self.tokens]
+        self.depth = self._depths()
+        self.functions = self._function_spans()
+        self.defs, self.appends = self._definitions()
+        self.imports = [m.group(1) or m.group(2) for m in IMPORT_FROM.finditer(src)]
+
+    def _depths(self):
+        depth, out = 0, []
+        for kind, value, _, _ in self.tokens:
+            if kind == 'punct' and value == '}':
+                depth -= 1
+            out.append(depth)
+            if kind == 'punct' and value == '{':
+                depth += 1
+        return out
+
+    def _function_spans(self):
+        """[(name, start, end)] for function declarations, arrow assignments and class methods."""
+        toks, spans = self.tokens, []
+        for k, (kind, value, start, _) in enumerate(toks):
+            if kind != 'ident' or value in KEYWORDS or k + 1 >= len(toks):
+                continue
+            nxt = toks[k + 1][1]
+            body = None
+            if k > 0 and toks[k - 1][1] == 'function' and nxt == '(':
+                close = match_close(toks, k + 1, '(', ')')
+                body = body_open(toks, close + 1) if close is not None else None
+            elif nxt == '=' and k + 2 < len(toks):
+                j = k + 2
+                if toks[j][1] == 'async':
+                    j += 1
+                if j < len(toks) and toks[j][1] == 'function':
+                    j += 1
+                if j < len(toks) and toks[j][1] == '(':
+                    close = match_close(toks, j, '(', ')')
+                    if close is not None:
+                        arrow = close + 1
+                        # Skip a return type annotation up to the arrow.
+                        while arrow < len(toks) and toks[arrow][1] not in ('=>', '{', ';'):
+                            arrow += 1
+                        if arrow < len(toks) and toks[arrow][1] == '=>':
+                            arrow += 1
+                        if arrow < len(toks) and toks[arrow][1] == '{':
+                            body = arrow
+            elif nxt == '(' and (k == 0 or toks[k - 1][1] in ('{', '}', ';', 'async', 'static', 'public', 'private',
+                                                             'protected', 'get', 'set', '*')):
+                close = match_close(toks, k + 1, '(', ')')
+                if close is not None and close + 1 < len(toks) and toks[close + 1][1] in ('{', ':'):
+                    body = body_open(toks, close + 1)
+            if body is None:
+                continue
+            end = match_close(toks, body, '{', '}')
+            if end is not None:
+                spans.append((value, start, toks[end][3]))
+        return spans
+
+    def _expression_end(self, k):
+        """Index one past the end of the expression starting at token k (';', or ASI before a new statement)."""
+        toks = self.tokens
+        depth = 0
+        for j in range(k, len(toks)):
+            kind, value, start, _ = toks[j]
+            if kind == 'punct':
+                if value in '([{':
+                    depth += 1
+                elif value in ')]}':
+                    if depth == 0:
+                        return j
+                    depth -= 1
+                elif value in ';,' and depth == 0:
+                    return j
+            elif depth == 0 and j > k and value in STATEMENT_STARTS and '\n' in self.src[toks[j - 1][3]:start]:
+                return j
+        return len(toks)
+
+    def _definitions(self):
+        defs, appends = {}, {}
+        toks = self.tokens
+        for k in range(len(toks) - 2):
+            kind, value = toks[k][0], toks[k][1]
+            if value in ('const', 'let', 'var') and toks[k + 1][0] == 'ident':
+                j = k + 2
+                if toks[j][1] == ':':
+                    # `const X: string = ...`: skip the annotation.
+                    while j < len(toks) and toks[j][1] not in ('=', ';'):
+                        j += 1
+                if j < len(toks) and toks[j][1] == '=':
+                    defs.setdefault(toks[k + 1][1], []).append((toks[k][2], j + 1, self._expression_end(j + 1), self.depth[k]))
+            elif kind == 'ident' and toks[k + 1][1] == '+' and toks[k + 2][1] == '=':
+                appends.setdefault(value, []).append((toks[k][2], k + 3, self._expression_end(k + 3)))
+        return defs, appends
+
+    def line_of(self, offset):
+        return self.src.count('\n', 0, offset) + 1
+
+    def innermost_function(self, offset):
+        best = None
+        for name, start, end in self.functions:
+            if start <= offset < end and (best is None or start > best[1]):
+                best = (name, start, end)
+        return best
+
+    def idents_between(self, start, end):
+        lo, hi = bisect.bisect_left(self.starts, start), bisect.bisect_left(self.starts, end)
+        return {t[1] for t in self.tokens[lo:hi] if t[0] == 'ident'}
+
+
+class Project:
+    def __init__(self, roots):
+        self.files = {}
+        for path in iter_files(roots, TS_EXTENSIONS):
+            try:
+                src, _ = read_text(path)
+            except OSError:
+                continue
+            self.files[os.path.normpath(path)] = SourceFile(os.path.normpath(path), src)
+
+    def resolve_module(self, from_path, spec):
+        if not spec.startswith('.'):
+            return None
+        base = os.path.normpath(os.path.join(os.path.dirname(from_path), spec))
+        for candidate in (base, base + '.ts', base + '.tsx', os.path.join(base, 'index.ts')):
+            if candidate in self.files:
+                return candidate
+        return None
+
+    def imported_files(self, path):
+        out = []
+        for spec in self.files[path].imports:
+            target = self.resolve_module(path, spec)
+            if target:
+                out.append(target)
+        return out
+
+
+class PromptResolver:
+    """Resolves a prompt expression to literal text plus the dynamic parts it interpolates."""
+
+    def __init__(self, project, slot_tokens):
+        self.project = project
+        self.slot_tokens = slot_tokens
+
+    def resolve(self, f, lo, hi, at, seen=frozenset()):
+        """Returns {'text', 'slots': [names], 'constants': {(file, name): tokens}} for tokens[lo:hi] of `f`."""
+        out = {'text': [], 'slots': [], 'constants': {}}
+        toks = f.tokens
+        i = lo
+        while i < hi:
+            kind, value, start, _ = toks[i]
+            if kind == 'string':
+                out['text'].append(template_text(value))
+                i += 1
+                continue
+            if kind != 'ident':
+                i += 1
+                continue
+            if i + 1 < hi and toks[i + 1][1] == ':' and i > lo and toks[i - 1][1] in ('{', ','):
+                i += 1  # object key
+                continue
+            # Consume a member/call chain: a.b(c)[d]?.e
+            j = i + 1
+            parts = [value]
+            called = False
+            while j < hi:
+                v = toks[j][1]
+                if v in ('.', '?') and j + 1 < hi and toks[j + 1][1] == '.':
+                    j += 1
+                    continue
+                if v == '.' and j + 1 < hi and toks[j + 1][0] == 'ident':
+                    parts.append(toks[j + 1][1])
+                    j += 2
+                elif v in ('(', '['):
+                    close = match_close(toks, j, v, ')' if v == '(' else ']')
+                    j = (close if close is not None else hi - 1) + 1
+                    called = True
+                else:
+                    break
+            name = None
+            if not called and len(parts) == 1 and value not in KEYWORDS:
+                name = value
+            elif not called and len(parts) == 2 and (value == 'this' or value[:1].isupper()):
+                name = parts[1]
+            if value in KEYWORDS and len(parts) == 1:
+                pass
+            elif name:
+                self._merge(out, self.lookup(f, name, at, seen), name)
+            else:
+                out['slots'].append(' '.join(f.src[start:toks[j - 1][3]].split())[:60])
+            i = j
+        return out
+
+    def _merge(self, out, found, name):
+        if found is None:
+            out['slots'].append(name)
+            return
+        out['text'].extend(found['text'])
+        out['slots'].extend(found['slots'])
+        out['constants'].update(found['constants'])
+
+    def lookup(self, f, name, at, seen):
+        key = (f.path, name)
+        if key in seen:
+            return None
+        seen = seen | {key}
+        defs = f.defs.get(name)
+        if defs:
+            # Nearest definition before the use; a later one only if nothing precedes it (hoisted module const).
+            before = [d for d in defs if d[0] < at]
+            offset, lo, hi, depth = max(before) if before else min(defs)
+            found = self.resolve(f, lo, hi, offset, seen)
+            for a_offset, a_lo, a_hi in f.appends.get(name, []):
+                if offset < a_offset < at:
+                    extra = self.resolve(f, a_lo, a_hi, a_offset, seen)
+                    found['text'].extend(extra['text'])
+                    found['slots'].extend(extra['slots'])
+                    found['constants'].update(extra['constants'])
+            if depth == 0:
+                found['constants'][(f.path, name)] = estimate_tokens(''.join(found['text']))
+            return found
+        for target in self.project.imported_files(f.path):
+            g = self.project.files[target]
+            module_defs = [d for d in g.defs.get(name, []) if d[3] == 0]
+            if module_defs:
+                return self.lookup(g, name, len(g.src), seen)
+        return None
+
+
+def find_call_sites(project, prompt_roots, resolver):
+    sites = []
+    roots = [os.path.normpath(r) for r in prompt_roots]
+    for path, f in sorted(project.files.items()):
+        if not any(path == r or path.startswith(r + os.sep) for r in roots):
+            continue
+        toks = f.tokens
+        for k, (kind, value, start, _) in enumerate(toks):
+            if value != CALL_NAME or k + 1 >= len(toks) or toks[k + 1][1] != '(':
+                continue
+            if k > 0 and toks[k - 1][1] in ('function', '.'):
+                continue
+            close = match_close(toks, k + 1, '(', ')')
+            if close is None:
+                continue
+            model, prompt, expr = None, None, None
+            if toks[k + 2][1] == '{':
+                obj_end = match_close(toks, k + 2, '{', '}')
+                j = k + 3
+                while j < obj_end:
+                    if toks[j][0] == 'ident' and toks[j - 1][1] in ('{', ','):
+                        key = toks[j][1]
+                        if j + 1 < obj_end and toks[j + 1][1] == ':':
+                            vend = f._expression_end(j + 2)
+                            if key == 'model' and toks[j + 2][0] == 'string':
+                                model = template_text(toks[j + 2][1])
+                            elif key == 'model':
+                                model = f.src[toks[j + 2][2]:toks[vend - 1][3]]
+                            elif key == 'contents':
+                                prompt = resolver.resolve(f, j + 2, vend, start)
+                                expr = f.src[toks[j + 2][2]:toks[vend - 1][3]]
+                            j = vend
+                            continue
+                        if key == 'contents':
+                            # Shorthand { contents }
+                            found = resolver.lookup(f, 'contents', start, frozenset())
+                            prompt = found or {'text': [], 'slots': ['contents'], 'constants': {}}
+                            expr = 'contents'
+                    j += 1
+            else:
+                prompt = resolver.resolve(f, k + 2, close, start)
+                expr = f.src[toks[k + 2][2]:toks[close - 1][3]]
+            if prompt is None:
+                prompt = {'text': [], 'slots': ['?'], 'constants': {}}
+            fn = f.innermost_function(start)
+            static = estimate_tokens(''.join(prompt['text']))
+            slots = prompt['slots']
+            dynamic = sum(resolver.slot_tokens.get(s, DEFAULT_SLOT_TOKENS) for s in slots)
+            sites.append({
+                'file': path.replace(os.sep, '/'),
+                'line': f.line_of(start),
+                'offset': start,
+                'function': fn[0] if fn else None,
+                'model': model,
+                'prompt': ' '.join((expr or '').split())[:60],
+                'static_tokens': static,
+                'dynamic_slots': slots,
+                'dynamic_tokens': dynamic,
+                'tokens_per_call': static + dynamic,
+                'constants': {f"{os.path.basename(p)}:{n}": t for (p, n), t in prompt['constants'].items()},
+                'calls_per_day': 0.0,
+                'driven_by': [],
+            })
+    return sites
+
+
+def reachable(project, path, names, depth=MAX_DEPTH):
+    """Function spans (file, start, end) reachable from `names` referenced in `path`."""
+    seen = set()
+    queue = deque((path, n, 0) for n in names)
+    spans = []
+    while queue:
+        p, name, d = queue.popleft()
+        if (p, name) in seen or d > depth:
+            continue
+        seen.add((p, name))
+        for target in [p] + project.imported_files(p):
+            f = project.files[target]
+            for fname, start, end in f.functions:
+                if fname != name:
+                    continue
+                spans.append((target, start, end))
+                for ident in f.idents_between(start, end):
+                    if ident not in KEYWORDS:
+                        queue.append((target, ident, d + 1))
+    return spans
+
+
+def attribute_timers(project, sites, timers):
+    """Adds calls/day to each call site reachable from a recurring timer's callback."""
+    by_file = {}
+    for s in sites:
+        by_file.setdefault(os.path.normpath(s['file']), []).append(s)
+
+    for t in timers:
+        if not t['per_hour']:
+            continue
+        path = os.path.normpath(t['file'])
+        f = project.files.get(path)
+        if not f:
+            continue
+        code = blank_comments(f.src)
+        callback = None
+        for m in TIMER_CALL.finditer(code):
+            if code.count('\n', 0, m.start()) + 1 == t['line']:
+                args = split_call_args(code, m.end() - 1)
+                callback = args[0] if args else None
+                break
+        if not callback:
+            continue
+        names = set(IDENT_RE.findall(callback)) - KEYWORDS
+        spans = reachable(project, path, names)
+        # A minute ticker that checks the wall clock only does its work at the configured time(s).
+        roots = [f.src[start:end] for name, start, end in f.functions if name in names]
+        gated = bool(TIME_GATE.search(callback) or any(TIME_GATE.search(r) for r in roots))
+        per_day = 1.0 if gated else t['per_hour'] * 24
+        label = f"{t['file']}:{t['line']} every {t['delay_ms'] / 1000:g}s" + (' (time-gated, 1/day)' if gated else '')
+
+        hit = set()
+        for p, start, end in spans:
+            for s in by_file.get(p, []):
+                if start <= s['offset'] < end and id(s) not in hit:
+                    hit.add(id(s))
+                    s['calls_per_day'] += per_day
+                    s['driven_by'].append(label)
+
+
+def profile(prompt_roots=PROMPT_ROOTS, graph_roots=GRAPH_ROOTS, slot_tokens=None, overrides=None):
+    project = Project(sorted(set(graph_roots) | set(prompt_roots)))
+    resolver = PromptResolver(project, slot_tokens or {})
+    sites = find_call_sites(project, prompt_roots, resolver)
+    attribute_timers(project, sites, analyze_timers(graph_roots))
+    for s in sites:
+        for key, per_day in (overrides or {}).items():
+            if key in (s['function'], f"{s['file']}:{s['line']}"):
+                s['calls_per_day'] = per_day
+                s['driven_by'] = ['override']
+        s['tokens_per_day'] = s['tokens_per_call'] * s['calls_per_day']
+    sites.sort(key=lambda s: (-s['tokens_per_day'], -s['tokens_per_call']))
+    return sites
+
+
+def shared_constants(sites):
+    out = {}
+    for s in sites:
+        for name, tokens in s['constants'].items():
+            c = out.setdefault(name, {'constant': name, 'tokens': tokens, 'call_sites': 0, 'tokens_per_day': 0.0})
+            c['call_sites'] += 1
+            c['tokens_per_day'] += tokens * s['calls_per_day']
+    return sorted((c for c in out.values() if c['call_sites'] > 1 or c['tokens_per_day']),
+                  key=lambda c: (-c['tokens_per_day'], -c['tokens'] * c['call_sites']))
+
+
+def print_report(sites, top):
+    print(f"{'file:line':<48} {'function':<30} {'static':>7} {'dyn':>5} {'calls/d':>8} {'tokens/d':>10}  slots")
+    for s in sites[:top]:
+        slots = ', '.join(sorted(set(s['dynamic_slots'])))[:50]
+        print(f"{s['file'] + ':' + str(s['line']):<48} {(s['function'] or '-')[:30]:<30} {s['static_tokens']:>7} "
+              f"{len(s['dynamic_slots']):>5} {s['calls_per_day']:>8.1f} {s['tokens_per_day']:>10,.0f}  {slots}")
+
+    driven = [s for s in sites if s['calls_per_day']]
+    print(f"\n--- Timer-driven call sites ({len(driven)} of {len(sites)}) ---")
+    for s in driven[:top]:
+        print(f"{s['file']}:{s['line']} {s['function']}: {'; '.join(s['driven_by'][:3])}")
+
+    print("\n--- Shared prompt constants (tokens each x call sites) ---")
+    for c in shared_constants(sites)[:top]:
+        print(f"{c['constant']:<50} {c['tokens']:>6} tok x {c['call_sites']:<3} sites  {c['tokens_per_day']:>10,.0f} tok/day")
+
+
+def parse_pairs(values, cast):
+    out = {}
+    for item in values:
+        key, _, value = item.rpartition('=')
+        if not key:
+            raise SystemExit(f"expected NAME=VALUE, got {item!r}")
+        out[key] = cast(value)
+    return out
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Estimate prompt tokens per generateContentWithRetry call site and rank them by tokens/day.")
+    parser.add_argument("paths", nargs="*", default=PROMPT_ROOTS, help="Directories with prompt call sites")
+    parser.add_argument("--graph", nargs="+", default=GRAPH_ROOTS, help="Directories searched for timers and callers")
+    parser.add_argument("--slot", action="append", default=[], metavar="NAME=TOKENS",
+                        help=f"Token estimate for an interpolated runtime value (default {DEFAULT_SLOT_TOKENS})")
+    parser.add_argument("--calls-per-day", action="append", default=[], metavar="FUNC=N",
+                        help="Override calls/day for a function name or file:line (e.g. user-triggered paths)")
+    parser.add_argument("--top", type=int, default=30)
+    parser.add_argument("--json", action="store_true")
+    args = parser.parse_args(argv)
+
+    sites = profile(args.paths, args.graph, parse_pairs(args.slot, int), parse_pairs(args.calls_per_day, float))
+    if args.json:
+        for s in sites:
+            del s['offset']
+        print(json.dumps({'call_sites': sites, 'shared_constants': shared_constants(sites)}, indent=2, ensure_ascii=False))
+    else:
+        print_report(sites, args.top)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,294 @@
+
+import argparse
+import glob
+import json
+import os
+import random
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+
+from load_generator import DEFAULT_URL, percentiles
+from near_dup import ANALYZED_MIN_CHARS
+from ops_config import get, keyset_filter, parse_ts, rest_session
+
+KST = timezone(timedelta(hours=9))
+# Columns re-inserted per table; ids and created_at are assigned by the stand-in at replay time.
+REPLAY_COLUMNS = {
+    "telegram_messages": ["message", "market", "channel", "channel_id", "message_id", "sender_id"],
+    "ai_thought_logs": ["ticker", "action", "confidence", "message", "details", "strategy"],
+}
+# Rows the intelligence consumer writes itself; replaying the recorded ones would count as its output.
+CONSUMER_STRATEGY = "CONTENT_ANALYSIS"
+
+
+def load_parquet_day(export_dir, table, day):
+    import pyarrow.dataset as ds
+
+    path = os.path.join(export_dir, table, f"date={day}")
+    if not glob.glob(os.path.join(path, "*.parquet")):
+        return []
+    rows = ds.dataset(path, format="parquet").to_table().to_pylist()
+    for row in rows:
+        if isinstance(row.get("details"), str):
+            try:
+                row["details"] = json.loads(row["details"])
+            except ValueError:
+                pass
+    return rows
+
+
+def load_jsonl(path):
+    """Lines of {"table": ..., <row columns>} (e.g. `ops verify --tail` output with a table field added)."""
+    out = {}
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                row = json.loads(line)
+                out.setdefault(row.pop("table", "telegram_messages"), []).append(row)
+    return out
+
+
+def build_schedule(tables, include_outputs=False, start=None, end=None):
+    """[(offset_seconds, table, row)] sorted by original created_at, relative to the first event."""
+    events = []
+    for table, rows in tables.items():
+        for row in rows:
+            if table == "ai_thought_logs" and row.get("strategy") == CONSUMER_STRATEGY and not include_outputs:
+                continue
+            ts = parse_ts(row["created_at"])
+            local = ts.astimezone(KST).strftime("%H:%M")
+            if (start and local < start) or (end and local >= end):
+                continue
+            events.append((ts, table, row))
+    events.sort(key=lambda e: e[0])
+    if not events:
+        return []
+    t0 = events[0][0]
+    return [((ts - t0).total_seconds(), table, row) for ts, table, row in events]
+
+
+class OutputWatcher(threading.Thread):
+    """Records when new consumer outputs (CONTENT_ANALYSIS result rows not written by the replay) appear."""
+
+    def __init__(self, session, url, since, run_id, interval=0.2):
+        super().__init__(daemon=True)
+        self.session = session
+        self.endpoint = f"{url}/rest/v1/ai_thought_logs"
+        self.cursor = (since, None)
+        self.run_id = run_id
+        self.interval = interval
+        self.seen = []
+        self.errors = 0
+        self.stop_event = threading.Event()
+
+    def run(self):
+        while not self.stop_event.is_set():
+            params = {"select": "id,created_at,details", "strategy": f"eq.{CONSUMER_STRATEGY}",
+                      # The consumer's "Analyzing..." rows carry no details; only results name their source.
+                      "action": "eq.ANALYSIS", "details->>source_title": "not.is.null",
+                      "order": "created_at.asc,id.asc", "limit": "1000",
+                      "or": keyset_filter(self.cursor)}
+            try:
+                r = self.session.get(self.endpoint, params=params, timeout=10)
+                r.raise_for_status()
+                rows = r.json()
+            except Exception:
+                self.errors += 1
+                rows = []
+            now = time.monotonic()
+            for row in rows:
+                if (row.get("details") or {}).get("replay_run") != self.run_id:
+                    self.seen.append(now)
+            if rows:
+                self.cursor = (rows[-1]["created_at"], rows[-1]["id"])
+            if len(rows) < 1000:
+                self.stop_event.wait(self.interval)
+
+
+class StubConsumer(threading.Thread):
+    """
+    Stands in for the dashboard's intelligence consumer: polls new telegram_messages,
+    "analyzes" long ones with `workers` parallel slots taking ~`latency` seconds each,
+    and writes one CONTENT_ANALYSIS result row per message, shaped like the real one.
+    """
+
+    def __init__(self, session, url, writer, since, workers, latency, seed=None, interval=0.2):
+        super().__init__(daemon=True)
+        self.session = session
+        self.endpoint = f"{url}/rest/v1/telegram_messages"
+        self.writer = writer
+        self.cursor = (since, None)
+        self.pool = ThreadPoolExecutor(max_workers=workers)
+        self.latency = latency
+        self.rng = random.Random(seed)
+        self.interval = interval
+        self.stop_event = threading.Event()
+
+    def _analyze(self, row):
+        time.sleep(self.rng.lognormvariate(0, 0.4) * self.latency)
+        self.writer.add("ai_thought_logs", {
+            "action": "ANALYSIS", "strategy": CONSUMER_STRATEGY, "ticker": "STUB", "confidence": 50,
+            "message": f"[Intel] 분석 완료 (stub): {row['message'][:40]}",
+            "details": {"source_title": row["message"][:80], "stub_for": row["id"]},
+        })
+
+    def run(self):
+        while not self.stop_event.is_set():
+            params = {"select": "id,created_at,message", "order": "created_at.asc,id.asc", "limit": "1000",
+                      "or": keyset_filter(self.cursor)}
+            try:
+                r = self.session.get(self.endpoint, params=params, timeout=10)
+                r.raise_for_status()
+                rows = r.json()
+            except Exception:
+                rows = []
+            for row in rows:
+                if len(row.get("message") or "") > ANALYZED_MIN_CHARS:
+                    self.pool.submit(self._analyze, row)
+            if rows:
+                self.cursor = (rows[-1]["created_at"], rows[-1]["id"])
+            if len(rows) < 1000:
+                self.stop_event.wait(self.interval)
+
+    def stop(self):
+        self.stop_event.set()
+        self.pool.shutdown(wait=False, cancel_futures=True)
+
+
+def replay_once(schedule, speed, args):
+    from supabase_writer import BatchedWriter
+
+    run_id = uuid.uuid4().hex[:8]
+    session = rest_session(args.url, args.key)
+    since = datetime.now(timezone.utc).isoformat()
+    writer = BatchedWriter(args.url, args.key, batch_size=args.batch_size, flush_interval=args.flush_interval)
+
+    watcher = OutputWatcher(session, args.url, since, run_id)
+    watcher.start()
+    consumer = None
+    if args.consumer == "stub":
+        consumer = StubConsumer(session, args.url, writer, since, args.stub_workers, args.stub_latency, args.seed)
+        consumer.start()
+
+    eligible = []   # monotonic time each analyzable message was handed to the writer
+    slips = []      # how late the replay itself was against the scaled schedule
+    samples = []    # (elapsed, backlog) once a second
+    started = time.monotonic()
+    next_sample = 0.0
+
+    for offset, table, row in schedule:
+        due = started + offset / speed
+        delay = due - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+        now = time.monotonic()
+        slips.append(max(0.0, now - due))
+        out = {k: row.get(k) for k in REPLAY_COLUMNS[table] if row.get(k) is not None}
+        if table == "ai_thought_logs":
+            out["details"] = {**(out.get("details") or {}), "replay_run": run_id}
+        writer.add(table, out)
+        if table == "telegram_messages" and len(out.get("message") or "") > ANALYZED_MIN_CHARS:
+            eligible.append(now)
+        if now - started >= next_sample:
+            samples.append((round(now - started, 1), len(eligible) - len(watcher.seen)))
+            next_sample += 1.0
+
+    writer.flush()
+    replay_elapsed = time.monotonic() - started
+
+    deadline = time.monotonic() + args.drain_timeout
+    while len(watcher.seen) < len(eligible) and time.monotonic() < deadline:
+        samples.append((round(time.monotonic() - started, 1), len(eligible) - len(watcher.seen)))
+        time.sleep(1.0)
+    if consumer:
+        consumer.stop()
+    watcher.stop_event.set()
+    watcher.join()
+    writer.close()
+
+    # The consumer works roughly FIFO, so the k-th output answers the k-th analyzable message.
+    consumed = watcher.seen[:len(eligible)]
+    lags = [done - produced for produced, done in zip(eligible, consumed)]
+    window = consumed[-1] - consumed[0] if len(consumed) > 1 else 0
+    return {
+        "run_id": run_id,
+        "speed": speed,
+        "events": len(schedule),
+        "replay_seconds": round(replay_elapsed, 2),
+        "offered_events_per_sec": round(len(schedule) / replay_elapsed, 2) if replay_elapsed else None,
+        "schedule_slip_sec": percentiles(slips),
+        "rows_written": writer.stats["rows_written"],
+        "rows_failed": writer.stats["rows_failed"],
+        "analyzable_messages": len(eligible),
+        "consumer_outputs": len(consumed),
+        "consumer_rate_per_sec": round((len(consumed) - 1) / window, 2) if window else None,
+        "max_backlog": max((b for _, b in samples), default=0),
+        "final_backlog": len(eligible) - len(consumed),
+        "consumer_lag_sec": percentiles(lags),
+        "backlog_timeline": samples if args.timeline else None,
+        "watch_errors": watcher.errors,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Replay a recorded day of intel traffic into a local stand-in at 1x/10x/100x and measure consumer lag.")
+    parser.add_argument("--date", help="Day to replay from the Parquet export (YYYY-MM-DD, UTC partition)")
+    parser.add_argument("--exports", default="exports", help="export_intel.py output directory")
+    parser.add_argument("--jsonl", help="Replay rows from a JSON-lines file instead ({'table': ..., columns...})")
+    parser.add_argument("--from", dest="start", help="Only replay from this KST time of day (HH:MM), e.g. 08:50")
+    parser.add_argument("--to", dest="end", help="Only replay until this KST time of day (HH:MM)")
+    parser.add_argument("--speed", type=float, nargs="+", default=[1, 10, 100], help="Speed factors, run one after another")
+    parser.add_argument("--include-outputs", action="store_true", help=f"Also replay recorded {CONSUMER_STRATEGY} thought logs")
+    parser.add_argument("--url", default=get("LOCAL_SUPABASE_URL", default=DEFAULT_URL))
+    parser.add_argument("--key", default=get("LOCAL_SUPABASE_ANON_KEY", "SUPABASE_ANON_KEY"))
+    parser.add_argument("--consumer", choices=["external", "stub"], default="external",
+                        help="external: measure whatever consumer is attached to the stand-in; stub: run a simulated one")
+    parser.add_argument("--stub-workers", type=int, default=4)
+    parser.add_argument("--stub-latency", type=float, default=2.0, help="Median seconds per stub analysis")
+    parser.add_argument("--batch-size", type=int, default=50)
+    parser.add_argument("--flush-interval", type=float, default=0.1)
+    parser.add_argument("--drain-timeout", type=float, default=30.0, help="Seconds to wait for the consumer to catch up")
+    parser.add_argument("--timeline", action="store_true", help="Include the per-second backlog in the report")
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--json", action="store_true")
+    args = parser.parse_args(argv)
+
+    if not args.key:
+        print("❌ Error: no API key (set LOCAL_SUPABASE_ANON_KEY or pass --key).")
+        return 1
+    if args.jsonl:
+        tables = load_jsonl(args.jsonl)
+    elif args.date:
+        tables = {t: load_parquet_day(args.exports, t, args.date) for t in REPLAY_COLUMNS}
+    else:
+        parser.error("give --date (from the Parquet export) or --jsonl")
+    args.url = args.url.rstrip("/")
+
+    schedule = build_schedule(tables, args.include_outputs, args.start, args.end)
+    if not schedule:
+        print("❌ Nothing to replay for that selection.")
+        return 1
+    span = schedule[-1][0]
+    print(f"🎬 {len(schedule)} events over {span / 60:.1f} recorded minutes -> {args.url} (consumer: {args.consumer})")
+
+    reports = []
+    for speed in args.speed:
+        print(f"▶️ {speed:g}x: ~{span / speed:.0f}s of replay...")
+        report = replay_once(schedule, speed, args)
+        reports.append(report)
+        if not args.json:
+            lag = report["consumer_lag_sec"]
+            behind = "⚠️ fell behind" if report["final_backlog"] else "✅ kept up"
+            print(f"   {behind}: {report['consumer_outputs']}/{report['analyzable_messages']} analyzed, "
+                  f"max backlog {report['max_backlog']}, lag p50={lag['p50'] or 0:.2f}s p95={lag['p95'] or 0:.2f}s "
+                  f"max={lag['max'] or 0:.2f}s, replay slip p95={report['schedule_slip_sec']['p95'] or 0:.3f}s")
+    if args.json:
+        print(json.dumps(reports, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    main()
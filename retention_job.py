@@ -0,0 +1,294 @@
+
+import argparse
+import gzip
+import json
+import os
+import time
+from datetime import datetime, timedelta, timezone
+
+from ops_config import get, keyset_filter, parse_ts, require_credentials, rest_session
+
+DEFAULT_ARCHIVE_DIR = "archive"
+# Days to keep in the database per table; older rows move to the archive.
+DEFAULT_KEEP_DAYS = {"ai_thought_logs": 14, "telegram_messages": 30}
+BATCH_SIZE = 500
+# Ids per DELETE request: keeps the URL short and each statement's lock brief.
+DELETE_CHUNK = 100
+
+
+def count_rows(session, url, table, cutoff):
+    r = session.get(f"{url}/rest/v1/{table}", params={"select": "id", "created_at": f"lt.{cutoff}", "limit": "1"},
+                    headers={"Prefer": "count=exact"}, timeout=60)
+    r.raise_for_status()
+    total = r.headers.get("Content-Range", "*/0").rsplit("/", 1)[-1]
+    return int(total) if total.isdigit() else None
+
+
+def table_sizes(session, url, tables):
+    """{table: (total_bytes, live_rows, dead_rows)} from the table_storage_stats RPC, or {} if it isn't deployed."""
+    try:
+        r = session.post(f"{url}/rest/v1/rpc/table_storage_stats", json={"tables": list(tables)}, timeout=30)
+        if r.status_code != 200:
+            return {}
+        return {row["table_name"]: (row["total_bytes"], row["live_rows"], row["dead_rows"]) for row in r.json()}
+    except Exception:
+        return {}
+
+
+def fetch_batch(session, url, table, cutoff, cursor, batch_size):
+    """Oldest rows before `cutoff`, after `cursor`: the keyset skips index entries already deleted."""
+    params = {"select": "*", "created_at": f"lt.{cutoff}", "order": "created_at.asc,id.asc", "limit": str(batch_size)}
+    if cursor:
+        params["or"] = keyset_filter(cursor)
+    r = session.get(f"{url}/rest/v1/{table}", params=params, timeout=60)
+    r.raise_for_status()
+    return r.json()
+
+
+def existing_ids(session, url, table, ids):
+    found = set()
+    for i in range(0, len(ids), DELETE_CHUNK):
+        chunk = ids[i:i + DELETE_CHUNK]
+        r = session.get(f"{url}/rest/v1/{table}", params={"select": "id", "id": f"in.({','.join(map(str, chunk))})"}, timeout=60)
+        r.raise_for_status()
+        found.update(row["id"] for row in r.json())
+    return found
+
+
+def delete_ids(session, url, table, ids):
+    """Deletes by primary key in small chunks; returns how many rows the database reports deleted."""
+    deleted = 0
+    for i in range(0, len(ids), DELETE_CHUNK):
+        chunk = ids[i:i + DELETE_CHUNK]
+        r = session.delete(f"{url}/rest/v1/{table}", params={"id": f"in.({','.join(map(str, chunk))})"},
+                           headers={"Prefer": "return=minimal,count=exact"}, timeout=60)
+        r.raise_for_status()
+        n = r.headers.get("Content-Range", "").rsplit("/", 1)[-1]
+        deleted += int(n) if n.isdigit() else len(chunk)
+    return deleted
+
+
+class Archive:
+    """
+    Rows appended as gzip members to <dir>/<table>/<table>-YYYY-MM-DD.jsonl.gz (by the
+    row's UTC day). Concatenated members are one valid gzip stream, so `zcat` reads
+    a file whole, and a member cut off by a crash can be truncated away by offset.
+    """
+
+    def __init__(self, root, table):
+        self.dir = os.path.join(root, table)
+        self.table = table
+        os.makedirs(self.dir, exist_ok=True)
+
+    def path(self, day):
+        return os.path.join(self.dir, f"{self.table}-{day}.jsonl.gz")
+
+    def split(self, rows):
+        by_day = {}
+        for row in rows:
+            by_day.setdefault(parse_ts(row["created_at"]).astimezone(timezone.utc).date().isoformat(), []).append(row)
+        return by_day
+
+    def offsets(self, days):
+        return {self.path(d): (os.path.getsize(self.path(d)) if os.path.exists(self.path(d)) else 0) for d in days}
+
+    def append(self, by_day):
+        written = 0
+        for day, rows in by_day.items():
+            data = "".join(json.dumps(row, ensure_ascii=False) + "\n" for row in rows).encode("utf-8")
+            written += len(data)
+            with open(self.path(day), "ab") as f:
+                f.write(gzip.compress(data, compresslevel=6))
+                f.flush()
+                os.fsync(f.fileno())
+        return written
+
+    @staticmethod
+    def truncate(offsets):
+        for path, size in offsets.items():
+            if os.path.exists(path):
+                with open(path, "r+b") as f:
+                    f.truncate(size)
+
+
+class RetentionState:
+    """
+    Per table: totals and the batch in flight. A pending batch is recorded (ids,
+    archive offsets and the cursor after it) before its rows are archived, so a rerun
+    knows whether to finish its deletes or to roll the archive back and redo it.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                self.data = json.load(f)
+        except FileNotFoundError:
+            self.data = {}
+
+    def table(self, name):
+        return self.data.setdefault(name, {"rows_archived": 0, "bytes_archived": 0})
+
+    def save(self):
+        tmp = self.path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(self.data, f, indent=2)
+        os.replace(tmp, self.path)
+
+
+def recover(session, url, table, state, archive):
+    """
+    Finishes or rolls back a batch interrupted by a crash. Returns the cursor the
+    interrupted run had reached when its batch was finished, else None.
+    """
+    mark = state.table(table)
+    pending = mark.get("pending")
+    if not pending:
+        return None
+    still_there = existing_ids(session, url, table, pending["ids"])
+    if len(still_there) == len(pending["ids"]):
+        # Deletes never started, so the archive member may be partial: roll it back and redo.
+        Archive.truncate(pending["offsets"])
+        print(f"↩️ {table}: rolled back an unfinished archive write ({len(pending['ids'])} rows will be redone)")
+        cursor = None
+    else:
+        # Deletes only start after the archive is fsynced: it's complete, finish the job.
+        delete_ids(session, url, table, [i for i in pending["ids"] if i in still_there])
+        mark["rows_archived"] += len(pending["ids"])
+        mark["bytes_archived"] += pending["bytes"]
+        cursor = tuple(pending["cursor"])
+        print(f"🔁 {table}: finished an interrupted batch ({len(pending['ids'])} rows)")
+    mark.pop("pending")
+    state.save()
+    return cursor
+
+
+def retain_table(session, url, table, keep_days, archive_root, state, batch_size=BATCH_SIZE, max_rows=None, pause=0.0):
+    cutoff = (datetime.now(timezone.utc) - timedelta(days=keep_days)).isoformat()
+    archive = Archive(archive_root, table)
+    mark = state.table(table)
+    # Archived rows are deleted, so every run starts from the oldest row before the cutoff:
+    # rows restored or backfilled behind an older run's position are picked up again.
+    # Only a run cut short by a crash resumes where its last batch ended.
+    cursor = recover(session, url, table, state, archive)
+    mark.pop("cursor", None)
+
+    started = time.perf_counter()
+    moved = raw_bytes = 0
+    while max_rows is None or moved < max_rows:
+        rows = fetch_batch(session, url, table, cutoff, cursor, min(batch_size, (max_rows - moved) if max_rows else batch_size))
+        if not rows:
+            break
+        ids = [row["id"] for row in rows]
+        next_cursor = [rows[-1]["created_at"], rows[-1]["id"]]
+        by_day = archive.split(rows)
+
+        mark["pending"] = {"ids": ids, "offsets": archive.offsets(by_day), "cursor": next_cursor, "bytes": 0}
+        state.save()
+        written = archive.append(by_day)
+        mark["pending"]["bytes"] = written
+        state.save()
+
+        deleted = delete_ids(session, url, table, ids)
+        if deleted == 0 and existing_ids(session, url, table, ids[:1]):
+            # RLS filters DELETE silently: nothing removed, nothing raised.
+            Archive.truncate(mark["pending"]["offsets"])
+            mark.pop("pending")
+            state.save()
+            raise PermissionError(f"{table}: DELETE removed no rows; use a key allowed to delete "
+                                  "(SUPABASE_SERVICE_ROLE_KEY) or add a delete policy")
+
+        mark.pop("pending")
+        cursor = next_cursor
+        mark["rows_archived"] += len(rows)
+        mark["bytes_archived"] += written
+        mark["updated_at"] = datetime.now(timezone.utc).isoformat()
+        state.save()
+        moved += len(rows)
+        raw_bytes += written
+        if len(rows) < batch_size:
+            break
+        if pause:
+            time.sleep(pause)
+
+    elapsed = time.perf_counter() - started
+    return {"table": table, "cutoff": cutoff, "rows": moved, "raw_bytes": raw_bytes, "seconds": elapsed}
+
+
+def restore(session, url, path):
+    """Re-inserts an archive file (ids and timestamps kept); rows already present are skipped."""
+    table = os.path.basename(os.path.dirname(os.path.abspath(path)))
+    with gzip.open(path, "rt", encoding="utf-8") as f:
+        rows = [json.loads(line) for line in f if line.strip()]
+    for i in range(0, len(rows), BATCH_SIZE):
+        r = session.post(f"{url}/rest/v1/{table}", json=rows[i:i + BATCH_SIZE],
+                         headers={"Prefer": "return=minimal,resolution=ignore-duplicates"}, timeout=60)
+        r.raise_for_status()
+    return table, len(rows)
+
+
+def fmt_bytes(n):
+    for unit in ("B", "KB", "MB", "GB"):
+        if abs(n) < 1024 or unit == "GB":
+            return f"{n:.0f} {unit}" if unit == "B" else f"{n:.1f} {unit}"
+        n /= 1024
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Archive old ai_thought_logs / telegram_messages rows to .jsonl.gz and delete them in small batches.")
+    parser.add_argument("tables", nargs="*", default=list(DEFAULT_KEEP_DAYS), help="Tables to trim")
+    parser.add_argument("--keep-days", type=int, help="Days to keep (default: 14 for ai_thought_logs, 30 for telegram_messages)")
+    parser.add_argument("--archive", default=DEFAULT_ARCHIVE_DIR, help="Archive directory")
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+    parser.add_argument("--max-rows", type=int, help="Stop each table after this many rows (resume with the next run)")
+    parser.add_argument("--pause", type=float, default=0.0, help="Seconds to sleep between batches")
+    parser.add_argument("--dry-run", action="store_true", help="Only count what would be archived")
+    parser.add_argument("--restore", metavar="FILE", help="Re-insert one archive file instead")
+    args = parser.parse_args(argv)
+
+    url, anon_key = require_credentials()
+    # Deletes usually need the service role: the anon policies only allow select/insert on some setups.
+    key = get("SUPABASE_SERVICE_ROLE_KEY", default=anon_key)
+    session = rest_session(url, key)
+
+    if args.restore:
+        table, n = restore(session, url, args.restore)
+        print(f"✅ Restored {n} rows into {table}")
+        return 0
+
+    os.makedirs(args.archive, exist_ok=True)
+    state = RetentionState(os.path.join(args.archive, "_state.json"))
+    before = table_sizes(session, url, args.tables)
+    failed = False
+    for table in args.tables:
+        keep = args.keep_days if args.keep_days is not None else DEFAULT_KEEP_DAYS.get(table, 30)
+        if args.dry_run:
+            cutoff = (datetime.now(timezone.utc) - timedelta(days=keep)).isoformat()
+            print(f"🔎 {table}: {count_rows(session, url, table, cutoff)} rows older than {keep} days")
+            continue
+        try:
+            result = retain_table(session, url, table, keep, args.archive, state,
+                                  args.batch_size, args.max_rows, args.pause)
+        except PermissionError as e:
+            print(f"❌ {e}")
+            failed = True
+            continue
+        rate = result["rows"] / result["seconds"] if result["seconds"] else 0
+        print(f"🗄️ {table}: archived+deleted {result['rows']} rows older than {keep} days "
+              f"in {result['seconds']:.1f}s ({rate:.0f} rows/s, {fmt_bytes(result['raw_bytes'])} of JSON)")
+
+    after = table_sizes(session, url, args.tables) if not args.dry_run else {}
+    for table in args.tables:
+        if table in before and table in after:
+            (b_bytes, b_live, _), (a_bytes, a_live, a_dead) = before[table], after[table]
+            # DELETE frees space for reuse only after (auto)vacuum; VACUUM FULL returns it to the OS.
+            reusable = b_bytes * (b_live - a_live) / b_live if b_live else 0
+            print(f"📦 {table}: {fmt_bytes(b_bytes)} -> {fmt_bytes(a_bytes)} on disk, ~{fmt_bytes(reusable)} "
+                  f"reusable after vacuum ({a_dead} dead rows pending)")
+    if not before and not args.dry_run:
+        print("ℹ️ Table sizes unavailable (deploy the table_storage_stats migration to see space reclaimed).")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    main()
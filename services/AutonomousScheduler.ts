@@ -511,7 +511,7 @@ ${bflSignals.map(s => `
 
             // Dynamic import
             const { callGemini } = await import('./gemini/client');
-            const aiResponse = await callGemini(prompt);
+            const aiResponse = await callGemini(prompt, 'scheduler.weekendStudy');
 
             const title = mode === 'REVIEW' ? '📝 [주말 공부] 이번 주 주식시장 복기' : '🔭 [주말 공부] 다음 주 시장 전망 및 전략';
 
@@ -300,7 +300,7 @@ export const timeMachineService = {
         `;
 
         try {
-            return await callGemini(prompt);
+            return await callGemini(prompt, 'timeMachine.generateInsight');
         } catch (e) {
             return "AI 분석 서비스 연결 실패";
         }
@@ -17,8 +17,9 @@ export interface MonthlyUsageStats {
 class TokenUsageService {
     /**
      * Log token usage to Supabase
+     * @param feature Optional name of the calling feature, used for per-feature rollups
      */
-    public async logUsage(model: string, inputTokens: number, outputTokens: number) {
+    public async logUsage(model: string, inputTokens: number, outputTokens: number, feature?: string) {
         if (!supabase) {
             console.warn('[TokenUsage] Supabase not available, skipping log');
             return;
@@ -32,7 +33,8 @@ class TokenUsageService {
                 model,
                 input_tokens: inputTokens,
                 output_tokens: outputTokens,
-                cost_usd: cost
+                cost_usd: cost,
+                ...(feature ? { feature } : {})
             } as any);
 
             // console.log(`[TokenUsage] Logged: ${inputTokens}/${outputTokens} tokens ($${cost.toFixed(6)})`);
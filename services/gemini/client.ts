@@ -17,7 +17,7 @@ export const AI_DISABLED_ERROR_MESSAGE = "AI 기능을 사용할 수 없습니
 /**
  * Gemini API의 일시적인 서버 오류(500 등)에 대응하기 위한 재시도 로직을 포함한 `generateContent` 래퍼 함수입니다.
  * Rate Limiter를 통해 429 에러를 방지합니다.
- * @param options `ai.models.generateContent`에 전달할 옵션 객체
+ * @param options `ai.models.generateContent`에 전달할 옵션 객체. `feature`는 토큰 사용량 집계용 호출자 태그입니다 (예: 'screener.runAlphaCoreScan').
  * @param retries 재시도 횟수 (기본값: 2)
  * @param delay 초기 재시도 딜레이 (ms, 기본값: 1000)
  * @param priority 요청 우선순위 ('high' | 'normal' | 'low')
@@ -95,6 +95,14 @@ export async function generateContentWithRetry(
                 const response = await result.response;
                 const text = response.text();
 
+                // Log token usage for cost tracking, tagged with the calling feature
+                if (response.usageMetadata) {
+                    const metadata = response.usageMetadata;
+                    // Fire and forget - don't wait for logging
+                    tokenUsageService.logUsage(modelName, metadata.promptTokenCount || 0, metadata.candidatesTokenCount || 0, options.feature)
+                        .catch((err: any) => console.warn('[TokenUsage] Failed to log:', err));
+                }
+
                 // shim to match expected structure somewhat
                 return {
                     text: text, // Direct access for convenience (ScannerTools.ts uses this)
@@ -139,8 +147,10 @@ export async function generateContentWithRetry(
 }
 
 
-export async function callGemini(prompt: string): Promise<string> {
+export async function callGemini(prompt: string, feature?: string): Promise<string> {
+    // Token usage is logged by generateContentWithRetry under `feature`
     const response = await generateContentWithRetry({
+        feature,
         model: "gemini-2.0-flash-001",
         contents: prompt
     });
@@ -153,17 +163,5 @@ export async function callGemini(prompt: string): Promise<string> {
         throw new Error('Empty response from Gemini API');
     }
 
-    // Log token usage for cost tracking
-    if (response?.usageMetadata) {
-        const metadata = response.usageMetadata;
-        const inputTokens = metadata.promptTokenCount || 0;
-        const outputTokens = metadata.candidatesTokenCount || 0;
-
-        // Fire and forget - don't wait for logging
-        tokenUsageService.logUsage('gemini-2.0-flash-001', inputTokens, outputTokens).catch((err: any) => {
-            console.warn('[TokenUsage] Failed to log:', err);
-        });
-    }
-
     return text;
 }
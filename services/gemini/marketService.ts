@@ -36,7 +36,7 @@ export async function analyzeMarketHealth(target: MarketTarget): Promise<MarketH
             Respond ONLY with the JSON object. Do NOT use English for factors.
         `;
 
-        const response = await callGemini(prompt);
+        const response = await callGemini(prompt, 'market.analyzeMarketHealth');
 
         // Validate response is not empty
         if (!response || response.trim().length === 0) {
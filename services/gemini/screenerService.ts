@@ -180,6 +180,7 @@ export async function fetchAnomalies(marketTarget: MarketTarget): Promise<Anomal
     `;
 
     const gatheringResponse = await generateContentWithRetry({
+        feature: 'screener.fetchAnomalies',
         model: "gemini-2.0-flash-001",
         contents: gatheringPrompt,
         config: {
@@ -211,6 +212,7 @@ export async function fetchAnomalies(marketTarget: MarketTarget): Promise<Anomal
     `;
 
     const structuringResponse = await generateContentWithRetry({
+        feature: 'screener.fetchAnomalies',
         model: "gemini-2.0-flash-001",
         contents: structuringPrompt,
         config: {
@@ -238,7 +240,7 @@ export async function runChartPatternScreener(marketTarget: MarketTarget, _timef
     Return ONLY a comma-separated list of tickers.
     `;
 
-    const discoveryResponse = await generateContentWithRetry({ model: "gemini-2.0-flash-001", contents: discoveryPrompt, config: { tools: [{ googleSearch: {} }] } });
+    const discoveryResponse = await generateContentWithRetry({ feature: 'screener.runChartPatternScreener', model: "gemini-2.0-flash-001", contents: discoveryPrompt, config: { tools: [{ googleSearch: {} }] } });
     const tickers = discoveryResponse.text.match(/[A-Z0-9.]{3,10}/g) || [];
     const uniqueTickers = [...new Set(tickers)].slice(0, 15);
 
@@ -270,6 +272,7 @@ export async function runChartPatternScreener(marketTarget: MarketTarget, _timef
     `;
 
     const response = await generateContentWithRetry({
+        feature: 'screener.runChartPatternScreener',
         model: "gemini-2.0-flash-001",
         contents: analysisPrompt,
         config: {
@@ -294,6 +297,7 @@ export async function scanForBFLStocks(marketTarget: MarketTarget): Promise<BFLS
     `;
 
     const discoveryResponse = await generateContentWithRetry({
+        feature: 'screener.scanForBFLStocks',
         model: "gemini-2.0-flash-001",
         contents: discoveryPrompt,
         config: { tools: [{ googleSearch: {} }] }
@@ -334,6 +338,7 @@ export async function scanForBFLStocks(marketTarget: MarketTarget): Promise<BFLS
     `;
 
     const response = await generateContentWithRetry({
+        feature: 'screener.scanForBFLStocks',
         model: "gemini-2.0-flash-001",
         contents: analysisPrompt,
         config: {
@@ -380,6 +385,7 @@ export async function scanForAlphaEngineSignals(marketTarget: MarketTarget): Pro
     `;
 
     const gatheringResponse = await generateContentWithRetry({
+        feature: 'screener.scanForAlphaEngineSignals',
         model: "gemini-2.0-flash-001",
         contents: gatheringPrompt,
         config: { tools: [{ googleSearch: {} }] }
@@ -408,6 +414,7 @@ export async function scanForAlphaEngineSignals(marketTarget: MarketTarget): Pro
     `;
 
     const response = await generateContentWithRetry({
+        feature: 'screener.scanForAlphaEngineSignals',
         model: "gemini-2.0-flash-001",
         contents: structuringPrompt,
         config: {
@@ -434,7 +441,7 @@ export async function runStructuralGrowthScan(marketTarget: MarketTarget, candid
         Ensure you look for KOSDAQ "Small/Mid Giant" stocks that are entering a growth phase.
         Return ONLY a comma-separated list of tickers.
         `;
-        const discoveryResponse = await generateContentWithRetry({ model: "gemini-2.0-flash-001", contents: discoveryPrompt, config: { tools: [{ googleSearch: {} }] } });
+        const discoveryResponse = await generateContentWithRetry({ feature: 'screener.runStructuralGrowthScan', model: "gemini-2.0-flash-001", contents: discoveryPrompt, config: { tools: [{ googleSearch: {} }] } });
         targetTickers = (discoveryResponse.text as string).match(/[A-Z0-9.]{3,10}/g) || [];
     }
 
@@ -465,6 +472,7 @@ export async function runStructuralGrowthScan(marketTarget: MarketTarget, candid
     `;
 
     const response = await generateContentWithRetry({
+        feature: 'screener.runStructuralGrowthScan',
         model: "gemini-2.0-flash-001",
         contents: analysisPrompt,
         config: {
@@ -614,6 +622,7 @@ export async function runAlphaCoreScan(marketTarget: MarketTarget, quantMetrics:
     };
 
     const response = await generateContentWithRetry({
+        feature: 'screener.runAlphaCoreScan',
         model: "gemini-2.0-flash-001", // Flash is sufficient for screening
         contents: prompt,
         config: {
@@ -653,6 +662,7 @@ export async function scanForSupplyEagle(marketTarget: MarketTarget): Promise<Su
     `;
 
     const discoveryResponse = await generateContentWithRetry({
+        feature: 'screener.scanForSupplyEagle',
         model: "gemini-2.0-flash-001",
         contents: discoveryPrompt,
         config: { tools: [{ googleSearch: {} }] }
@@ -693,6 +703,7 @@ export async function scanForSupplyEagle(marketTarget: MarketTarget): Promise<Su
     `;
 
     const response = await generateContentWithRetry({
+        feature: 'screener.scanForSupplyEagle',
         model: "gemini-2.0-flash-001",
         contents: analysisPrompt,
         config: {
@@ -749,6 +760,7 @@ export async function scanForLateSurge(marketTarget: MarketTarget): Promise<Late
     Return ONLY a comma-separated list of tickers.
     `;
     const discoveryResponse = await generateContentWithRetry({
+        feature: 'screener.scanForLateSurge',
         model: "gemini-2.0-flash-001",
         contents: discoveryPrompt,
         config: { tools: [{ googleSearch: {} }] }
@@ -778,6 +790,7 @@ export async function scanForLateSurge(marketTarget: MarketTarget): Promise<Late
     `;
 
     const response = await generateContentWithRetry({
+        feature: 'screener.scanForLateSurge',
         model: "gemini-2.0-flash-001",
         contents: analysisPrompt,
         config: {
@@ -834,6 +847,7 @@ export async function scanForShakeout(marketTarget: MarketTarget): Promise<Shake
     Return ONLY a comma-separated list of tickers (e.g., 005930, 298380).
     `;
     const discoveryResponse = await generateContentWithRetry({
+        feature: 'screener.scanForShakeout',
         model: "gemini-2.0-flash-001",
         contents: discoveryPrompt,
         config: { tools: [{ googleSearch: {} }] }
@@ -861,6 +875,7 @@ export async function scanForShakeout(marketTarget: MarketTarget): Promise<Shake
     `;
 
     const response = await generateContentWithRetry({
+        feature: 'screener.scanForShakeout',
         model: "gemini-2.0-flash-001",
         contents: analysisPrompt,
         config: {
@@ -919,6 +934,7 @@ export async function scanForDistribution(marketTarget: MarketTarget): Promise<D
     Return ONLY a comma-separated list of tickers.
     `;
     const discoveryResponse = await generateContentWithRetry({
+        feature: 'screener.scanForDistribution',
         model: "gemini-2.0-flash-001",
         contents: discoveryPrompt,
         config: { tools: [{ googleSearch: {} }] }
@@ -946,6 +962,7 @@ export async function scanForDistribution(marketTarget: MarketTarget): Promise<D
     `;
 
     const response = await generateContentWithRetry({
+        feature: 'screener.scanForDistribution',
         model: "gemini-2.0-flash-001",
         contents: analysisPrompt,
         config: {
@@ -1052,6 +1069,7 @@ export async function scanForConviction(market: MarketTarget): Promise<Convictio
             `;
 
             const clsResponse = await generateContentWithRetry({
+                feature: 'screener.scanForConviction',
                 model: "gemini-2.0-flash-001",
                 contents: classificationPrompt,
                 config: { responseMimeType: "application/json" }
@@ -1135,6 +1153,7 @@ export async function scanForGapStocks(market: MarketTarget): Promise<GapSignal[
     `;
 
     const discoveryResponse = await generateContentWithRetry({
+        feature: 'screener.scanForGapStocks',
         model: "gemini-2.0-flash-001",
         contents: prompt,
         config: {
@@ -1207,7 +1226,7 @@ export async function scanForGenomeMomentum(market: MarketTarget): Promise<Genom
     Find top 10 stocks in ${marketInfo[market].name} that potentially match a momentum-dip or early breakout pattern.
     Return ONLY a comma-separated list of tickers.
     `;
-    const discoveryResponse = await generateContentWithRetry({ model: "gemini-2.0-flash-001", contents: discoveryPrompt, config: { tools: [{ googleSearch: {} }] } });
+    const discoveryResponse = await generateContentWithRetry({ feature: 'screener.scanForGenomeMomentum', model: "gemini-2.0-flash-001", contents: discoveryPrompt, config: { tools: [{ googleSearch: {} }] } });
     let tickers: string[] = [];
     if (market === 'KR') {
         tickers = (discoveryResponse.text as string).match(/\b\d{6}\b/g) || [];
@@ -1248,6 +1267,7 @@ export async function scanForGenomeMomentum(market: MarketTarget): Promise<Genom
     `;
 
     const response = await generateContentWithRetry({
+        feature: 'screener.scanForGenomeMomentum',
         model: "gemini-2.0-flash-001",
         contents: analysisPrompt,
         config: {
@@ -7,7 +7,41 @@ try {
 }
 
 const CACHE_FILE_NAME = 'market_cache.json';
-const LOCAL_STORAGE_KEY = 'market_cache';
+const LOCAL_STORAGE_KEY = 'market_cache'; // full snapshot written by older versions
+const LEARNED_STORAGE_KEY = 'market_cache_learned';
+
+// ticker -> [market code, tag of the bundled map it was learned against]
+type Learned = Record<string, [string, string]>;
+
+let bundledPromise: Promise<{ map: Record<string, string>; build: string }> | null = null;
+
+function loadBundled() {
+    if (!bundledPromise) {
+        bundledPromise = import('./market_cache.json').then((m) => {
+            const map = m.default as Record<string, string>;
+            // Content hash (djb2) of the bundled map: changes whenever the builder ships a new one.
+            const text = JSON.stringify(map);
+            let h = 5381;
+            for (let i = 0; i < text.length; i++) h = ((h << 5) + h + text.charCodeAt(i)) | 0;
+            return { map, build: (h >>> 0).toString(16) };
+        });
+    }
+    return bundledPromise;
+}
+
+function readLearned(): Learned {
+    const data = localStorage.getItem(LEARNED_STORAGE_KEY);
+    if (data) return JSON.parse(data);
+    // Snapshot from an older version: its entries predate any build, so they only fill gaps.
+    const legacy = localStorage.getItem(LOCAL_STORAGE_KEY);
+    const learned: Learned = {};
+    if (legacy) {
+        for (const [ticker, code] of Object.entries(JSON.parse(legacy) as Record<string, string>)) {
+            learned[ticker] = [code, ''];
+        }
+    }
+    return learned;
+}
 
 async function getFilePath() {
     if (!isNode) return null;
@@ -33,8 +67,14 @@ export async function loadCache(): Promise<Record<string, string>> {
         return {};
     } else {
         try {
-            const data = localStorage.getItem(LOCAL_STORAGE_KEY);
-            return data ? JSON.parse(data) : {};
+            // Start from the bundled map (built by market_cache_builder.py); a lookup learned in this
+            // browser overrides it only if it was learned against this build, otherwise it just fills a gap.
+            const { map, build } = await loadBundled();
+            const cache = { ...map };
+            for (const [ticker, [code, learnedOn]] of Object.entries(readLearned())) {
+                if (learnedOn === build || !(ticker in map)) cache[ticker] = code;
+            }
+            return cache;
         } catch (e) {
             console.error('[Storage] Browser load failed:', e);
             return {};
@@ -55,7 +95,17 @@ export async function saveCache(cache: Record<string, string>): Promise<void> {
         }
     } else {
         try {
-            localStorage.setItem(LOCAL_STORAGE_KEY, JSON.stringify(cache));
+            // Only what differs from the bundled map is kept, each entry tagged with the build it was learned on.
+            const { map, build } = await loadBundled();
+            const previous = readLearned();
+            const learned: Learned = {};
+            for (const [ticker, code] of Object.entries(cache)) {
+                if (map[ticker] === code) continue;
+                const prev = previous[ticker];
+                learned[ticker] = [code, prev && prev[0] === code ? prev[1] : build];
+            }
+            localStorage.setItem(LEARNED_STORAGE_KEY, JSON.stringify(learned));
+            localStorage.removeItem(LOCAL_STORAGE_KEY);
         } catch (e) {
             console.error('[Storage] Browser save failed:', e);
         }
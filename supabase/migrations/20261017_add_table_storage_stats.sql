@@ -0,0 +1,23 @@
+-- Table size and row counts for the ops retention job (retention_job.py),
+-- so it can report how much space archiving old rows freed.
+
+CREATE OR REPLACE FUNCTION public.table_storage_stats(tables TEXT[])
+RETURNS TABLE (table_name TEXT, total_bytes BIGINT, live_rows BIGINT, dead_rows BIGINT)
+LANGUAGE sql
+STABLE
+SECURITY DEFINER
+SET search_path = public, pg_catalog
+AS $$
+    SELECT s.relname::TEXT,
+           pg_total_relation_size(s.relid),
+           s.n_live_tup,
+           s.n_dead_tup
+    FROM pg_stat_user_tables s
+    WHERE s.schemaname = 'public'
+      AND s.relname = ANY (tables);
+$$;
+
+COMMENT ON FUNCTION public.table_storage_stats(TEXT[]) IS 'Size on disk and live/dead row estimates for public tables (retention reporting)';
+
+REVOKE EXECUTE ON FUNCTION public.table_storage_stats(TEXT[]) FROM PUBLIC, anon, authenticated;
+GRANT EXECUTE ON FUNCTION public.table_storage_stats(TEXT[]) TO service_role;
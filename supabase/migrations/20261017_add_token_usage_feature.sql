@@ -0,0 +1,9 @@
+-- Tag each Gemini call with the feature (scheduler/service) that made it,
+-- so token_rollup.py can break usage down per feature. NULL = untagged.
+
+ALTER TABLE public.ai_token_usage ADD COLUMN IF NOT EXISTS feature TEXT;
+
+CREATE INDEX IF NOT EXISTS idx_token_usage_feature_created_at
+ON public.ai_token_usage(feature, created_at DESC);
+
+COMMENT ON COLUMN public.ai_token_usage.feature IS 'Calling feature (e.g. telegram-intel, oracle-briefing); NULL when not tagged';
@@ -0,0 +1,152 @@
+
+import atexit
+import threading
+import time
+
+import requests
+from ops_config import supabase_credentials
+
+DEFAULT_BATCH_SIZE = 500
+DEFAULT_FLUSH_INTERVAL = 2.0
+RETRY_STATUSES = {408, 429, 500, 502, 503, 504}
+
+
+class BatchedWriter:
+    """
+    Buffers rows per table and writes them to PostgREST as multi-row inserts.
+
+    A flush happens when a table's buffer reaches `batch_size` rows or every
+    `flush_interval` seconds, whichever comes first. Flushing runs on a
+    background thread, so `add()` never blocks on the network and is safe to
+    call from asyncio code. Pending rows are flushed on `close()`, on leaving
+    a `with` block, and at interpreter exit.
+
+    With a `tracer` (pipeline_trace.Tracer) every request is timed as the
+    "insert" stage; `on_written(table, rows)` is called after each batch lands.
+    """
+
+    def __init__(self, url=None, key=None, batch_size=DEFAULT_BATCH_SIZE,
+                 flush_interval=DEFAULT_FLUSH_INTERVAL, max_retries=5, backoff=0.5, timeout=30,
+                 tracer=None, on_written=None):
+        default_url, default_key = supabase_credentials()
+        self.url = (url or default_url or "").rstrip("/")
+        self.key = key or default_key
+        if not self.url or not self.key:
+            raise ValueError("SUPABASE_URL or SUPABASE_ANON_KEY not found in .env")
+
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.timeout = timeout
+        self.tracer = tracer
+        self.on_written = on_written
+
+        self.session = requests.Session()
+        self.session.headers.update({
+            "apikey": self.key,
+            "Authorization": f"Bearer {self.key}",
+            "Content-Type": "application/json",
+            # Keys missing from some rows of a batch fall back to column defaults.
+            "Prefer": "return=minimal,missing=default",
+        })
+
+        self.stats = {"rows_written": 0, "rows_failed": 0, "requests": 0, "retries": 0}
+        self._buffers = {}
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name="supabase-writer", daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    def add(self, table, row):
+        self.add_many(table, [row])
+
+    def add_many(self, table, rows):
+        # Checked under the lock close() sets it with: a row accepted here is in the final flush.
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("BatchedWriter is closed")
+            buffer = self._buffers.setdefault(table, [])
+            buffer.extend(rows)
+            full = len(buffer) >= self.batch_size
+        if full:
+            self._wakeup.set()
+
+    def pending(self):
+        with self._lock:
+            return sum(len(rows) for rows in self._buffers.values())
+
+    def flush(self):
+        # Serialize flushes so the background thread and an explicit flush() never split a batch.
+        with self._flush_lock:
+            with self._lock:
+                buffers, self._buffers = self._buffers, {}
+            for table, rows in buffers.items():
+                for start in range(0, len(rows), self.batch_size):
+                    self._post(table, rows[start:start + self.batch_size])
+
+    def close(self):
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+        self._wakeup.set()
+        self._thread.join()
+        self.flush()
+        self.session.close()
+        atexit.unregister(self.close)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def _run(self):
+        while not self._closed:
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            try:
+                self.flush()
+            except Exception as e:
+                print(f"❌ Writer flush failed: {e}")
+
+    def _post(self, table, rows):
+        # PostgREST needs an explicit column list when rows in one batch have different keys.
+        columns = sorted({k for row in rows for k in row})
+        endpoint = f"{self.url}/rest/v1/{table}"
+        params = {"columns": ",".join(columns)}
+
+        for attempt in range(self.max_retries + 1):
+            self.stats["requests"] += 1
+            started = time.perf_counter()
+            try:
+                r = self.session.post(endpoint, params=params, json=rows, timeout=self.timeout)
+                if self.tracer:
+                    self.tracer.record("insert", time.perf_counter() - started, error=r.status_code >= 300)
+                if r.status_code < 300:
+                    self.stats["rows_written"] += len(rows)
+                    if self.on_written:
+                        self.on_written(table, rows)
+                    return
+                if r.status_code not in RETRY_STATUSES:
+                    print(f"❌ Insert into {table} failed: {r.status_code} {r.text}")
+                    break
+                error = f"{r.status_code} {r.text}"
+            except requests.RequestException as e:
+                if self.tracer:
+                    self.tracer.record("insert", time.perf_counter() - started, error=True)
+                error = str(e)
+
+            if attempt < self.max_retries:
+                self.stats["retries"] += 1
+                delay = self.backoff * (2 ** attempt)
+                print(f"⚠️ Insert into {table} failed ({error}), retrying in {delay:.1f}s...")
+                time.sleep(delay)
+            else:
+                print(f"❌ Insert into {table} failed after {self.max_retries} retries: {error}")
+
+        self.stats["rows_failed"] += len(rows)
@@ -1,52 +1,55 @@
 
-import requests
-import os
-from supabase import create_client
-from dotenv import load_dotenv
-from bs4 import BeautifulSoup
+import argparse
 import datetime
-
-load_dotenv()
-
-supabase_url = os.environ.get("SUPABASE_URL") or os.environ.get("VITE_SUPABASE_URL")
-supabase_key = os.environ.get("SUPABASE_ANON_KEY") or os.environ.get("VITE_SUPABASE_ANON_KEY")
-
-if not supabase_url or not supabase_key:
-    print("❌ Error: Supabase credentials missing.")
-    exit(1)
-
-sb = create_client(supabase_url, supabase_key)
+import time
+from article_extractor import extract_article
+from ops_config import require_credentials, rest_session
+from pipeline_trace import AnalysisWaiter, Tracer, new_correlation_id
+from url_cache import UrlCache
 
 TARGET_URL = "http://spot.rassiro.com/rd/20251211/1000323"
 ORIGINAL_MSG = "[rassiro_channel] [리포트 브리핑]에스엠씨지, '유리용기는 시간을 들여야...' Not Rated - 키움증권"
 
-def fetch_url_content(url):
+def fetch_url_content(url, tracer=None, cid=None):
+    import requests
+
+    tracer = tracer or Tracer()
     try:
         print(f"🌍 Fetching URL: {url}...")
         headers = {'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'}
-        response = requests.get(url, headers=headers, timeout=10)
-        response.raise_for_status()
-        
-        soup = BeautifulSoup(response.text, 'html.parser')
-        
-        # Try to find main content (heuristics for rassiro/news sites)
-        text = ""
-        article = soup.find('div', class_='news_body') or soup.find('div', class_='article_view') or soup.find('body')
-        if article:
-            text = article.get_text(separator=' ', strip=True)
-        else:
-            text = soup.get_text(separator=' ', strip=True)
-            
-        return text[:1000] # Limit to 1000 chars
+        with tracer.span("fetch", cid):
+            response = requests.get(url, headers=headers, timeout=10)
+            response.raise_for_status()
+
+        # Per-site rules for rassiro/news sites, same extractor as url_crawler.py
+        with tracer.span("parse", cid):
+            return extract_article(response.text, url)
     except Exception as e:
         print(f"⚠️ Failed to fetch URL: {e}")
         return "(Content fetch failed - using simulation)"
 
-def simulate_pipeline():
+def simulate_pipeline(wait=0, trace_path=None):
+    cache = UrlCache()
+    try:
+        run_pipeline(cache, wait, trace_path)
+    finally:
+        cache.close()
+
+def run_pipeline(cache, wait=0, trace_path=None):
+    supabase_url, supabase_key = require_credentials()
+    tracer = Tracer()
+    cid = new_correlation_id()
+
+    # 0. Skip links that were already ingested (channels repost the same report link)
+    if cache.is_ingested(TARGET_URL):
+        print(f"♻️ Already ingested: {TARGET_URL} - skipping fetch and insert.")
+        return
+
     # 1. Fetch
-    content = fetch_url_content(TARGET_URL)
-    
-    if "Content fetch failed" in content:
+    content = fetch_url_content(TARGET_URL, tracer, cid)
+    fetched = "Content fetch failed" not in content
+
+    if not fetched:
         # Fallback simulation if URL is dead/unreachable
         content = "에스엠씨지(SMCG)에 대해 키움증권은 유리용기 산업의 특성상 시간을 들여야 가치가 드러난다고 평가했다. 투자의견은 Not Rated, 목표가는 제시하지 않았다. 동사는 화장품 유리용기 제조사로..."
 
@@ -63,12 +66,41 @@ def simulate_pipeline():
         "created_at": datetime.datetime.utcnow().isoformat()
     }
     
+    waiter = AnalysisWaiter(tracer, supabase_url, supabase_key) if wait > 0 else None
     try:
-        res = sb.table("telegram_messages").insert(data).execute()
-        print("✅ Message Inserted Successfully.")
+        with tracer.span("insert", cid):
+            res = rest_session().post(f"{supabase_url}/rest/v1/telegram_messages", json=data, timeout=10,
+                                      headers={"Prefer": "return=representation"})
+            res.raise_for_status()
+        inserted_at = time.monotonic()
+        # Simulation text must not mark the real link as ingested for the whole TTL.
+        if fetched:
+            cache.record(TARGET_URL, content)
+        print(f"✅ Message Inserted Successfully. (trace {cid})")
         print("💡 The Dashboard should now pick this up, and since it is long (>100 chars), the AI will analyze it.")
     except Exception as e:
         print(f"❌ Insert Failed: {e}")
+        waiter = None
+
+    if waiter:
+        rows = res.json() if res.content else []
+        waiter.expect(cid, full_message, rows[0].get("id") if rows else None, inserted_at)
+        print(f"⏳ Waiting up to {wait:.0f}s for the CONTENT_ANALYSIS thought log...")
+        if waiter.wait(wait):
+            print(f"⚠️ No analysis within {wait:.0f}s (is the dashboard's analyzer running?)")
+
+    print(tracer.report())
+    if trace_path:
+        tracer.write(trace_path)
+        print(f"🧭 Stage trace written to {trace_path}")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Fetch the sample report URL and insert it as a telegram message.")
+    parser.add_argument("--wait", type=float, default=0, metavar="SECONDS",
+                        help="Wait this long for the CONTENT_ANALYSIS row and time it")
+    parser.add_argument("--trace", metavar="PATH", help="Write stage timings (JSON, or Prometheus text for .prom)")
+    args = parser.parse_args(argv)
+    simulate_pipeline(args.wait, args.trace)
 
 if __name__ == "__main__":
-    simulate_pipeline()
+    main()
@@ -0,0 +1,69 @@
+import * as fs from 'fs';
+import * as path from 'path';
+
+import { TechnicalAnalysis } from '../services/strategy/TechnicalAnalysis';
+
+// Writes TechnicalAnalysis outputs for a fixed set of series so indicator_batch.py can be
+// checked against them:
+//   npx tsx tests/verify_indicator_parity.ts .cache/indicator_parity.json
+//   python indicator_batch.py parity .cache/indicator_parity.json
+
+const PERIODS = { SMA: [5, 20, 200], EMA: [12, 26], RSI: [2, 14], BB: [20] };
+
+function mulberry32(seed: number) {
+    return () => {
+        seed |= 0; seed = (seed + 0x6D2B79F5) | 0;
+        let t = Math.imul(seed ^ (seed >>> 15), 1 | seed);
+        t = (t + Math.imul(t ^ (t >>> 7), 61 | t)) ^ t;
+        return ((t ^ (t >>> 14)) >>> 0) / 4294967296;
+    };
+}
+
+function randomWalk(n: number, start: number, seed: number): number[] {
+    const rand = mulberry32(seed);
+    const out: number[] = [];
+    let price = start;
+    for (let i = 0; i < n; i++) {
+        price = Math.max(1, price * (1 + (rand() - 0.5) * 0.06));
+        // KRX-style integer prices for large values, cents otherwise
+        out.push(start > 1000 ? Math.round(price) : Math.round(price * 100) / 100);
+    }
+    return out;
+}
+
+function verify() {
+    console.log("=== TechnicalAnalysis Parity Fixture ===");
+    const cases: { name: string, closes: number[] }[] = [
+        { name: 'empty', closes: [] },
+        { name: 'short_4', closes: [10, 11, 12, 13] },
+        { name: 'exact_period_20', closes: randomWalk(20, 50, 1) },
+        { name: 'flat_30', closes: new Array(30).fill(100) },           // RSI 0/0 -> NaN
+        { name: 'rising_40', closes: Array.from({ length: 40 }, (_, i) => 100 + i) }, // RSI avgLoss 0 -> 100
+        { name: 'us_walk_250', closes: randomWalk(250, 180.25, 7) },
+        { name: 'kr_walk_1500', closes: randomWalk(1500, 71500, 42) },
+        { name: 'with_gap_60', closes: randomWalk(60, 30, 3).map((c, i) => (i === 35 ? NaN : c)) },
+    ];
+
+    const out = cases.map(({ name, closes }) => {
+        const outputs: Record<string, number[]> = {};
+        PERIODS.SMA.forEach(p => { outputs[`SMA_${p}`] = TechnicalAnalysis.SMA(closes, p); });
+        PERIODS.EMA.forEach(p => { outputs[`EMA_${p}`] = TechnicalAnalysis.EMA(closes, p); });
+        PERIODS.RSI.forEach(p => { outputs[`RSI_${p}`] = TechnicalAnalysis.RSI(closes, p); });
+        PERIODS.BB.forEach(p => {
+            const bb = TechnicalAnalysis.BollingerBands(closes, p);
+            outputs[`BB_UPPER_${p}`] = bb.upper;
+            outputs[`BB_MIDDLE_${p}`] = bb.middle;
+            outputs[`BB_LOWER_${p}`] = bb.lower;
+        });
+        console.log(`${name}: ${closes.length} bars, ${Object.keys(outputs).length} series`);
+        return { name, closes, outputs };
+    });
+
+    const target = process.argv[2] || path.join('.cache', 'indicator_parity.json');
+    fs.mkdirSync(path.dirname(target), { recursive: true });
+    // NaN serializes as null, which the Python side reads back as NaN.
+    fs.writeFileSync(target, JSON.stringify({ cases: out }));
+    console.log(`Wrote ${target}`);
+}
+
+verify();
@@ -0,0 +1,121 @@
+
+import codecs
+import mmap
+import os
+
+SAMPLE_SIZE = 64 * 1024
+MMAP_THRESHOLD = 1024 * 1024
+
+# cp949 is a superset of euc-kr, so one attempt covers both.
+CANDIDATES = ['utf-8', 'cp949']
+FALLBACK = 'latin-1'
+
+BOMS = [
+    (codecs.BOM_UTF32_LE, 'utf-32'),
+    (codecs.BOM_UTF32_BE, 'utf-32'),
+    (codecs.BOM_UTF8, 'utf-8-sig'),
+    (codecs.BOM_UTF16_LE, 'utf-16'),
+    (codecs.BOM_UTF16_BE, 'utf-16'),
+]
+
+# (path, mtime_ns, size) -> encoding
+_encoding_cache = {}
+
+
+def _sample_decodes(sample, encoding, final):
+    try:
+        # Incremental so a multi-byte char cut off at the sample edge isn't an error.
+        codecs.getincrementaldecoder(encoding)().decode(sample, final=final)
+        return True
+    except UnicodeDecodeError:
+        return False
+
+
+def _looks_utf16(sample):
+    """
+    BOM-less UTF-16 leaves a NUL in the high byte of every ASCII char. Korean prose is
+    only ~10-20% ASCII (spaces, newlines), so any clear skew between the two byte
+    lanes counts; syllables like 가/대/저 put a few NULs in the other lane. A strict
+    decode of the sample confirms it.
+    """
+    if len(sample) < 4:
+        return None
+    even = sample[0::2].count(0) / (len(sample) // 2)
+    odd = sample[1::2].count(0) / (len(sample) // 2)
+    if odd >= 0.02 and even < odd / 4:
+        encoding = 'utf-16-le'
+    elif even >= 0.02 and odd < even / 4:
+        encoding = 'utf-16-be'
+    else:
+        return None
+    return encoding if _sample_decodes(sample[:len(sample) & ~1], encoding, False) else None
+
+
+def detect_encoding(data, sample_size=SAMPLE_SIZE):
+    """Guess the encoding of `data` (bytes, memoryview or mmap) from its BOM and first `sample_size` bytes."""
+    head = bytes(data[:4])
+    for bom, encoding in BOMS:
+        if head.startswith(bom):
+            return encoding
+
+    sample = bytes(data[:sample_size])
+    utf16 = _looks_utf16(sample)
+    if utf16:
+        return utf16
+
+    final = len(data) <= sample_size
+    for encoding in CANDIDATES:
+        if _sample_decodes(sample, encoding, final):
+            return encoding
+    return FALLBACK
+
+
+def decode_bytes(data, encoding=None):
+    """
+    Decodes `data` strictly, returning (text, encoding). If the detected
+    encoding fails past the sample, the other candidates are tried on the
+    full data; latin-1 is the last resort so bytes are never dropped.
+    """
+    encoding = encoding or detect_encoding(data)
+    tried = [encoding] + [c for c in CANDIDATES if c != encoding]
+    for candidate in tried:
+        try:
+            return str(data, candidate), candidate
+        except UnicodeDecodeError:
+            continue
+    return str(data, FALLBACK), FALLBACK
+
+
+def read_bytes(path):
+    """Reads a file once; files over MMAP_THRESHOLD are memory-mapped instead of copied."""
+    with open(path, 'rb') as f:
+        size = os.fstat(f.fileno()).st_size
+        if size >= MMAP_THRESHOLD:
+            return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        return f.read()
+
+
+def read_text(path):
+    """Returns (text, encoding) for `path`; the detected encoding is cached per path and mtime."""
+    st = os.stat(path)
+    key = (os.path.abspath(path), st.st_mtime_ns, st.st_size)
+
+    data = read_bytes(path)
+    try:
+        text, encoding = decode_bytes(data, _encoding_cache.get(key))
+    finally:
+        if isinstance(data, mmap.mmap):
+            data.close()
+
+    _encoding_cache[key] = encoding
+    return text, encoding
+
+
+def write_text(path, text, encoding='utf-8'):
+    """
+    Writes `text` back in the encoding it was read with (BOM included for
+    utf-8-sig/utf-16). Line endings are written as-is; latin-1 round-trips
+    undecodable files byte for byte.
+    """
+    with open(path, 'w', encoding=encoding, newline='') as f:
+        f.write(text)
@@ -0,0 +1,284 @@
+
+import argparse
+import json
+import os
+import sqlite3
+import time
+from datetime import datetime, timedelta, timezone
+
+from ops_config import keyset_filter, parse_ts, rest_session, supabase_credentials
+
+DEFAULT_STORE_PATH = os.path.join(".cache", "token_rollup.sqlite")
+PAGE_SIZE = 1000
+# Minute buckets only back the RPM check, so they are pruned after this long.
+MINUTE_RETENTION = timedelta(days=2)
+UNTAGGED = "-"
+
+# Gemini free-tier limits per model (requests/minute, tokens/minute, requests/day, tokens/day).
+# Override with --budgets FILE ({"model": {"rpm": .., "tpm": .., "rpd": .., "tpd": ..}}); "*" applies to any model.
+DEFAULT_BUDGETS = {
+    "gemini-2.0-flash-001": {"rpm": 15, "tpm": 1_000_000, "rpd": 1500},
+    "gemini-1.5-flash": {"rpm": 15, "tpm": 1_000_000, "rpd": 1500},
+    "gemini-1.5-pro": {"rpm": 2, "tpm": 32_000, "rpd": 50},
+}
+WARN_RATIO = 0.8
+
+GRAINS = {"minute": "%Y-%m-%dT%H:%M", "hour": "%Y-%m-%dT%H", "day": "%Y-%m-%d"}
+
+
+class RollupStore:
+    """
+    Local sqlite store of pre-aggregated ai_token_usage buckets.
+
+    Every usage row is folded into one minute, hour and day bucket keyed by
+    (model, feature), so reports read a few hundred rows instead of scanning
+    the raw table. The keyset cursor of the last folded row is stored in the
+    same transaction as the buckets, which makes sync() safe to interrupt.
+    """
+
+    def __init__(self, path=DEFAULT_STORE_PATH):
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.path = path
+        self.db = sqlite3.connect(path)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.executescript("""
+            CREATE TABLE IF NOT EXISTS buckets (
+                grain TEXT NOT NULL,
+                bucket TEXT NOT NULL,
+                model TEXT NOT NULL,
+                feature TEXT NOT NULL,
+                requests INTEGER NOT NULL,
+                input_tokens INTEGER NOT NULL,
+                output_tokens INTEGER NOT NULL,
+                cost_usd REAL NOT NULL,
+                PRIMARY KEY (grain, bucket, model, feature)
+            ) WITHOUT ROWID;
+            CREATE TABLE IF NOT EXISTS sync_state (
+                id INTEGER PRIMARY KEY CHECK (id = 1),
+                created_at TEXT NOT NULL,
+                row_id TEXT NOT NULL,
+                rows_folded INTEGER NOT NULL
+            );
+        """)
+
+    def cursor(self):
+        row = self.db.execute("SELECT created_at, row_id FROM sync_state WHERE id = 1").fetchone()
+        return tuple(row) if row else None
+
+    def fold(self, rows):
+        """Adds a page of ai_token_usage rows to the buckets and advances the cursor atomically."""
+        if not rows:
+            return
+        acc = {}
+        for r in rows:
+            ts = parse_ts(r["created_at"]).astimezone(timezone.utc)
+            key_tail = (r.get("model") or "unknown", r.get("feature") or UNTAGGED)
+            inp, out = int(r.get("input_tokens") or 0), int(r.get("output_tokens") or 0)
+            cost = float(r.get("cost_usd") or 0)
+            for grain, fmt in GRAINS.items():
+                b = acc.setdefault((grain, ts.strftime(fmt)) + key_tail, [0, 0, 0, 0.0])
+                b[0] += 1
+                b[1] += inp
+                b[2] += out
+                b[3] += cost
+
+        last = rows[-1]
+        with self.db:
+            self.db.executemany("""
+                INSERT INTO buckets VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT (grain, bucket, model, feature) DO UPDATE SET
+                    requests = requests + excluded.requests,
+                    input_tokens = input_tokens + excluded.input_tokens,
+                    output_tokens = output_tokens + excluded.output_tokens,
+                    cost_usd = cost_usd + excluded.cost_usd
+            """, [k + tuple(v) for k, v in acc.items()])
+            self.db.execute("""
+                INSERT INTO sync_state VALUES (1, ?, ?, ?)
+                ON CONFLICT (id) DO UPDATE SET created_at = excluded.created_at, row_id = excluded.row_id,
+                    rows_folded = rows_folded + excluded.rows_folded
+            """, (last["created_at"], str(last["id"]), len(rows)))
+
+    def prune_minutes(self, now=None):
+        cutoff = ((now or datetime.now(timezone.utc)) - MINUTE_RETENTION).strftime(GRAINS["minute"])
+        with self.db:
+            return self.db.execute("DELETE FROM buckets WHERE grain = 'minute' AND bucket < ?", (cutoff,)).rowcount
+
+    def top(self, grain, bucket, by="feature"):
+        """Usage per model or feature inside one bucket (e.g. grain='hour', bucket='2026-10-17T09')."""
+        column = "feature" if by == "feature" else "model"
+        rows = self.db.execute(f"""
+            SELECT {column}, SUM(requests), SUM(input_tokens), SUM(output_tokens), SUM(cost_usd)
+            FROM buckets WHERE grain = ? AND bucket = ?
+            GROUP BY {column} ORDER BY SUM(input_tokens + output_tokens) DESC
+        """, (grain, bucket)).fetchall()
+        return [{"key": k, "requests": n, "input_tokens": i, "output_tokens": o, "total_tokens": i + o, "cost_usd": c}
+                for k, n, i, o, c in rows]
+
+    def series(self, grain, since, model=None):
+        sql = """
+            SELECT bucket, SUM(requests), SUM(input_tokens + output_tokens), SUM(cost_usd)
+            FROM buckets WHERE grain = ? AND bucket >= ?
+        """
+        params = [grain, since]
+        if model:
+            sql += " AND model = ?"
+            params.append(model)
+        sql += " GROUP BY bucket ORDER BY bucket"
+        return [{"bucket": b, "requests": n, "total_tokens": t, "cost_usd": c}
+                for b, n, t, c in self.db.execute(sql, params)]
+
+    def peaks(self, grain, since):
+        """Per model: the busiest bucket since `since` by requests and by tokens."""
+        out = {}
+        rows = self.db.execute("""
+            SELECT model, bucket, SUM(requests), SUM(input_tokens + output_tokens)
+            FROM buckets WHERE grain = ? AND bucket >= ? GROUP BY model, bucket
+        """, (grain, since))
+        for model, bucket, reqs, tokens in rows:
+            p = out.setdefault(model, {"requests": (0, None), "tokens": (0, None)})
+            if reqs > p["requests"][0]:
+                p["requests"] = (reqs, bucket)
+            if tokens > p["tokens"][0]:
+                p["tokens"] = (tokens, bucket)
+        return out
+
+    def close(self):
+        self.db.close()
+
+
+def sync(store, url, key, page_size=PAGE_SIZE):
+    """Streams ai_token_usage rows newer than the store's cursor into the buckets. Returns rows folded."""
+    session = rest_session(url, key)
+    endpoint = f"{url.rstrip('/')}/rest/v1/ai_token_usage"
+    cursor = store.cursor()
+    total = 0
+    while True:
+        params = {"select": "*", "order": "created_at.asc,id.asc", "limit": str(page_size)}
+        if cursor:
+            params["or"] = keyset_filter(cursor)
+        r = session.get(endpoint, params=params, timeout=60)
+        r.raise_for_status()
+        rows = r.json()
+        store.fold(rows)
+        total += len(rows)
+        if len(rows) < page_size:
+            break
+        cursor = (rows[-1]["created_at"], rows[-1]["id"])
+    store.prune_minutes()
+    return total
+
+
+def load_budgets(path=None):
+    budgets = {k: dict(v) for k, v in DEFAULT_BUDGETS.items()}
+    if path:
+        with open(path, "r", encoding="utf-8") as f:
+            for model, limits in json.load(f).items():
+                budgets.setdefault(model, {}).update(limits)
+    return budgets
+
+
+def danger_zones(store, budgets, now=None, warn_ratio=WARN_RATIO):
+    """
+    Compares usage against per-model budgets: peak requests/tokens per minute
+    over the last hour (RPM/TPM) and today's UTC totals (RPD/TPD).
+    Returns a list of {model, limit, used, budget, ratio, level, at}.
+    """
+    now = now or datetime.now(timezone.utc)
+    since_minute = (now - timedelta(hours=1)).strftime(GRAINS["minute"])
+    today = now.strftime(GRAINS["day"])
+
+    usage = {}
+    for model, p in store.peaks("minute", since_minute).items():
+        usage.setdefault(model, {})["rpm"] = p["requests"]
+        usage[model]["tpm"] = p["tokens"]
+    for model, p in store.peaks("day", today).items():
+        usage.setdefault(model, {})["rpd"] = p["requests"]
+        usage[model]["tpd"] = p["tokens"]
+
+    flags = []
+    for model, limits in usage.items():
+        budget = budgets.get(model) or budgets.get("*") or {}
+        for limit, (used, at) in limits.items():
+            cap = budget.get(limit)
+            if not cap:
+                continue
+            ratio = used / cap
+            if ratio >= warn_ratio:
+                flags.append({"model": model, "limit": limit, "used": used, "budget": cap, "ratio": round(ratio, 3),
+                              "level": "OVER" if ratio >= 1 else "WARN", "at": at})
+    return sorted(flags, key=lambda f: -f["ratio"])
+
+
+def print_top(rows, title):
+    print(f"--- {title} ---")
+    if not rows:
+        print("(no usage)")
+    for r in rows:
+        print(f"{r['key']:<36} {r['requests']:>6} req {r['total_tokens']:>10,} tok "
+              f"(in {r['input_tokens']:,} / out {r['output_tokens']:,})  ${r['cost_usd']:.4f}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Hourly/daily token usage rollups over ai_token_usage, with rate-limit alerts.")
+    parser.add_argument("command", choices=["sync", "top", "series", "alerts"])
+    parser.add_argument("--store", default=DEFAULT_STORE_PATH)
+    parser.add_argument("--grain", choices=["hour", "day"], default="hour")
+    parser.add_argument("--bucket", help="Bucket to report for 'top' (default: current UTC hour/day)")
+    parser.add_argument("--by", choices=["feature", "model"], default="feature")
+    parser.add_argument("--since", help="First bucket for 'series' (default: last 24 hours / 30 days)")
+    parser.add_argument("--model", help="Only this model for 'series'")
+    parser.add_argument("--budgets", help="JSON file with per-model rpm/tpm/rpd/tpd budgets")
+    parser.add_argument("--no-sync", action="store_true", help="Report from the local store without pulling new rows")
+    parser.add_argument("--json", action="store_true")
+    args = parser.parse_args(argv)
+
+    store = RollupStore(args.store)
+    if args.command == "sync" or not args.no_sync:
+        url, key = supabase_credentials()
+        if not url or not key:
+            print("❌ Error: SUPABASE_URL or SUPABASE_ANON_KEY not found in .env (use --no-sync to read the local store)")
+            exit(1)
+        started = time.perf_counter()
+        import requests
+
+        try:
+            folded = sync(store, url, key)
+        except requests.RequestException as e:
+            print(f"⚠️ Sync failed, reporting from the local store: {e}")
+        else:
+            if args.command == "sync" or not args.json:
+                print(f"🔄 Folded {folded} new usage rows in {time.perf_counter() - started:.2f}s")
+
+    now = datetime.now(timezone.utc)
+    if args.command == "top":
+        bucket = args.bucket or now.strftime(GRAINS[args.grain])
+        rows = store.top(args.grain, bucket, args.by)
+        if args.json:
+            print(json.dumps(rows, indent=2))
+        else:
+            print_top(rows, f"{args.grain} {bucket} by {args.by}")
+    elif args.command == "series":
+        default_since = now - (timedelta(hours=24) if args.grain == "hour" else timedelta(days=30))
+        rows = store.series(args.grain, args.since or default_since.strftime(GRAINS[args.grain]), args.model)
+        if args.json:
+            print(json.dumps(rows, indent=2))
+        else:
+            for r in rows:
+                print(f"{r['bucket']:<14} {r['requests']:>6} req {r['total_tokens']:>10,} tok  ${r['cost_usd']:.4f}")
+    elif args.command == "alerts":
+        flags = danger_zones(store, load_budgets(args.budgets), now)
+        if args.json:
+            print(json.dumps(flags, indent=2))
+        elif not flags:
+            print("✅ All models within budget.")
+        for f in flags if not args.json else []:
+            icon = "🚨" if f["level"] == "OVER" else "⚠️"
+            print(f"{icon} {f['model']}: {f['limit'].upper()} {f['used']:,}/{f['budget']:,} ({f['ratio']:.0%}) at {f['at']}")
+        store.close()
+        exit(1 if any(f["level"] == "OVER" for f in flags) else 0)
+    store.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,205 @@
+
+import argparse
+import hashlib
+import os
+import sqlite3
+import time
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+DEFAULT_CACHE_PATH = os.path.join(".cache", "url_cache.sqlite")
+DEFAULT_TTL_SECONDS = 7 * 24 * 3600
+DEFAULT_MAX_ENTRIES = 100_000
+EVICT_EVERY = 100
+# Expired entries are kept (for ETag/Last-Modified revalidation) until unused for this many TTLs.
+RETAIN_TTLS = 4
+
+# Query params that only identify the share, not the document.
+TRACKING_PARAMS = {"fbclid", "gclid", "igshid"}
+DEFAULT_PORTS = {"http": 80, "https": 443}
+
+
+def normalize_url(url):
+    parts = urlsplit(url.strip())
+    scheme = parts.scheme.lower()
+    host = (parts.hostname or "").lower()
+    if host.startswith("www."):
+        host = host[4:]
+    if parts.port and parts.port != DEFAULT_PORTS.get(scheme):
+        host = f"{host}:{parts.port}"
+
+    query = sorted(
+        (k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True)
+        if not k.lower().startswith("utm_") and k.lower() not in TRACKING_PARAMS
+    )
+    path = parts.path.rstrip("/") or "/"
+    # http/https variants of the same link are one document.
+    return urlunsplit(("https" if scheme == "http" else scheme, host, path, urlencode(query), ""))
+
+
+def content_hash(text):
+    # Whitespace-insensitive so re-rendered pages with the same article text collapse to one hash.
+    return hashlib.sha256(" ".join(text.split()).encode("utf-8")).hexdigest()
+
+
+class UrlCache:
+    """
+    Persistent sqlite cache of crawled report URLs.
+
+    Entries are keyed by normalized URL and remember the validators
+    (ETag / Last-Modified) and the hash of the extracted content. A second
+    table records every content hash that has been ingested, so the same
+    article reached through a different link is still recognized. Entries
+    go stale after `ttl` seconds and must be revalidated; the least recently
+    used ones are evicted once the cache holds more than `max_entries` URLs.
+    """
+
+    def __init__(self, path=DEFAULT_CACHE_PATH, ttl=DEFAULT_TTL_SECONDS, max_entries=DEFAULT_MAX_ENTRIES):
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.path = path
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.stats = {"fresh_hits": 0, "not_modified": 0, "duplicate_content": 0, "misses": 0, "evicted": 0}
+        self._writes = 0
+
+        self.db = sqlite3.connect(path)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA synchronous=NORMAL")
+        self.db.executescript("""
+            CREATE TABLE IF NOT EXISTS urls (
+                url_key TEXT PRIMARY KEY,
+                url TEXT NOT NULL,
+                etag TEXT,
+                last_modified TEXT,
+                content_hash TEXT,
+                fetched_at REAL NOT NULL,
+                last_access REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_urls_last_access ON urls(last_access);
+            CREATE TABLE IF NOT EXISTS content_hashes (
+                content_hash TEXT PRIMARY KEY,
+                url_key TEXT NOT NULL,
+                ingested_at REAL NOT NULL
+            );
+        """)
+
+    def lookup(self, url):
+        """Returns the cache row for `url` as a dict (with a `fresh` flag), or None."""
+        key = normalize_url(url)
+        row = self.db.execute(
+            "SELECT url, etag, last_modified, content_hash, fetched_at FROM urls WHERE url_key = ?", (key,)
+        ).fetchone()
+        if not row:
+            self.stats["misses"] += 1
+            return None
+
+        now = time.time()
+        self.db.execute("UPDATE urls SET last_access = ? WHERE url_key = ?", (now, key))
+        self.db.commit()
+        entry = {
+            "url_key": key, "url": row[0], "etag": row[1], "last_modified": row[2],
+            "content_hash": row[3], "fetched_at": row[4], "fresh": now - row[4] < self.ttl,
+        }
+        if entry["fresh"]:
+            self.stats["fresh_hits"] += 1
+        return entry
+
+    def is_ingested(self, url):
+        entry = self.lookup(url)
+        return bool(entry and entry["fresh"])
+
+    @staticmethod
+    def revalidation_headers(entry):
+        headers = {}
+        if entry and entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry and entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+        return headers
+
+    def mark_not_modified(self, url):
+        # A 304 means the stored copy is still valid: restart its TTL.
+        now = time.time()
+        self.db.execute("UPDATE urls SET fetched_at = ?, last_access = ? WHERE url_key = ?", (now, now, normalize_url(url)))
+        self.db.commit()
+        self.stats["not_modified"] += 1
+
+    def has_content(self, text):
+        """True if this article text has already been ingested, through any URL."""
+        return self.db.execute(
+            "SELECT 1 FROM content_hashes WHERE content_hash = ?", (content_hash(text),)
+        ).fetchone() is not None
+
+    def record(self, url, text, etag=None, last_modified=None):
+        """
+        Stores a fetched page. Returns True if its content has not been ingested
+        before (the caller should insert it), False if it is a duplicate.
+        """
+        key = normalize_url(url)
+        digest = content_hash(text)
+        now = time.time()
+
+        self.db.execute(
+            "INSERT OR REPLACE INTO urls (url_key, url, etag, last_modified, content_hash, fetched_at, last_access) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (key, url, etag, last_modified, digest, now, now),
+        )
+        cur = self.db.execute(
+            "INSERT OR IGNORE INTO content_hashes (content_hash, url_key, ingested_at) VALUES (?, ?, ?)",
+            (digest, key, now),
+        )
+        self.db.commit()
+
+        is_new = cur.rowcount == 1
+        if not is_new:
+            self.stats["duplicate_content"] += 1
+        self._writes += 1
+        if self._writes % EVICT_EVERY == 0:
+            self.evict()
+        return is_new
+
+    def evict(self):
+        cutoff = time.time() - self.ttl * RETAIN_TTLS
+        removed = self.db.execute("DELETE FROM urls WHERE last_access < ?", (cutoff,)).rowcount
+        self.db.execute("DELETE FROM content_hashes WHERE ingested_at < ?", (cutoff,))
+
+        overflow = self.db.execute("SELECT COUNT(*) FROM urls").fetchone()[0] - self.max_entries
+        if overflow > 0:
+            removed += self.db.execute(
+                "DELETE FROM urls WHERE url_key IN (SELECT url_key FROM urls ORDER BY last_access LIMIT ?)", (overflow,)
+            ).rowcount
+        self.db.commit()
+        self.stats["evicted"] += removed
+
+    def summary(self):
+        urls = self.db.execute("SELECT COUNT(*) FROM urls").fetchone()[0]
+        hashes = self.db.execute("SELECT COUNT(*) FROM content_hashes").fetchone()[0]
+        return {"urls": urls, "content_hashes": hashes, **self.stats}
+
+    def close(self):
+        self.evict()
+        self.db.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Inspect or maintain the crawled URL cache.")
+    parser.add_argument("command", choices=["stats", "check", "evict"])
+    parser.add_argument("urls", nargs="*", help="URLs to check (for 'check')")
+    parser.add_argument("--cache", default=DEFAULT_CACHE_PATH)
+    args = parser.parse_args(argv)
+
+    cache = UrlCache(args.cache)
+    if args.command == "check":
+        for u in args.urls:
+            print(f"{'✅ ingested' if cache.is_ingested(u) else '🆕 new     '} {normalize_url(u)}")
+    elif args.command == "evict":
+        cache.evict()
+        print(f"🧹 Evicted {cache.stats['evicted']} entries.")
+    else:
+        for k, v in cache.summary().items():
+            print(f"{k}: {v}")
+    cache.close()
+
+
+if __name__ == "__main__":
+    main()
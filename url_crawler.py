@@ -0,0 +1,332 @@
+
+import argparse
+import asyncio
+import datetime
+import re
+import sys
+import time
+from collections import deque
+from urllib.parse import urlparse
+
+from article_extractor import MAX_CONTENT_CHARS, extract_article
+from near_dup import DEFAULT_THRESHOLD, DEFAULT_WINDOW_HOURS, NearDupFilter, fetch_messages
+from pipeline_trace import AnalysisWaiter, Tracer, new_correlation_id
+from supabase_writer import BatchedWriter
+from ops_config import parse_ts, supabase_credentials
+from url_cache import DEFAULT_CACHE_PATH, UrlCache, content_hash
+
+SUPABASE_URL, SUPABASE_KEY = supabase_credentials()
+
+USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
+CRAWLED_MARKER = "[Auto-Crawled Summary]"
+URL_PATTERN = re.compile(r'https?://[^\s<>"\'\)\]]+')
+
+def build_message(job, content):
+    original = job.get("message") or f"[{job['channel']}] {job['url']}"
+    return f"{original}\n\n{CRAWLED_MARKER}:\n{content}\n\nOriginal Link: {job['url']}"
+
+
+def parse_job_line(line, default_channel):
+    # Accepts "<url>" or "<url> <channel>" per line; blank lines and '#' comments are skipped.
+    line = line.strip()
+    if not line or line.startswith('#'):
+        return None
+    parts = line.split(None, 1)
+    if not URL_PATTERN.match(parts[0]):
+        return None
+    channel = parts[1].strip() if len(parts) > 1 else default_channel
+    return {"url": parts[0], "channel": channel, "message": None, "cid": new_correlation_id()}
+
+
+def rest_headers():
+    return {
+        "apikey": SUPABASE_KEY,
+        "Authorization": f"Bearer {SUPABASE_KEY}",
+        "Content-Type": "application/json",
+    }
+
+
+class CrawlStats:
+    def __init__(self):
+        self.started = time.monotonic()
+        self.queued = 0
+        self.fetched = 0
+        self.failed = 0
+        self.cached = 0
+        self.not_modified = 0
+        self.duplicates = 0
+        self.near_duplicates = 0
+        self.inserted = 0
+        self.insert_failed = 0
+        self.per_host = {}
+
+    def summary(self):
+        elapsed = max(time.monotonic() - self.started, 1e-9)
+        return (
+            f"📊 queued={self.queued} fetched={self.fetched} failed={self.failed} "
+            f"cached={self.cached} not_modified={self.not_modified} duplicates={self.duplicates} near_duplicates={self.near_duplicates} "
+            f"inserted={self.inserted} insert_failed={self.insert_failed} "
+            f"elapsed={elapsed:.1f}s rate={self.fetched / elapsed * 60:.0f} pages/min"
+        )
+
+
+async def produce_from_stream(stream, queue, stats, default_channel, seen):
+    loop = asyncio.get_running_loop()
+    while True:
+        # readline blocks, so keep it off the event loop; this also lets a live feed be piped in.
+        line = await loop.run_in_executor(None, stream.readline)
+        if not line:
+            break
+        job = parse_job_line(line, default_channel)
+        if job and job["url"] not in seen:
+            seen.add(job["url"])
+            stats.queued += 1
+            job["queued_at"] = time.monotonic()
+            await queue.put(job)
+
+
+async def produce_from_pending(session, queue, stats, limit, seen):
+    if not SUPABASE_URL or not SUPABASE_KEY:
+        print("❌ Error: Supabase credentials missing.")
+        return
+
+    url = f"{SUPABASE_URL}/rest/v1/telegram_messages"
+    params = {
+        "select": "id,channel,message,created_at",
+        "order": "created_at.desc",
+        "limit": str(limit),
+    }
+    async with session.get(url, params=params, headers=rest_headers()) as r:
+        if r.status != 200:
+            print(f"❌ Error: {r.status} {await r.text()}")
+            return
+        rows = await r.json()
+
+    for row in rows:
+        message = row.get("message") or ""
+        if CRAWLED_MARKER in message:
+            continue
+        for link in URL_PATTERN.findall(message):
+            if link in seen:
+                continue
+            seen.add(link)
+            stats.queued += 1
+            await queue.put({"url": link, "channel": row.get("channel") or "telegram", "message": message,
+                             "cid": new_correlation_id(), "queued_at": time.monotonic()})
+
+
+async def fetch_page(session, url, extra_headers=None):
+    headers = {'User-Agent': USER_AGENT, **(extra_headers or {})}
+    async with session.get(url, headers=headers, allow_redirects=True) as response:
+        if response.status == 304:
+            return 304, None, None, None
+        response.raise_for_status()
+        text = await response.text(errors='replace')
+        return response.status, text, response.headers.get('ETag'), response.headers.get('Last-Modified')
+
+
+def build_row(job, content):
+    return {
+        "channel": job["channel"],
+        "message": build_message(job, content),
+        "created_at": datetime.datetime.utcnow().isoformat(),
+    }
+
+
+async def worker(session, queue, stats, writer, cache, dedupe, tracer, pending, run_hashes):
+    while True:
+        job = await queue.get()
+        cid = job["cid"]
+        tracer.record("queue_wait", time.monotonic() - job["queued_at"], cid)
+        try:
+            host = urlparse(job["url"]).netloc
+            entry = cache.lookup(job["url"]) if cache else None
+            if entry and entry["fresh"]:
+                # Already ingested within the TTL: no network call at all.
+                stats.cached += 1
+                continue
+
+            try:
+                with tracer.span("fetch", cid):
+                    status, html, etag, last_modified = await fetch_page(
+                        session, job["url"], UrlCache.revalidation_headers(entry)
+                    )
+                if status == 304:
+                    cache.mark_not_modified(job["url"])
+                    stats.not_modified += 1
+                    continue
+                # Parsing is CPU-bound; run it in a thread so in-flight fetches keep progressing.
+                with tracer.span("parse", cid):
+                    content = await asyncio.to_thread(extract_article, html, job["url"], MAX_CONTENT_CHARS, "auto")
+                stats.fetched += 1
+                stats.per_host[host] = stats.per_host.get(host, 0) + 1
+            except Exception as e:
+                stats.failed += 1
+                print(f"⚠️ Failed to fetch {job['url']}: {e}")
+                continue
+
+            if writer is None:
+                print(f"📝 {job['url']} -> {content[:50]}...")
+                continue
+
+            digest = content_hash(content)
+            if digest in run_hashes or (cache and cache.has_content(content)):
+                # Same article reached through another link (or unchanged after expiry): don't reinsert.
+                if cache and digest not in run_hashes:
+                    cache.record(job["url"], content, etag, last_modified)
+                stats.duplicates += 1
+                continue
+            run_hashes.add(digest)
+            if dedupe and dedupe.check(build_message(job, content))[0]:
+                # Reworded repost of a report ingested within the window: it would only be analyzed again.
+                stats.near_duplicates += 1
+                continue
+
+            # Buffered; the writer thread sends multi-row inserts without blocking the loop.
+            # The cache entry is only written once the row has landed (see on_written in crawl()).
+            row = build_row(job, content)
+            pending[row["message"]] = (cid, job["url"], content, etag, last_modified)
+            writer.add("telegram_messages", row)
+        finally:
+            queue.task_done()
+
+
+def seed_near_dup(dedupe, hours):
+    """
+    Indexes the last `hours` of telegram_messages, so a repost of a report an earlier
+    run ingested is caught too. Returns how many messages were indexed.
+    """
+    since = (datetime.datetime.now(datetime.timezone.utc) - datetime.timedelta(hours=hours)).isoformat()
+    n = 0
+    for row in fetch_messages(SUPABASE_URL, since):
+        ts = parse_ts(row.get("created_at"))
+        # Keyed apart from the filter's own integer keys for this run's articles.
+        dedupe.check(row.get("message") or "", ts.timestamp() if ts else None, ("telegram_messages", row["id"]))
+        n += 1
+    return n
+
+
+async def crawl(args):
+    import aiohttp
+
+    stats = CrawlStats()
+    queue = asyncio.Queue(maxsize=args.concurrency * 4)
+    seen = set()
+
+    # One bounded pool for the whole run: total sockets capped by --concurrency, per-host by --per-host.
+    connector = aiohttp.TCPConnector(limit=args.concurrency, limit_per_host=args.per_host, ttl_dns_cache=300)
+    timeout = aiohttp.ClientTimeout(total=args.timeout)
+
+    tracer = Tracer()
+    pending = {}      # message -> (cid, url, content, etag, last_modified) until its insert lands
+    run_hashes = set()
+    written = deque()
+    waiter = AnalysisWaiter(tracer, SUPABASE_URL, SUPABASE_KEY) if args.wait_analysis and not args.dry_run else None
+    loop = asyncio.get_running_loop()
+
+    def record_written():
+        # Runs on the event loop thread, which owns the cache's sqlite connection.
+        while written:
+            _, url, content, etag, last_modified = written.popleft()
+            cache.record(url, content, etag, last_modified)
+
+    def on_written(table, rows):
+        # Writer thread. Failed batches never get here, so their URLs stay uncached and are retried next run.
+        for row in rows:
+            job = pending.pop(row["message"], None)
+            if job is None:
+                continue
+            if waiter:
+                # The analysis clock starts when the row is actually in the table.
+                waiter.expect(job[0], row["message"])
+            if cache:
+                written.append(job)
+        if cache and written:
+            loop.call_soon_threadsafe(record_written)
+
+    writer = None if args.dry_run else BatchedWriter(SUPABASE_URL, SUPABASE_KEY, batch_size=args.batch_size,
+                                                     tracer=tracer, on_written=on_written)
+    # Dry runs never ingest, so they must not mark anything as ingested either.
+    cache = None if args.dry_run or args.no_cache else UrlCache(args.cache, ttl=args.cache_ttl * 3600)
+    dedupe = NearDupFilter(args.near_dup_threshold, args.near_dup_window * 3600) if args.near_dup_window > 0 else None
+    if dedupe and writer:
+        try:
+            seeded = await asyncio.to_thread(seed_near_dup, dedupe, args.near_dup_window)
+            print(f"🧬 Near-dup window seeded with {seeded} messages from the last {args.near_dup_window:g}h")
+        except Exception as e:
+            print(f"⚠️ Could not seed the near-dup window from telegram_messages: {e}")
+
+    async with aiohttp.ClientSession(connector=connector, timeout=timeout) as session:
+        workers = [
+            asyncio.create_task(worker(session, queue, stats, writer, cache, dedupe, tracer, pending, run_hashes))
+            for _ in range(args.concurrency)
+        ]
+
+        if args.pending:
+            await produce_from_pending(session, queue, stats, args.pending_limit, seen)
+        if args.file == '-':
+            await produce_from_stream(sys.stdin, queue, stats, args.channel, seen)
+        elif args.file:
+            with open(args.file, 'r', encoding='utf-8') as f:
+                await produce_from_stream(f, queue, stats, args.channel, seen)
+
+        await queue.join()
+        for w in workers:
+            w.cancel()
+        await asyncio.gather(*workers, return_exceptions=True)
+
+    if writer:
+        await asyncio.to_thread(writer.close)
+        stats.inserted = writer.stats["rows_written"]
+        stats.insert_failed = writer.stats["rows_failed"]
+    if cache:
+        record_written()
+        cache.close()
+    if waiter and waiter.pending:
+        print(f"⏳ Waiting up to {args.wait_analysis:.0f}s for CONTENT_ANALYSIS of {len(waiter.pending)} inserted messages...")
+        unanswered = await asyncio.to_thread(waiter.wait, args.wait_analysis)
+        if unanswered:
+            print(f"⚠️ {unanswered} messages had no analysis within {args.wait_analysis:.0f}s")
+
+    print(stats.summary())
+    if args.trace or waiter:
+        print(tracer.report())
+    if args.trace:
+        tracer.write(args.trace)
+        print(f"🧭 Stage trace written to {args.trace}")
+    return stats
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Concurrent crawl-and-ingest of report links into telegram_messages.")
+    parser.add_argument("file", nargs="?", help="File with one URL per line ('<url> [channel]'), or '-' for stdin")
+    parser.add_argument("--pending", action="store_true", help="Also crawl links found in recent telegram_messages rows")
+    parser.add_argument("--pending-limit", type=int, default=200, help="How many recent telegram_messages rows to scan")
+    parser.add_argument("--channel", default="url_crawler", help="Channel name for URLs without one")
+    parser.add_argument("--concurrency", type=int, default=64, help="Max concurrent connections / workers")
+    parser.add_argument("--per-host", type=int, default=4, help="Max concurrent connections per host")
+    parser.add_argument("--timeout", type=float, default=10, help="Per-request timeout in seconds")
+    parser.add_argument("--batch-size", type=int, default=100, help="Rows per telegram_messages bulk insert")
+    parser.add_argument("--cache", default=DEFAULT_CACHE_PATH, help="Path of the ingested-URL cache")
+    parser.add_argument("--cache-ttl", type=float, default=168, help="Hours before a cached URL is revalidated")
+    parser.add_argument("--no-cache", action="store_true", help="Fetch and insert every URL, even if already ingested")
+    parser.add_argument("--near-dup-window", type=float, default=DEFAULT_WINDOW_HOURS,
+                        help="Hours of inserted articles to check reworded reposts against (0 disables)")
+    parser.add_argument("--near-dup-threshold", type=float, default=DEFAULT_THRESHOLD, help="Similarity above which a repost is skipped")
+    parser.add_argument("--dry-run", action="store_true", help="Fetch and extract only, do not insert")
+    parser.add_argument("--trace", metavar="PATH", help="Write per-stage latency histograms (JSON, or Prometheus text for .prom)")
+    parser.add_argument("--wait-analysis", type=float, default=0, metavar="SECONDS",
+                        help="After inserting, wait this long for the CONTENT_ANALYSIS rows and time them")
+    args = parser.parse_args(argv)
+
+    if not args.file and not args.pending:
+        parser.error("give a URL file, '-' for stdin, or --pending")
+    if not args.dry_run and (not SUPABASE_URL or not SUPABASE_KEY):
+        print("❌ Error: Supabase credentials missing.")
+        sys.exit(1)
+
+    asyncio.run(crawl(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,36 +1,21 @@
 
-import os
-import requests
+import sys
+import argparse
 import json
 import time
-from dotenv import load_dotenv
+from ops_config import keyset_filter, rest_session, supabase_credentials
 
-load_dotenv()
-
-SUPABASE_URL = os.environ.get("SUPABASE_URL")
-SUPABASE_KEY = os.environ.get("SUPABASE_ANON_KEY")
-
-if not SUPABASE_KEY:
-    # Fallback to reading temp file if env not set
-    try:
-        with open("temp_key.txt", "r") as f:
-            SUPABASE_KEY = f.read().strip()
-    except:
-        pass
-
-HEADERS = {
-    "apikey": SUPABASE_KEY,
-    "Authorization": f"Bearer {SUPABASE_KEY}",
-    "Content-Type": "application/json"
-}
+def thoughts_url():
+    url, _ = supabase_credentials()
+    return f"{url}/rest/v1/ai_thought_logs"
 
 def check_recent_thoughts():
     print(f"Checking recently created thoughts...")
     
     # Select thoughts created in the last 2 minutes
-    url = f"{SUPABASE_URL}/rest/v1/ai_thought_logs?select=*&order=created_at.desc&limit=5"
+    params = {"select": "*", "order": "created_at.desc", "limit": "5"}
     
-    r = requests.get(url, headers=HEADERS)
+    r = rest_session().get(thoughts_url(), params=params, timeout=10)
     if r.status_code != 200:
         print(f"❌ Error: {r.status_code} {r.text}")
         return
@@ -48,9 +33,73 @@ def check_recent_thoughts():
     if not found_analysis:
         print("⚠️ No 'CONTENT_ANALYSIS' strategy thoughts found yet. Waiting...")
 
+def fetch_latest_cursor(session):
+    # Start tailing from the newest existing row so only new thoughts are streamed.
+    params = {"select": "id,created_at", "order": "created_at.desc,id.desc", "limit": "1"}
+    r = session.get(thoughts_url(), params=params, timeout=10)
+    r.raise_for_status()
+    rows = r.json()
+    return (rows[0]["created_at"], rows[0]["id"]) if rows else None
+
+def fetch_after(session, cursor, strategy, page_size):
+    # Keyset page on (created_at, id): served by idx_ai_thought_logs_created_at, never re-downloads seen rows.
+    params = {"select": "*", "order": "created_at.asc,id.asc", "limit": str(page_size)}
+    if cursor:
+        params["or"] = keyset_filter(cursor)
+    if strategy:
+        params["strategy"] = f"eq.{strategy}"
+    r = session.get(thoughts_url(), params=params, timeout=10)
+    r.raise_for_status()
+    return r.json()
+
+def tail_thoughts(strategy=None, interval=0.5, page_size=500, since=None):
+    import requests
+
+    session = rest_session()
+
+    # With --since the first page is by timestamp only; the id tiebreak starts once a row is seen.
+    cursor = (since, None) if since else fetch_latest_cursor(session)
+    print(f"Tailing ai_thought_logs (strategy={strategy or '*'}) from {cursor[0] if cursor else 'beginning'}...", file=sys.stderr)
+
+    while True:
+        try:
+            rows = fetch_after(session, cursor, strategy, page_size)
+        except requests.RequestException as e:
+            print(f"⚠️ Poll failed: {e}", file=sys.stderr)
+            time.sleep(max(interval, 2))
+            continue
+
+        for thought in rows:
+            sys.stdout.write(json.dumps(thought, ensure_ascii=False) + "\n")
+        sys.stdout.flush()
+
+        if rows:
+            cursor = (rows[-1]["created_at"], rows[-1]["id"])
+        # A full page means a burst is in progress: drain it before sleeping.
+        if len(rows) < page_size:
+            time.sleep(interval)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Check or tail recent ai_thought_logs.")
+    parser.add_argument("--tail", action="store_true", help="Stream new thoughts as JSON lines until interrupted")
+    parser.add_argument("--strategy", help="Only stream thoughts with this strategy (e.g. CONTENT_ANALYSIS)")
+    parser.add_argument("--interval", type=float, default=0.5, help="Seconds between polls when idle (tail mode)")
+    parser.add_argument("--since", help="ISO timestamp to start tailing from instead of the newest row")
+    parser.add_argument("--once", action="store_true", help="Check once instead of three times 5s apart")
+    args = parser.parse_args(argv)
+
+    if args.tail:
+        try:
+            tail_thoughts(args.strategy, args.interval, since=args.since)
+        except KeyboardInterrupt:
+            pass
+    else:
+        rounds = 1 if args.once else 3
+        for i in range(rounds):
+            check_recent_thoughts()
+            if i < rounds - 1:
+                print("Waiting 5s...")
+                time.sleep(5)
+
 if __name__ == "__main__":
-    for i in range(3):
-        check_recent_thoughts()
-        if i < 2:
-            print("Waiting 5s...")
-            time.sleep(5)
+    main()